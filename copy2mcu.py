@@ -7,6 +7,7 @@ from typing import Iterable, Sequence, Set
 
 FILES_TO_COPY = (
     'code.py',
+    'ik_table.bin',
     'LICENSE',
     'lib/abc.py',
     'lib/adafruit_bus_device/*',
@@ -0,0 +1,51 @@
+import argparse
+from math import degrees
+
+from phyto import config
+from phyto.base.leg import LINK_LENGTHS, WORKSPACE_LOWER, WORKSPACE_UPPER
+from phyto.kinematics.inverse import InverseSolver3Dof
+from phyto.kinematics.lookup import LookupSolver3Dof, LookupTable, max_error
+
+
+def main():
+    args = get_args()
+    make_ik_table(args.output, args.spacing)
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Generate the inverse kinematics lookup table, to be copied onto the Pico by copy2mcu.py',
+    )
+
+    parser.add_argument(
+        '--output', '-o',
+        default=config.IK_LOOKUP_TABLE_PATH,
+        help=f'Output path (default: {config.IK_LOOKUP_TABLE_PATH})',
+    )
+
+    parser.add_argument(
+        '--spacing', '-s',
+        default=0.01,
+        type=float,
+        help='Grid spacing in meters (default: 0.01)',
+    )
+
+    return parser.parse_args()
+
+
+def make_ik_table(output_path: str, spacing: float) -> None:
+    solver = InverseSolver3Dof(*LINK_LENGTHS)
+    table = LookupTable.build(solver, WORKSPACE_LOWER, WORKSPACE_UPPER, spacing)
+    table.save(output_path)
+
+    print(f'Grid: {table.shape} points from {table.origin} to {table.upper}')
+    print(f'Size: {len(table.values) * 2} bytes')
+
+    error = max_error(LookupSolver3Dof(*LINK_LENGTHS, table), solver)
+    print(f'Max error: {error:.4f} rad ({degrees(error):.2f}°)')
+
+    print(f'Wrote {output_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,17 @@
 from abc import abstractmethod
 
 from adafruit_bus_device.i2c_device import I2CDevice
-from busio import I2C
 
 from phyto import config
+from phyto.i2c import BusArbiter, TELEMETRY
 from phyto.types import I2cAddress
 
 
 def get_adc(
-        i2c_bus: I2C,
+        i2c_bus: BusArbiter,
         i2c_address: I2cAddress = config.ADS7830_I2C_ADDRESS,
 ) -> 'ADC':
-    i2c_device = I2CDevice(i2c_bus, i2c_address)
+    i2c_device = I2CDevice(i2c_bus.get_bus(TELEMETRY), i2c_address)
     return ADS7830(i2c_device)
 
 
@@ -20,9 +20,14 @@ class ADC:
     def read(self, channel: int) -> float:
         ...
 
+    async def read_when_idle(self, channel: int) -> float:
+        """Like `read`, but waits for the bus to be idle first, so it doesn't delay higher priority users."""
+        return self.read(channel)
+
 
 class ADS7830(ADC):
     i2c_device: I2CDevice
+    """On an `ArbitratedI2C` to wait for idle gaps on the bus, or on any other bus to read right away."""
 
     def __init__(self, i2c_device: I2CDevice):
         self.i2c_device = i2c_device
@@ -40,3 +45,9 @@ class ADS7830(ADC):
             self.i2c_device.write_then_readinto(out_buffer, in_buffer)
 
         return in_buffer[0] * self._voltage_scalar
+
+    async def read_when_idle(self, channel: int) -> float:
+        until_idle = getattr(self.i2c_device.i2c, 'until_idle', None)
+        if until_idle is not None:
+            await until_idle()
+        return self.read(channel)
@@ -1,23 +1,39 @@
+import math
+import time
+from array import array
 from math import pi
 
-from phyto.asyncio import be_nice
+from phyto.base.commands import WalkCommands
+from phyto.base.gait import GaitEngine
+from phyto.base.keyframes import JOINTS, KEYFRAME_SPACING, KeyframeCache, Keyframes, encode_angles
 from phyto.base.leg import Leg, get_legs, LegGroup, REST_POSITION
 from phyto.base.servo_controller import ServoController
-from phyto.types import Point3D
-from phyto.utils import rotate_point
+from phyto.control import ControlLoop
+from phyto.kinematics.inverse import InverseSolver3Dof, NoSolution
+from phyto.spline import SplineTrajectory
+from phyto.types import Point3D, PointArray, TimeFunc
 
 try:
-    from typing import Sequence, Tuple
+    from typing import List, Sequence, Tuple
+
+    LegTargets = Tuple[PointArray, List[float]]
+    """Target of each leg, in the same order as `Base.legs`, and the speed to move there."""
 except ImportError:
+    List = ...
     Sequence = ...
     Tuple = ...
 
+    LegTargets = ...
+
+_SPLINE_STRETCH_ITERATIONS: int = 4
+"""Stretching one phase changes the tangents of its neighbours, so stretching is repeated a few times."""
+
 
 def get_base(
         servo_controller: ServoController,
 ) -> 'Base':
     left_legs, right_legs = get_legs(servo_controller)
-    return Base(left_legs, right_legs)
+    return Base(left_legs, right_legs, keyframe_cache=KeyframeCache(), servo_controller=servo_controller)
 
 
 class Base:
@@ -30,7 +46,57 @@ class Base:
     right_leg_group: LegGroup
     leg_groups: Tuple[LegGroup, LegGroup]
 
-    def __init__(self, left_legs: LegGroup, right_legs: LegGroup) -> None:
+    solver: InverseSolver3Dof
+    """
+    Solves the joint angles of all moving legs in one batch per frame. If None, e.g. because each leg has its
+    own incremental solver, or the legs are fixed-point and solve in integers, the legs solve their own angles.
+    """
+
+    foot_positions: PointArray
+    """Position of each foot in its leg's frame, in the same order as `legs`. Updated every frame."""
+
+    foot_targets: PointArray
+    """Target of each foot in its leg's frame, in the same order as `legs`."""
+
+    smooth_steps: bool
+    """
+    If true, each step moves the feet along splines through all of its waypoints instead of stopping at each one.
+    Needs legs with a `TrajectorySmoother`.
+    """
+
+    time_func: TimeFunc
+
+    control_loop: ControlLoop
+    """Paces the leg updates, computing all legs from one timestamp per tick."""
+
+    gait_engine: GaitEngine
+    """Drives the legs in `walk_gait`. Its gait, period and stride can be changed while it's stopped."""
+
+    keyframe_cache: KeyframeCache
+    """
+    If set, `step` solves each direction bucket's step once into joint-angle keyframes, and replays them.
+    Directions are rounded to the bucket's center. Not used with `smooth_steps`.
+    """
+
+    servo_controller: ServoController
+    """
+    If set, the joint angles of all legs are staged as one frame per control tick, instead of written servo by
+    servo, and the frame is committed as the next tick starts. Every pose then reaches the servos one control
+    period after the tick it was computed in, however long computing it took.
+    """
+
+    def __init__(
+            self,
+            left_legs: LegGroup,
+            right_legs: LegGroup,
+            solver: InverseSolver3Dof = None,
+            smooth_steps: bool = False,
+            time_func: TimeFunc = time.monotonic,
+            control_loop: ControlLoop = None,
+            gait_engine: GaitEngine = None,
+            keyframe_cache: KeyframeCache = None,
+            servo_controller: ServoController = None,
+    ) -> None:
         assert len(left_legs) == 3, len(left_legs)
         assert len(right_legs) == 3, len(right_legs)
 
@@ -39,11 +105,29 @@ class Base:
 
         self.legs = left_legs + right_legs
 
+        if solver is None and all(leg.solver is left_legs[0].solver and not leg.fixed_point for leg in self.legs):
+            solver = left_legs[0].solver
+
+        self.solver = solver
+        self.smooth_steps = smooth_steps
+        self.time_func = time_func
+        self.control_loop = control_loop or ControlLoop(time_func=time_func)
+
+        self.foot_positions = PointArray.from_points([leg.position for leg in self.legs])
+        self.foot_targets = self.foot_positions.copy()
+
         self.left_leg_group = (left_legs[0], right_legs[1], left_legs[2])
         self.right_leg_group = (right_legs[0], left_legs[1], right_legs[2])
         self.leg_groups = (self.left_leg_group, self.right_leg_group)
 
+        self.gait_engine = gait_engine or GaitEngine(left_legs, right_legs)
+        self.keyframe_cache = keyframe_cache
+        self.servo_controller = servo_controller
+        self._frame_staged = False
+
     async def rest(self, speed: float, rest_target: Point3D = REST_POSITION) -> None:
+        self.gait_engine.stop()
+        self.foot_targets.fill(rest_target)
         for leg in self.legs:
             leg.set_target(rest_target, speed=speed)
 
@@ -51,18 +135,152 @@ class Base:
         self.disable()
 
     def disable(self) -> None:
+        if self.servo_controller is not None:
+            self.servo_controller.disable()
+            return
+
         for leg in self.legs:
             leg.disable()
 
+    def sleep(self) -> None:
+        """
+        Puts the servo controller to sleep, to save power while resting. The servos go limp. The next move
+        wakes it up again.
+        """
+        if self.servo_controller is not None:
+            self.servo_controller.sleep()
+
     async def walk(self, speed: float, direction: float, steps: int) -> None:
         assert steps >= 0, steps
         for _ in range(steps):
             await self.step(speed, direction)
 
+    async def walk_gait(self, speed: float, direction: float, duration: float) -> None:
+        """
+        Walks continuously with the gait engine for the given duration. Consecutive calls carry on mid-stride,
+        so the speed and direction can change from one call to the next without stopping. The first call
+        moves the feet to the gait's neutral pose first, at the given speed.
+        """
+
+        engine = self.gait_engine
+        await self._enter_gait(speed)
+        engine.set_command(speed, direction)
+
+        now = await self._start_gait()
+        end = now + duration
+        try:
+            while True:
+                self._move_gait(now)
+                if now >= end:
+                    break
+
+                now = await self._tick()
+        finally:
+            self._hold_gait()
+
+    async def walk_stream(self, commands: WalkCommands) -> None:
+        """
+        Walks continuously with the gait engine, following the latest of the streamed body velocities on every
+        control tick, until the stream is closed. New commands take effect mid-stride, without returning to the
+        neutral pose. If the gait isn't running yet, the feet move to its neutral pose first.
+        """
+
+        engine = self.gait_engine
+        await self._enter_gait(engine.max_speed)
+
+        version = commands.version
+        engine.set_velocity(*commands.latest)
+
+        now = await self._start_gait()
+        try:
+            while not commands.closed:
+                if commands.version != version:
+                    version = commands.version
+                    engine.set_velocity(*commands.latest)
+
+                self._move_gait(now)
+                now = await self._tick()
+        finally:
+            self._hold_gait()
+
+    async def _enter_gait(self, speed: float) -> None:
+        """Moves the feet to the gait's neutral pose at the given speed, unless the gait is already running."""
+
+        engine = self.gait_engine
+        if engine.running:
+            return
+
+        self.foot_targets.fill(engine.center)
+        for leg in self.legs:
+            leg.set_target(engine.center, speed=speed)
+        await self._until_legs_reach_targets()
+
+    async def _start_gait(self) -> float:
+        """Starts the control loop, and the gait engine from the current foot positions if it isn't running."""
+
+        control_loop = self.control_loop
+        control_loop.start()
+        now = await self._tick()
+
+        engine = self.gait_engine
+        if not engine.running:
+            for i, leg in enumerate(self.legs):
+                self.foot_positions[i] = leg.position
+            engine.start(now, self.foot_positions)
+
+        return now
+
+    def _move_gait(self, now: float) -> None:
+        self.foot_positions.set(self.gait_engine.update(now))
+        self._set_foot_positions(self.legs)
+
+    def _hold_gait(self) -> None:
+        self._commit_frame()
+
+        # Let the smoothers know where the feet are, for moves after the gait
+        self.foot_targets.set(self.foot_positions)
+        for i, leg in enumerate(self.legs):
+            leg.hold(self.foot_positions[i])
+
     async def step(self, speed: float, direction: float) -> None:
         assert speed > 0, speed
         assert -pi <= direction <= pi, direction
 
+        self.gait_engine.stop()
+
+        cache = self.keyframe_cache
+        if cache is not None and not self.smooth_steps:
+            bucket = cache.bucket(direction)
+            keyframes = cache.get(bucket)
+            if keyframes is None:
+                phases = self._get_step_phases(1., cache.bucket_direction(bucket))
+                for leg_targets in phases:
+                    self._validate_leg_targets(leg_targets)
+
+                keyframes = self._solve_keyframes(phases)
+                cache.put(bucket, keyframes)
+
+            await self._play_keyframes(keyframes, speed)
+            return
+
+        phases = self._get_step_phases(speed, direction)
+
+        # Validate the whole step before moving any leg
+        for leg_targets in phases:
+            self._validate_leg_targets(leg_targets)
+
+        if self.smooth_steps:
+            self._follow_splines(phases)
+            await self._until_legs_reach_targets()
+            return
+
+        for leg_targets in phases:
+            self._set_leg_targets(leg_targets)
+            await self._until_legs_reach_targets()
+
+    def _get_step_phases(self, speed: float, direction: float) -> List[LegTargets]:
+        """Targets of all legs for each of the six phases of a step."""
+
         x = 0.1
         dy = 0.04
         dz = 0.05
@@ -85,36 +303,287 @@ class Base:
 
         right_targets = left_targets[len(left_targets) // 2:] + left_targets[:len(left_targets) // 2]
 
-        for left_target, right_target in zip(left_targets, right_targets):
-            self._set_leg_group_targets(left_target, right_target, direction, leg_center)
-            await self._until_legs_reach_targets()
+        return [
+            self._get_leg_group_targets(left_target, right_target, direction, leg_center)
+            for left_target, right_target in zip(left_targets, right_targets)
+        ]
 
-    def _set_leg_group_targets(
+    def _get_leg_group_targets(
             self,
             left_target: Tuple[Point3D, float],
             right_target: Tuple[Point3D, float],
             direction: float,
             leg_center: Point3D,
-    ) -> None:
-        # Set leg targets
+    ) -> LegTargets:
+        targets = PointArray.zeros(len(self.legs))
+        angles = [0.] * len(self.legs)
+        speeds = [0.] * len(self.legs)
+
         for legs, target, d in [
             (self.left_leg_group, left_target, -direction),
             (self.right_leg_group, right_target, direction),
         ]:
             target_position, target_speed = target
             for leg, dd in zip(legs, (d, -d, d)):
-                theta = -leg.angle_from_base + dd
-                leg_target = rotate_point(target_position - leg_center, theta) + leg_center
-                leg.set_target(leg_target, speed=target_speed)
+                i = self.legs.index(leg)
+                targets[i] = target_position
+                angles[i] = -leg.angle_from_base + dd
+                speeds[i] = target_speed
+
+        # Rotate all targets about the leg center at once
+        targets.isub(leg_center).irotate(angles).iadd(leg_center)
+
+        return targets, speeds
+
+    def _validate_leg_targets(self, leg_targets: LegTargets) -> None:
+        targets, _ = leg_targets
+        xs, ys, zs = targets.xs, targets.ys, targets.zs
+        for i, leg in enumerate(self.legs):
+            if not leg.workspace.is_reachable(xs[i], ys[i], zs[i]):
+                raise NoSolution(f'Target {targets[i]} is not reachable by {leg}.')
+
+    def _set_leg_targets(self, leg_targets: LegTargets) -> None:
+        """
+        Sets the target of every leg, with a common duration so all legs arrive together. The duration is
+        that of the longest move at its leg's speed, and the other legs move slower to match.
+        """
+
+        targets, speeds = leg_targets
+        self.foot_targets.set(targets)
+
+        duration = 0.
+        for i, leg in enumerate(self.legs):
+            duration = max(duration, leg.duration_to(targets[i], speeds[i]))
+
+        for i, leg in enumerate(self.legs):
+            if duration > 0:
+                leg.set_target(targets[i], duration=duration)
+            else:
+                leg.set_target(targets[i], speed=speeds[i])
+
+    def _solve_keyframes(self, phases: Sequence[LegTargets]) -> Keyframes:
+        """
+        Solves the joint angles of a step, starting from the last phase's targets, at keyframes along the
+        straight lines between targets. Legs arrive together at the end of each phase, as in `_set_leg_targets`.
+        """
+
+        start = phases[-1][0].copy()
+        positions = [start]
+        times = [0.]
+        entry_index = 0
+
+        previous = start
+        for j, (targets, speeds) in enumerate(phases):
+            distances = [previous[i].distance(targets[i]) for i in range(len(self.legs))]
+            duration = max(distance / speed for distance, speed in zip(distances, speeds))
+            count = max(1, math.ceil(max(distances) / KEYFRAME_SPACING))
+
+            delta = targets - previous
+            for k in range(1, count + 1):
+                f = k / count
+                positions.append(previous + delta * f)
+                times.append(times[-1] + duration / count)
+
+            if j == 0:
+                entry_index = len(positions) - 1
+            previous = targets
+
+        angles = array('h', [0] * (len(positions) * JOINTS))
+        for k, keyframe in enumerate(positions):
+            xs, ys, zs = keyframe.xs, keyframe.ys, keyframe.zs
+            for i, leg in enumerate(self.legs):
+                try:
+                    leg_angles = leg.solver.solve(xs[i], ys[i], zs[i])
+                except NoSolution:
+                    leg_angles = leg.workspace.solve_clamped(xs[i], ys[i], zs[i])
+                encode_angles(leg_angles, angles, k * JOINTS + 3 * i)
+
+        entry, entry_speeds = phases[0]
+        return Keyframes(
+            array('f', times),
+            angles,
+            start,
+            entry.copy(),
+            array('f', entry_speeds),
+            entry_index,
+            previous.copy(),
+        )
+
+    async def _play_keyframes(self, keyframes: Keyframes, speed: float) -> None:
+        """Moves the legs through the keyframes at the given speed, interpolating their joint angles."""
+
+        index = 0
+        if not all(keyframes.start[i].almost_equal(leg.position, tolerance=0.001) for i, leg in enumerate(self.legs)):
+            self._set_leg_targets((keyframes.entry, [s * speed for s in keyframes.entry_speeds]))
+            await self._until_legs_reach_targets()
+            index = keyframes.entry_index
+
+        control_loop = self.control_loop
+        control_loop.start()
+        start_time = await self._tick()
+        now = start_time
+
+        t0 = keyframes.times[index]
+        angles = [0.] * JOINTS
+        try:
+            while True:
+                t = t0 + (now - start_time) * speed
+                keyframes.interpolate(t, angles)
+                self._begin_frame()
+                for i, leg in enumerate(self.legs):
+                    leg.set_joint_angles(angles[3 * i], angles[3 * i + 1], angles[3 * i + 2])
+
+                if t >= keyframes.duration:
+                    break
+
+                now = await self._tick()
+        finally:
+            self._commit_frame()
+
+        self.foot_targets.set(keyframes.end)
+        for i, leg in enumerate(self.legs):
+            leg.hold(keyframes.end[i])
+
+    def _follow_splines(self, phases: Sequence[LegTargets]) -> None:
+        """
+        Moves every foot along a spline through its targets of all phases. All feet pass each phase's targets
+        at the same time, so the leg groups stay in step, and no foot is faster than its phase's speed.
+        """
+
+        waypoints = [[leg.position.copy()] for leg in self.legs]
+        for targets, _ in phases:
+            for i, leg_waypoints in enumerate(waypoints):
+                leg_waypoints.append(targets[i])
+
+        # Each phase takes as long as the leg with the longest move at the phase's speed
+        durations = []
+        for j, (_, speeds) in enumerate(phases):
+            duration = max(
+                leg_waypoints[j].distance(leg_waypoints[j + 1]) / speeds[i]
+                for i, leg_waypoints in enumerate(waypoints)
+            )
+            durations.append(max(duration, 0.001))
+
+        # Steps that end where they started join the previous and next steps without stopping
+        closed = all(leg_waypoints[0].almost_equal(leg_waypoints[-1]) for leg_waypoints in waypoints)
+
+        # The curve is faster than the straight lines in places, so stretch the phases where any leg is too fast
+        now = self.time_func()
+        splines = self._get_splines(waypoints, durations, now, closed)
+        for _ in range(_SPLINE_STRETCH_ITERATIONS):
+            stretches = [1.] * len(durations)
+            for i, spline in enumerate(splines):
+                for j, peak in enumerate(spline.peak_speeds()):
+                    stretches[j] = max(stretches[j], peak / phases[j][1][i])
+
+            if max(stretches) <= 1.01:
+                break
+
+            durations = [d * stretch for d, stretch in zip(durations, stretches)]
+            splines = self._get_splines(waypoints, durations, now, closed)
+
+        self.foot_targets.set(phases[-1][0])
+        for leg, spline in zip(self.legs, splines):
+            leg.follow(spline)
+
+    @staticmethod
+    def _get_splines(
+            waypoints: List[List[Point3D]],
+            durations: List[float],
+            now: float,
+            closed: bool,
+    ) -> List[SplineTrajectory]:
+        times = [now]
+        for duration in durations:
+            times.append(times[-1] + duration)
+
+        return [SplineTrajectory(leg_waypoints, times, closed) for leg_waypoints in waypoints]
 
     async def _until_legs_reach_targets(self) -> None:
-        legs_not_at_target = self._legs_not_at_target()
-        while legs_not_at_target:
-            for leg in legs_not_at_target:
-                leg.move()
-                await be_nice()
+        control_loop = self.control_loop
+        control_loop.start()
 
+        try:
             legs_not_at_target = self._legs_not_at_target()
+            while legs_not_at_target:
+                now = await self._tick()
+                self._move_legs(legs_not_at_target, now)
+
+                legs_not_at_target = self._legs_not_at_target()
+        finally:
+            # Even if a move fails partway through a frame, e.g. with an angle out of range, so that the chips
+            # aren't left in the frame, staging every later write
+            self._commit_frame()
+
+    def _move_legs(self, legs: Sequence[Leg], now: float) -> None:
+        """
+        Moves the legs to where they should be at time ``now``, solving all of their joint angles in one call.
+        """
+
+        if self.solver is None:
+            self._begin_frame()
+            for leg in legs:
+                leg.move(now)
+            return
+
+        positions = self.foot_positions
+        for i, leg in enumerate(self.legs):
+            positions[i] = leg.position_at(now)
+
+        self._set_foot_positions(legs)
+
+    def _set_foot_positions(self, legs: Sequence[Leg]) -> None:
+        """Moves the legs to their positions in `foot_positions`, in one frame."""
+
+        self._begin_frame()
+
+        positions = self.foot_positions
+        xs, ys, zs = positions.xs, positions.ys, positions.zs
+
+        if self.solver is None:
+            for i, leg in enumerate(self.legs):
+                if leg in legs:
+                    try:
+                        angles = leg.solver.solve(xs[i], ys[i], zs[i])
+                    except NoSolution:
+                        angles = leg.workspace.solve_clamped(xs[i], ys[i], zs[i])
+                    leg.set_joint_angles(*angles)
+            return
+
+        try:
+            angles = self.solver.solve_batch(xs, ys, zs)
+        except NoSolution:
+            # Some position is out of reach; move every leg as close to it as possible instead of stopping
+            for i, leg in enumerate(self.legs):
+                if leg in legs:
+                    leg.set_joint_angles(*leg.workspace.solve_clamped(xs[i], ys[i], zs[i]))
+            return
+
+        n = len(self.legs)
+        for i, leg in enumerate(self.legs):
+            if leg in legs:
+                leg.set_joint_angles(angles[i], angles[n + i], angles[2 * n + i])
+
+    async def _tick(self) -> float:
+        """Waits for the next control tick, and commits the frame staged in the last one as soon as it starts."""
+        now = await self.control_loop.tick()
+        self._commit_frame()
+        return now
+
+    def _begin_frame(self) -> None:
+        servo_controller = self.servo_controller
+        if servo_controller is None or self._frame_staged:
+            return
+
+        if servo_controller.sleeping:
+            servo_controller.wake()
+        servo_controller.begin_frame()
+        self._frame_staged = True
+
+    def _commit_frame(self) -> None:
+        if self._frame_staged:
+            self._frame_staged = False
+            self.servo_controller.write_frame()
 
     def _legs_not_at_target(self) -> Sequence[Leg]:
         return [leg for leg in self.legs if not leg.at_target]
@@ -0,0 +1,70 @@
+import math
+
+try:
+    from typing import AsyncIterable, Tuple
+
+    WalkCommand = Tuple[float, float, float]
+    """Body velocity: forward, leftward, and counterclockwise yaw rate."""
+except ImportError:
+    AsyncIterable = ...
+    Tuple = ...
+
+    WalkCommand = ...
+
+
+class WalkCommands:
+    """
+    Stream of walk commands for `Base.walk_stream`, holding only the latest one.
+
+    Producers `put` commands whenever they like, e.g. each time the eyes are read, and the walking base reads
+    the latest command once per control tick. A newer command replaces one that hasn't been read yet, so
+    the base never works through a backlog of stale commands.
+    """
+
+    def __init__(self, vx: float = 0., vy: float = 0., yaw_rate: float = 0.):
+        self._command = (vx, vy, yaw_rate)
+        self._version = 0
+        self._closed = False
+
+    @property
+    def latest(self) -> WalkCommand:
+        return self._command
+
+    @property
+    def version(self) -> int:
+        """Increases with every command put, so readers can tell whether the command has changed."""
+        return self._version
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, speed: float, direction: float) -> None:
+        """Puts a command to move in the given direction without turning."""
+        self.put_velocity(speed * math.cos(direction), speed * math.sin(direction), 0.)
+
+    def put_velocity(self, vx: float, vy: float, yaw_rate: float) -> None:
+        assert not self._closed, 'Commands are closed.'
+        self._command = (vx, vy, yaw_rate)
+        self._version += 1
+
+    def close(self) -> None:
+        """Ends the stream. The base stops walking at its next tick."""
+        self._closed = True
+
+    async def feed(self, commands: AsyncIterable[WalkCommand]) -> None:
+        """Puts every velocity from an async iterator, such as a queue reader, then closes the stream."""
+
+        async for vx, vy, yaw_rate in commands:
+            self.put_velocity(vx, vy, yaw_rate)
+        self.close()
+
+
+def face_direction(speed: float, direction: float, turn_gain: float = 1.) -> WalkCommand:
+    """
+    Velocity that turns the body towards the given direction, at ``turn_gain`` radians per second per radian,
+    and walks forward at up to ``speed``, slowing down the further the direction is off to the side.
+    Directions more than a quarter turn away are turned towards in place.
+    """
+
+    return speed * max(0., math.cos(direction)), 0., turn_gain * direction
@@ -0,0 +1,121 @@
+"""
+Measures how many body frames per second the kinematics chain can compute, without any servo I/O.
+
+A body frame reads the smoothed position of all six legs and solves their joint angles. The fixed-point frame
+stays in integer micrometres and milliradians, like `Leg.move` with fixed-point legs. Run it on the host
+with ``python3 -m phyto.base.frame_benchmark``, or on the Pico from the REPL with
+``from phyto.base.frame_benchmark import frame_benchmark; frame_benchmark()``.
+"""
+
+import gc
+import time
+
+from phyto.base.leg import LINK_LENGTHS, REST_POSITION
+from phyto.kinematics.fixed import FixedInverseSolver3Dof
+from phyto.kinematics.inverse import InverseSolver3Dof
+from phyto.motion import FixedPositionSmoother, PositionSmoother, TrajectorySmoother
+from phyto.types import Point3D
+
+TARGETS = (
+    Point3D(0.1, -0.04, -0.08),
+    Point3D(0.1, -0.05, -0.08),
+    Point3D(0.1, -0.04, -0.03),
+    Point3D(0.1, 0.05, -0.03),
+    Point3D(0.1, 0.04, -0.08),
+    Point3D(0.1, 0.0, -0.08),
+)
+
+
+def frame_benchmark(frames: int = 5000) -> None:
+    for name, smoother_type, solver in (
+            ('float', PositionSmoother, InverseSolver3Dof(*LINK_LENGTHS)),
+            ('trajectory', TrajectorySmoother, InverseSolver3Dof(*LINK_LENGTHS)),
+            ('fixed-point', FixedPositionSmoother, FixedInverseSolver3Dof(*LINK_LENGTHS)),
+    ):
+        fps = run_frames(smoother_type, solver, frames)
+        allocations, unit = allocations_per_frame(smoother_type, solver, frames // 10)
+        print(f'{name:>12}: {fps:8.0f} frames/s; {allocations:6.1f} {unit}/frame')
+
+
+def run_frames(smoother_type, solver, frames: int) -> float:
+    frame = get_frame_func(smoother_type, solver)
+
+    start = time.monotonic()
+    for _ in range(frames):
+        frame()
+
+    return frames / (time.monotonic() - start)
+
+
+def allocations_per_frame(smoother_type, solver, frames: int) -> tuple:
+    """
+    Returns the heap bytes allocated per frame on CircuitPython and MicroPython. CPython has no cheap
+    allocation counter, so there the number of `Point3D` objects created per frame is returned instead.
+    """
+
+    frame = get_frame_func(smoother_type, solver)
+
+    if hasattr(gc, 'mem_alloc'):
+        gc.collect()
+        gc.disable()
+        try:
+            start = gc.mem_alloc()
+            for _ in range(frames):
+                frame()
+            return (gc.mem_alloc() - start) / frames, 'bytes'
+        finally:
+            gc.enable()
+
+    point_init = Point3D.__init__
+    count = [0]
+
+    def counting_init(self, x, y, z):
+        count[0] += 1
+        point_init(self, x, y, z)
+
+    Point3D.__init__ = counting_init
+    try:
+        for _ in range(frames):
+            frame()
+    finally:
+        Point3D.__init__ = point_init
+
+    return count[0] / frames, 'points'
+
+
+def get_frame_func(smoother_type, solver):
+    clock = FakeClock(dt=0.01)
+    smoothers = [smoother_type(REST_POSITION, 0.1, time_func=clock) for _ in range(6)]
+    target_index = [0]
+    fixed_point = isinstance(solver, FixedInverseSolver3Dof)
+
+    def frame() -> None:
+        for smoother in smoothers:
+            if smoother.at_target:
+                target_index[0] = (target_index[0] + 1) % len(TARGETS)
+                smoother.target = TARGETS[target_index[0]]
+
+            if fixed_point:
+                position = smoother.position_um
+                solver.solve_um(position.x, position.y, position.z)
+            else:
+                position = smoother.position
+                solver.solve(position.x, position.y, position.z)
+
+    return frame
+
+
+class FakeClock:
+    """Advances by ``dt`` every time it is read, so every frame moves the legs."""
+
+    def __init__(self, dt: float):
+        self.dt = dt
+        self.now = 0.
+
+    def __call__(self) -> float:
+        self.now += self.dt
+        return self.now
+
+
+if __name__ == '__main__':
+    frame_benchmark()
@@ -0,0 +1,284 @@
+"""
+Continuous, phase-based gaits.
+
+A gait cycle is a phase from 0 to 1 that advances with time. Each leg is offset from it by its own phase
+offset, and spends the first ``duty_factor`` of its cycle in stance, pushing the body along with the foot on
+the ground, and the rest in swing, lifting the foot and carrying it forward to its next touchdown point.
+
+Stance feet move opposite to the commanded body velocity, turning included, and swing feet aim for a touchdown
+point planned from it, so the velocity can change at any time, mid-stride, without returning to the neutral pose.
+"""
+
+import math
+
+from phyto.base.leg import HIP_RADIUS, LegGroup
+from phyto.types import Point3D, PointArray
+
+try:
+    from typing import Sequence, Tuple
+except ImportError:
+    Sequence = ...
+    Tuple = ...
+
+
+class Gait:
+    name: str
+
+    duty_factor: float
+    """Fraction of the cycle that each leg spends on the ground."""
+
+    phase_offsets: Tuple[float, ...]
+    """Phase offset of each leg, in the same order as `Base.legs`: left front, middle, back, then right."""
+
+    def __init__(self, name: str, duty_factor: float, phase_offsets: Sequence[float]):
+        assert 0 < duty_factor < 1, duty_factor
+        assert len(phase_offsets) == 6, len(phase_offsets)
+
+        self.name = name
+        self.duty_factor = duty_factor
+        self.phase_offsets = tuple(phase_offsets)
+
+    def __repr__(self) -> str:
+        return f'Gait(name={repr(self.name)})'
+
+
+TRIPOD = Gait('tripod', 1 / 2, (0, 1 / 2, 0, 1 / 2, 0, 1 / 2))
+"""Two alternating tripods. The fastest gait, with three feet on the ground at a time."""
+
+RIPPLE = Gait('ripple', 2 / 3, (0, 1 / 3, 2 / 3, 1 / 2, 5 / 6, 1 / 6))
+"""Back-to-front wave on each side, with the sides half a cycle apart. Four feet on the ground at a time."""
+
+WAVE = Gait('wave', 5 / 6, (3 / 6, 4 / 6, 5 / 6, 0, 1 / 6, 2 / 6))
+"""One leg at a time, back to front, left then right. The slowest and most stable gait."""
+
+GAITS = (TRIPOD, RIPPLE, WAVE)
+
+
+class GaitEngine:
+    """
+    Computes the foot positions of all six legs, in their own frames, from a continuous gait phase.
+
+    Call `start` with the current foot positions, then `update` once per control tick. Feet move in the
+    same frames and with the same direction convention as `Base.step`.
+    """
+
+    gait: Gait
+    """Change it only while standing still; changing it mid-stride can put a lifted foot into stance."""
+
+    cycle_period: float
+    """Duration of one full gait cycle."""
+
+    stride: float
+    """Longest distance a foot moves on the ground in one stance, i.e. per cycle."""
+
+    step_height: float
+    center: Point3D
+    """Neutral foot position, on the ground, that strides are centered around."""
+
+    hip_radius: float
+    """Distance from the center of the body, which the body turns about, to each leg's frame."""
+
+    vx: float
+    """Forward body velocity."""
+
+    vy: float
+    """Leftward body velocity."""
+
+    yaw_rate: float
+    """Counterclockwise body rotation rate, in radians per second."""
+
+    phase: float
+    feet: PointArray
+    """Foot positions of all legs, in the same order as `Base.legs`."""
+
+    def __init__(
+            self,
+            left_legs: LegGroup,
+            right_legs: LegGroup,
+            gait: Gait = TRIPOD,
+            cycle_period: float = 1.6,
+            stride: float = 0.08,
+            step_height: float = 0.05,
+            center: Point3D = None,
+            hip_radius: float = HIP_RADIUS,
+    ):
+        assert cycle_period > 0, cycle_period
+
+        self.gait = gait
+        self.cycle_period = cycle_period
+        self.stride = stride
+        self.step_height = step_height
+        self.center = Point3D(0.1, 0, -0.08) if center is None else center.copy()
+        self.hip_radius = hip_radius
+
+        legs = left_legs + right_legs
+        self._sides = tuple(-1 if leg in left_legs else 1 for leg in legs)
+
+        # Heading of each leg's x-axis in the body frame. Right legs' frames are right-handed, left legs'
+        # frames are mirrored, with their y-axes pointing forward too.
+        headings = tuple(side * (leg.angle_from_base - math.pi / 2) for leg, side in zip(legs, self._sides))
+        self._cos_headings = tuple(math.cos(h) for h in headings)
+        self._sin_headings = tuple(math.sin(h) for h in headings)
+
+        self.vx = 0.
+        self.vy = 0.
+        self.yaw_rate = 0.
+        self._vxs = [0.] * len(legs)
+        self._vys = [0.] * len(legs)
+
+        self.phase = 0.
+        self.feet = PointArray.zeros(len(legs))
+        self._liftoff_zs = [0.] * len(legs)
+        self._swing_progress = [0.] * len(legs)
+        self._swinging = [False] * len(legs)
+        self._t_last_update = None
+
+    @property
+    def running(self) -> bool:
+        return self._t_last_update is not None
+
+    @property
+    def max_speed(self) -> float:
+        """Fastest foot speed of the gait, when every stance covers the full stride."""
+        return self.stride / (self.gait.duty_factor * self.cycle_period)
+
+    @property
+    def max_yaw_rate(self) -> float:
+        """Fastest turn in place."""
+        return self.max_speed / (self.hip_radius + self.center.x)
+
+    @property
+    def speed(self) -> float:
+        return math.sqrt(self.vx ** 2 + self.vy ** 2)
+
+    @property
+    def direction(self) -> float:
+        return math.atan2(self.vy, self.vx)
+
+    def set_command(self, speed: float, direction: float) -> None:
+        """Sets the body speed and direction, without turning. See `set_velocity`."""
+
+        assert speed >= 0, speed
+        assert -math.pi <= direction <= math.pi, direction
+
+        self.set_velocity(speed * math.cos(direction), speed * math.sin(direction), 0.)
+
+    def set_velocity(self, vx: float, vy: float, yaw_rate: float) -> None:
+        """
+        Sets the body velocity, from the next update on. The body turns about its center, in place if it
+        isn't also moving. The whole velocity is scaled down if any foot would need to move faster than
+        `max_speed`. At zero velocity, the legs step in place at `center`.
+        """
+
+        self._set_velocity(vx, vy, yaw_rate)
+
+        fastest = 0.
+        for i in range(len(self._vxs)):
+            vx_i, vy_i = self._neutral_foot_velocity(i)
+            fastest = max(fastest, vx_i * vx_i + vy_i * vy_i)
+
+        fastest = math.sqrt(fastest)
+        if fastest > self.max_speed:
+            k = self.max_speed / fastest
+            self._set_velocity(k * vx, k * vy, k * yaw_rate)
+
+    def _set_velocity(self, vx: float, vy: float, yaw_rate: float) -> None:
+        self.vx = vx
+        self.vy = vy
+        self.yaw_rate = yaw_rate
+
+        # Velocity of each stance foot in its leg's frame, opposite to the body's, before turning
+        for i, side in enumerate(self._sides):
+            c, s = self._cos_headings[i], self._sin_headings[i]
+            self._vxs[i] = -(vx * c + vy * s)
+            self._vys[i] = -side * (vy * c - vx * s)
+
+    def _neutral_foot_velocity(self, i: int) -> Tuple[float, float]:
+        """Velocity of a stance foot at `center`, turning included."""
+        return self._foot_velocity(i, self.center.x, self.center.y)
+
+    def _foot_velocity(self, i: int, x: float, y: float) -> Tuple[float, float]:
+        """Velocity of a stance foot at the given position in its leg's frame, turning included."""
+
+        # Turning moves the foot about the body's center, which is hip_radius behind the leg's origin. The
+        # rotation is mirrored in the left legs' frames.
+        w = self._sides[i] * self.yaw_rate
+        return self._vxs[i] + w * y, self._vys[i] - w * (x + self.hip_radius)
+
+    def start(self, now: float, feet: PointArray) -> None:
+        """Starts the gait from the given foot positions, e.g. all on the ground at `center`."""
+
+        self.phase = 0.
+        self.feet.set(feet)
+        for i in range(len(self._swinging)):
+            self._liftoff_zs[i] = feet.zs[i]
+            self._swing_progress[i] = 0.
+            self._swinging[i] = self._leg_phase(i) >= self.gait.duty_factor
+        self._t_last_update = now
+
+    def stop(self) -> None:
+        self._t_last_update = None
+
+    def update(self, now: float) -> PointArray:
+        """Advances the gait to the given time, and returns the foot positions."""
+
+        assert self.running
+
+        dt = now - self._t_last_update
+        self._t_last_update = now
+        self.phase = (self.phase + dt / self.cycle_period) % 1.
+
+        duty_factor = self.gait.duty_factor
+        stance_time = duty_factor * self.cycle_period
+        center = self.center
+        ground = center.z
+
+        xs, ys, zs = self.feet.xs, self.feet.ys, self.feet.zs
+        for i in range(len(self._swinging)):
+            leg_phase = self._leg_phase(i)
+            vx, vy = self._neutral_foot_velocity(i)
+
+            # Touch down half a stride ahead of the center, so the stance is centered on it
+            touchdown_x = center.x - vx * stance_time / 2
+            touchdown_y = center.y - vy * stance_time / 2
+
+            if leg_phase < duty_factor:
+                if self._swinging[i]:
+                    self._swinging[i] = False
+                    stance_elapsed = leg_phase * self.cycle_period
+                    xs[i] = touchdown_x + vx * stance_elapsed
+                    ys[i] = touchdown_y + vy * stance_elapsed
+                else:
+                    foot_vx, foot_vy = self._foot_velocity(i, xs[i], ys[i])
+                    xs[i] += foot_vx * dt
+                    ys[i] += foot_vy * dt
+                zs[i] = ground
+                continue
+
+            if not self._swinging[i]:
+                self._swinging[i] = True
+                self._liftoff_zs[i] = zs[i]
+                self._swing_progress[i] = 0.
+
+            # Close the remaining horizontal distance in proportion to the remaining swing, so a touchdown
+            # point that moves with the command mid-swing doesn't make the foot jump
+            s = _smoothstep((leg_phase - duty_factor) / (1 - duty_factor))
+            s_last = self._swing_progress[i]
+            self._swing_progress[i] = s
+            if s > s_last:
+                k = (s - s_last) / (1 - s_last)
+                xs[i] += (touchdown_x - xs[i]) * k
+                ys[i] += (touchdown_y - ys[i]) * k
+
+            z0 = self._liftoff_zs[i]
+            zs[i] = z0 + (ground - z0) * s + self.step_height * math.sin(math.pi * s)
+
+        return self.feet
+
+    def _leg_phase(self, i: int) -> float:
+        return (self.phase + self.gait.phase_offsets[i]) % 1.
+
+
+def _smoothstep(t: float) -> float:
+    """Eases from 0 to 1 with zero velocity at both ends."""
+    return t * t * (3 - 2 * t)
@@ -0,0 +1,212 @@
+"""
+Cache of whole steps as joint-angle keyframes, so repeated steps replay without any rotation or IK.
+
+Directions are quantised into buckets, and each bucket's step is solved once into keyframes: the joint angles
+of all legs at points spaced at most `KEYFRAME_SPACING` apart along every foot's path, with the time of each
+keyframe at unit speed. Replaying a step interpolates between keyframes in joint space, and scales the times
+by the step's speed, so one entry serves every speed.
+"""
+
+import math
+from array import array
+
+from phyto.kinematics.lookup import ANGLE_SCALE
+from phyto.types import PointArray
+
+try:
+    from typing import List, Optional, Sequence
+except ImportError:
+    List = ...
+    Optional = ...
+    Sequence = ...
+
+KEYFRAME_SPACING: float = 0.01
+"""Longest distance any foot moves between keyframes. Keeps joint-space interpolation close to straight lines."""
+
+JOINTS: int = 18
+"""Joint angles per keyframe: three for each of the six legs."""
+
+
+class Keyframes:
+    """
+    Joint angles of all legs over one step.
+
+    ``angles`` holds `JOINTS` int16 counts of ``1 / ANGLE_SCALE`` radians per keyframe, leg by leg in the same
+    order as `Base.legs`. ``times`` holds the time of each keyframe at unit speed.
+    """
+
+    times: array
+    angles: array
+
+    start: PointArray
+    """Foot positions at the first keyframe. The whole step can only be replayed if the feet are there."""
+
+    entry: PointArray
+    """Foot positions at the end of the first phase. From anywhere else, the feet move there first."""
+
+    entry_speeds: array
+    """Speed of each foot in the first phase at unit speed, to move to `entry` like the first phase does."""
+
+    entry_index: int
+    """Index of the keyframe at `entry`."""
+
+    end: PointArray
+    """Foot positions at the last keyframe."""
+
+    def __init__(
+            self,
+            times: array,
+            angles: array,
+            start: PointArray,
+            entry: PointArray,
+            entry_speeds: array,
+            entry_index: int,
+            end: PointArray,
+    ):
+        assert len(angles) == len(times) * JOINTS, (len(angles), len(times))
+
+        self.times = times
+        self.angles = angles
+        self.start = start
+        self.entry = entry
+        self.entry_speeds = entry_speeds
+        self.entry_index = entry_index
+        self.end = end
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def duration(self) -> float:
+        """Duration at unit speed."""
+        return self.times[-1]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the arrays."""
+        return 4 * len(self.times) + 2 * len(self.angles) + 3 * 3 * 4 * len(self.start) + 4 * len(self.entry_speeds)
+
+    def interpolate(self, t: float, out: List[float]) -> None:
+        """Writes the joint angles at time ``t`` (at unit speed) into ``out``, in radians."""
+
+        times = self.times
+        last = len(times) - 1
+        if t >= times[last]:
+            i, u = last - 1, 1.
+        elif t <= times[0]:
+            i, u = 0, 0.
+        else:
+            # Binary search for the keyframe at or before t
+            lo, hi = 0, last
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if times[mid] <= t:
+                    lo = mid
+                else:
+                    hi = mid
+            i = lo
+            u = (t - times[i]) / (times[i + 1] - times[i])
+
+        angles = self.angles
+        a, b = i * JOINTS, (i + 1) * JOINTS
+        for j in range(JOINTS):
+            before = angles[a + j]
+            out[j] = (before + (angles[b + j] - before) * u) / ANGLE_SCALE
+
+
+def encode_angles(angles: Sequence[float], out: array, offset: int) -> None:
+    """Writes radians into ``out`` as int16 counts, starting at ``offset``."""
+    for j, angle in enumerate(angles):
+        out[offset + j] = int(round(angle * ANGLE_SCALE))
+
+
+class KeyframeCache:
+    """
+    Least recently used cache of `Keyframes` by direction bucket, holding at most ``max_bytes`` of arrays.
+    """
+
+    bucket_size: float
+    """Width of each direction bucket, in radians."""
+
+    max_bytes: int
+    nbytes: int
+
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, bucket_size: float = math.radians(5), max_bytes: int = 16 * 1024):
+        assert bucket_size > 0, bucket_size
+
+        self.bucket_size = bucket_size
+        self.max_bytes = max_bytes
+        self._bucket_count = max(1, int(round(2 * math.pi / bucket_size)))
+
+        self._entries = {}
+        self._order = []
+        self.nbytes = 0
+        self.reset_stats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (
+            f'KeyframeCache(entries={len(self)}; bytes={self.nbytes}/{self.max_bytes}; '
+            f'hit_rate={self.hit_rate:.2f}; hits={self.hits}; misses={self.misses}; evictions={self.evictions})'
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._order.clear()
+        self.nbytes = 0
+
+    def bucket(self, direction: float) -> int:
+        """Directions a whole turn apart, like pi and -pi, share a bucket."""
+        count = self._bucket_count
+        return (int(round(direction / self.bucket_size)) + count // 2) % count - count // 2
+
+    def bucket_direction(self, bucket: int) -> float:
+        """Direction at the center of the bucket, clamped to [-pi, pi]."""
+        return max(-math.pi, min(math.pi, bucket * self.bucket_size))
+
+    def get(self, bucket: int) -> Optional[Keyframes]:
+        keyframes = self._entries.get(bucket)
+        if keyframes is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._order.remove(bucket)
+        self._order.append(bucket)
+        return keyframes
+
+    def put(self, bucket: int, keyframes: Keyframes) -> None:
+        if bucket in self._entries:
+            self._remove(bucket)
+
+        if keyframes.nbytes > self.max_bytes:
+            return
+
+        while self.nbytes + keyframes.nbytes > self.max_bytes:
+            self._remove(self._order[0])
+            self.evictions += 1
+
+        self._entries[bucket] = keyframes
+        self._order.append(bucket)
+        self.nbytes += keyframes.nbytes
+
+    def _remove(self, bucket: int) -> None:
+        keyframes = self._entries.pop(bucket)
+        self._order.remove(bucket)
+        self.nbytes -= keyframes.nbytes
@@ -2,9 +2,15 @@ import math
 
 from adafruit_motor.servo import Servo
 
-from phyto.base.servo_controller import ServoController
-from phyto.kinematics.inverse import InverseSolver3Dof
-from phyto.motion import PositionSmoother
+from phyto import config
+from phyto.base.servo_controller import FrameServo, ServoController
+from phyto.fixedpoint import to_m, to_rad
+from phyto.kinematics.fixed import FixedInverseSolver3Dof
+from phyto.kinematics.incremental import IncrementalSolver3Dof
+from phyto.kinematics.inverse import InverseSolver3Dof, NoSolution
+from phyto.kinematics.lookup import LookupSolver3Dof, LookupTable
+from phyto.kinematics.workspace import JointLimits, Workspace
+from phyto.motion import FixedPositionSmoother, PositionSmoother, TrajectorySmoother
 from phyto.types import Point3D
 
 try:
@@ -23,29 +29,76 @@ except ImportError:
 
 ANGLE_FROM_BASE: float = math.radians(54.2)
 
+HIP_RADIUS: float = 0.07
+"""Approximate distance from the center of the body to each leg's first joint, used for turning."""
+
 REST_POSITION = Point3D(0.1, 0, -0.01)
 
+LINK_LENGTHS = (.032, .090, .112)
+
+_COUNT_SHIFT: int = 16
+"""Fraction bits of the servo counts in `Leg.set_joint_angles_mrad`."""
+
+WORKSPACE_LOWER = Point3D(0.05, -0.05, -0.08)
+WORKSPACE_UPPER = Point3D(0.15, 0.05, -0.01)
+"""Bounds of the foot positions used by `Base.step` and `Base.rest`, in the leg's frame."""
+
 
 def get_legs(
         servo_controller: ServoController,
+        solver: InverseSolver3Dof = None,
+        incremental: bool = False,
+        fixed_point: bool = False,
 ) -> Tuple[LegGroup, LegGroup]:
-    solver = InverseSolver3Dof(l0=.032, l1=.090, l2=.112)
+    """
+    If ``incremental`` is true, each leg warm-starts its own `IncrementalSolver3Dof` from the shared solver
+    instead of using the shared solver directly.
+
+    If ``fixed_point`` is true, the legs use `FixedPositionSmoother` and `FixedInverseSolver3Dof`, and `Leg.move`
+    keeps the foot position, joint angles and servo counts in integer micrometres and milliradians, for the
+    FPU-less RP2040. `phyto.base.frame_benchmark` compares the two. It is slower than floats on a CPython host
+    with an FPU, and hasn't been measured on the RP2040 yet.
+    """
+
+    if solver is None:
+        solver = FixedInverseSolver3Dof(*LINK_LENGTHS) if fixed_point else get_solver()
+
+    def leg_solver() -> InverseSolver3Dof:
+        return IncrementalSolver3Dof(solver) if incremental else solver
 
     left_legs = (
-        get_left_front_leg(servo_controller, solver),
-        get_left_middle_leg(servo_controller, solver),
-        get_left_back_leg(servo_controller, solver),
+        get_left_front_leg(servo_controller, leg_solver()),
+        get_left_middle_leg(servo_controller, leg_solver()),
+        get_left_back_leg(servo_controller, leg_solver()),
     )
 
     right_legs = (
-        get_right_front_leg(servo_controller, solver),
-        get_right_middle_leg(servo_controller, solver),
-        get_right_back_leg(servo_controller, solver),
+        get_right_front_leg(servo_controller, leg_solver()),
+        get_right_middle_leg(servo_controller, leg_solver()),
+        get_right_back_leg(servo_controller, leg_solver()),
     )
 
+    if fixed_point:
+        for leg in left_legs + right_legs:
+            leg.smoother = FixedPositionSmoother(REST_POSITION, leg.smoother.speed)
+
     return left_legs, right_legs
 
 
+def get_solver(lookup_table_path: str = config.IK_LOOKUP_TABLE_PATH) -> InverseSolver3Dof:
+    """
+    Returns the lookup table solver if a table generated by ``make_ik_table.py`` is found in flash,
+    otherwise the exact solver.
+    """
+
+    try:
+        table = LookupTable.load(lookup_table_path)
+    except OSError:
+        return InverseSolver3Dof(*LINK_LENGTHS)
+
+    return LookupSolver3Dof(*LINK_LENGTHS, table)
+
+
 def get_left_front_leg(servo_controller: ServoController, solver: InverseSolver3Dof) -> 'Leg':
     return Leg(
         id='left_front',
@@ -135,6 +188,9 @@ class Leg:
 
     flip_angles: bool
 
+    workspace: Workspace
+    """Foot positions reachable within the servos' range, given the angle offsets."""
+
     smoother: PositionSmoother
 
     def __init__(
@@ -155,7 +211,10 @@ class Leg:
         self.angle_from_base = angle_from_base
         self.angle_offsets = angle_offsets
         self.flip_angles = flip_angles
-        self.smoother = smoother or PositionSmoother(REST_POSITION, 0.05)
+        self.workspace = Workspace(solver, self._get_joint_limits())
+        self.smoother = smoother or TrajectorySmoother(REST_POSITION, 0.05)
+        self._count_maps = self._get_count_maps()
+        self._fixed_count_maps = self._get_fixed_count_maps()
 
     def __repr__(self) -> str:
         return f'Leg(id={repr(self.id)})'
@@ -171,6 +230,62 @@ class Leg:
         for i, angle in enumerate(angles):
             self.set_angle(i, angle)
 
+    def _get_joint_limits(self) -> JointLimits:
+        """Converts the servos' actuation ranges into joint angle limits, undoing `set_joint_angles`."""
+
+        limits = []
+        for servo in self.servos:
+            actuation_range = servo.actuation_range
+            limits.append((180 - actuation_range, 180) if self.flip_angles else (0, actuation_range))
+
+        (min0, max0), (min1, max1), (min2, max2) = limits
+        offset0, offset1, offset2 = self.angle_offsets
+
+        return (
+            (math.radians(offset0 - max0), math.radians(offset0 - min0)),
+            (math.radians(offset1 - max1), math.radians(offset1 - min1)),
+            (math.radians(min2 - offset2), math.radians(max2 - offset2)),
+        )
+
+    def _get_count_maps(self) -> Optional[Tuple[Tuple[float, float, float, float], ...]]:
+        """
+        Folds `set_joint_angles`, `set_angle` and the servo's angle to pulse conversion into one affine map per
+        joint, from the joint angle in radians to the servo's 12-bit count: ``count = scale * theta + offset``,
+        valid from ``min_count`` to ``max_count``. None unless all the servos can be set to counts.
+        """
+
+        if not all(isinstance(servo, FrameServo) for servo in self.servos):
+            return None
+
+        flip = -1 if self.flip_angles else 1
+        maps = []
+        for servo, angle_offset, sign in zip(self.servos, self.angle_offsets, (-1, -1, 1)):
+            counts_per_degree = (servo.max_count - servo.min_count) / servo.actuation_range
+
+            # Servo angle = flip * (angle_offset + sign * degrees(theta)), plus 180 if flipped
+            scale = counts_per_degree * flip * sign * 180 / math.pi
+            offset = servo.min_count + counts_per_degree * (flip * angle_offset + (180 if self.flip_angles else 0))
+            maps.append((scale, offset, servo.min_count, servo.max_count))
+
+        return tuple(maps)
+
+    def _get_fixed_count_maps(self) -> Optional[Tuple[Tuple[int, int, int, int], ...]]:
+        """`_count_maps` in integers, from milliradians to counts with `_COUNT_SHIFT` fraction bits."""
+
+        if self._count_maps is None:
+            return None
+
+        one = 1 << _COUNT_SHIFT
+        return tuple(
+            (round(scale * one / 1000), round(offset * one), round(min_count * one), round(max_count * one))
+            for scale, offset, min_count, max_count in self._count_maps
+        )
+
+    @property
+    def fixed_point(self) -> bool:
+        """If true, `move` works in integer micrometres and milliradians, with no float math but the clock."""
+        return isinstance(self.smoother, FixedPositionSmoother) and isinstance(self.solver, FixedInverseSolver3Dof)
+
     @property
     def position(self) -> Point3D:
         return self.smoother.position
@@ -179,6 +294,10 @@ class Leg:
     def at_target(self) -> bool:
         return self.smoother.at_target
 
+    def position_at(self, now: float) -> Point3D:
+        """The position at the given time, which should not be earlier than the last one."""
+        return self.smoother.update(now)
+
     def get_angle(self, servo_index: int) -> ServoAngle:
         servo = self.servos[servo_index]
 
@@ -196,22 +315,92 @@ class Leg:
         else:
             servo.angle = 180 - angle if self.flip_angles else angle
 
-    def set_target(self, target: Point3D, speed: float) -> None:
-        self.smoother.set_target(target, speed=speed)
+    def set_target(self, target: Point3D, speed: float = None, duration: float = None) -> None:
+        """Sets the target of the foot, with either the speed or the duration of the movement."""
+        self.smoother.set_target(target, speed=speed, duration=duration)
+
+    def hold(self, position: Point3D) -> None:
+        """Tells the smoother that the foot was moved to the position directly, and should stay there."""
+        self.smoother.position = position
+        self.smoother.target = position
+
+    def duration_to(self, target: Point3D, speed: float) -> float:
+        """How long moving the foot to the target at the given speed would take."""
+        return self.smoother.duration_to(target, speed)
+
+    def follow(self, trajectory) -> None:
+        """Moves the foot along a trajectory, e.g. a spline through several waypoints. Needs a `TrajectorySmoother`."""
+        self.smoother.follow(trajectory)
 
     def disable(self) -> None:
         for servo in self.servos:
             servo.angle = None
 
-    def move(self) -> None:
-        """Moves the leg one bit closer to the target, following the position smoother."""
+    def move(self, now: float = None) -> None:
+        """
+        Moves the leg one bit closer to the target, following the position smoother. If given, uses ``now``
+        as the current time instead of reading the clock.
+        """
 
         if self.at_target:
             return
 
-        position = self.smoother.position
+        if self.fixed_point:
+            self._move_um(now)
+            return
+
+        position = self.smoother.position if now is None else self.smoother.update(now)
+
+        try:
+            angles = self.solver.solve(position.x, position.y, position.z)
+        except NoSolution:
+            # Out of reach; move as close to it as possible instead of stopping, like `Base` does
+            angles = self.workspace.solve_clamped(position.x, position.y, position.z)
+        self.set_joint_angles(*angles)
+
+    def _move_um(self, now: float = None) -> None:
+        smoother = self.smoother
+        position = smoother.position_um if now is None else smoother.update_um(now)
+
+        try:
+            angles = self.solver.solve_um(position.x, position.y, position.z)
+        except NoSolution:
+            x, y, z = to_m(position.x), to_m(position.y), to_m(position.z)
+            self.set_joint_angles(*self.workspace.solve_clamped(x, y, z))
+            return
+
+        self.set_joint_angles_mrad(*angles)
+
+    def set_joint_angles_mrad(self, theta0: int, theta1: int, theta2: int) -> None:
+        """Like `set_joint_angles`, with the integer milliradians of `FixedInverseSolver3Dof.solve_um`."""
 
-        theta0, theta1, theta2 = self.solver.solve(position.x, position.y, position.z)
+        count_maps = self._fixed_count_maps
+        if count_maps is None:
+            self.set_joint_angles(to_rad(theta0), to_rad(theta1), to_rad(theta2))
+            return
+
+        servos = self.servos
+        half = 1 << (_COUNT_SHIFT - 1)
+        for j, theta in enumerate((theta0, theta1, theta2)):
+            scale, offset, min_count, max_count = count_maps[j]
+            count = scale * theta + offset
+            if not min_count <= count <= max_count:
+                raise ValueError('Angle out of range')
+            servos[j].set_count((count + half) >> _COUNT_SHIFT)
+
+    def set_joint_angles(self, theta0: float, theta1: float, theta2: float) -> None:
+        """Sets the servo angles from the joint angles (in radians) given by the inverse kinematics solver."""
+
+        count_maps = self._count_maps
+        if count_maps is not None:
+            servos = self.servos
+            for j, theta in enumerate((theta0, theta1, theta2)):
+                scale, offset, min_count, max_count = count_maps[j]
+                count = scale * theta + offset
+                if not min_count <= count <= max_count:
+                    raise ValueError('Angle out of range')
+                servos[j].set_count(round(count))
+            return
 
         theta0 = self.angle_offsets[0] - math.degrees(theta0)
         theta1 = self.angle_offsets[1] - math.degrees(theta1)
@@ -0,0 +1,50 @@
+"""
+Measures the I2C bus time of setting the joint angles of all legs, servo by servo and as one frame.
+
+Run it on the Pico from the REPL with ``from phyto.base.servo_benchmark import servo_benchmark; servo_benchmark()``.
+The legs are held at their rest position, so they don't move. Besides the measured time, it reports the time the
+bytes alone take on the wire, which is the lower bound at the bus frequency.
+"""
+
+import time
+
+from phyto import config
+from phyto.base.leg import REST_POSITION, get_legs
+from phyto.base.servo_controller import get_servo_controller
+from phyto.i2c import BusArbiter, InstrumentedI2C, get_i2c_bus
+
+
+def servo_benchmark(frames: int = 50, i2c_bus=None, bus_freq: int = None) -> None:
+    """
+    ``i2c_bus`` is the bare bus, by default a new one. ``bus_freq`` defaults to the frequency `AdaptiveI2C`
+    selected, if it's used, otherwise the slowest configured one.
+    """
+
+    arbiter = get_i2c_bus(instrumented=True) if i2c_bus is None else BusArbiter(InstrumentedI2C(i2c_bus))
+    bus = arbiter.i2c_bus
+    if bus_freq is None:
+        bus_freq = getattr(bus.i2c_bus, 'frequency', config.I2C_BUS_FREQS[0])
+    servo_controller = get_servo_controller(arbiter)
+    left_legs, right_legs = get_legs(servo_controller)
+    legs = left_legs + right_legs
+    angles = [leg.solver.solve(REST_POSITION.x, REST_POSITION.y, REST_POSITION.z) for leg in legs]
+
+    for name, framed in (('per-servo', False), ('frame', True)):
+        bus.reset_stats()
+        start = time.monotonic()
+        for _ in range(frames):
+            if framed:
+                servo_controller.begin_frame()
+            for leg, leg_angles in zip(legs, angles):
+                leg.set_joint_angles(*leg_angles)
+            if framed:
+                servo_controller.write_frame()
+        elapsed = time.monotonic() - start
+
+        stats = bus.total()
+        wire_time = stats.bits / bus_freq
+        print(
+            f'{name:>10}: {1000 * elapsed / frames:6.2f} ms/frame; {stats.transactions / frames:4.1f} transactions/frame; '
+            f'{stats.bytes_sent / frames:5.1f} bytes/frame; {1000 * wire_time / frames:5.2f} ms/frame on the wire'
+        )
+        bus.print_stats()
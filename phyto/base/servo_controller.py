@@ -1,30 +1,55 @@
+import time
 from abc import abstractmethod
 
 from adafruit_motor.servo import Servo
 from adafruit_pca9685 import PCA9685
-from busio import I2C
-
 from phyto import config
-from phyto.types import I2cAddress
+from phyto.i2c import BusArbiter, FRAMES
+from phyto.types import I2cAddress, TimeFunc
 
 try:
-    from typing import Tuple
+    from typing import Optional, Sequence, Tuple
 except ImportError:
+    Optional = ...
+    Sequence = ...
     Tuple = ...
 
 Channel = int
 
+MODE1_RESTART: int = 0x80
+"""MODE1 bit that reads 1 if PWM was running when the chip went to sleep, and restarts it when 1 is written."""
+
+MODE1_AI: int = 0x20
+"""MODE1 bit that makes the PCA9685 auto-increment the register address after each byte."""
+
+MODE1_SLEEP: int = 0x10
+"""MODE1 bit that stops the oscillator, for low power."""
+
+OSCILLATOR_STARTUP: float = 0.0005
+"""Time the oscillator takes to start up after waking, before PWM can be restarted."""
+
+LED0_ON_L: int = 0x06
+"""First of the four registers of each channel, LEDn_ON_L, LEDn_ON_H, LEDn_OFF_L and LEDn_OFF_H."""
+
+ALL_LED_ON_L: int = 0xFA
+"""First of the four registers that write to the registers of all channels at once."""
+
+FULL_ON_OFF: int = 0x1000
+"""Bit of LEDn_ON or LEDn_OFF that turns a channel fully on or off."""
+
 
 def get_servo_controller(
-        i2c_bus: I2C,
+        i2c_bus: BusArbiter,
         pca9685_0_i2c_address: I2cAddress = config.PCA9685_0_I2C_ADDRESS,
         pca9685_1_i2c_address: I2cAddress = config.PCA9685_1_I2C_ADDRESS,
         pwm_freq: int = config.PCA9685_PWM_FREQ,
 ) -> 'ServoController':
-    servo_controller_0 = PCA9685ServoController(i2c_bus, address=pca9685_0_i2c_address)
+    frame_bus = i2c_bus.get_bus(FRAMES)
+
+    servo_controller_0 = PCA9685ServoController(frame_bus, address=pca9685_0_i2c_address)
     servo_controller_0.frequency = pwm_freq
 
-    servo_controller_1 = PCA9685ServoController(i2c_bus, address=pca9685_1_i2c_address)
+    servo_controller_1 = PCA9685ServoController(frame_bus, address=pca9685_1_i2c_address)
     servo_controller_1.frequency = pwm_freq
 
     return DualServoController(servo_controller_0, servo_controller_1)
@@ -54,14 +79,98 @@ class ServoController:
     def get_servos(self, *channels: int) -> Tuple[Servo, ...]:
         return tuple(self.get_servo(channel) for channel in channels)
 
+    @abstractmethod
+    def begin_frame(self) -> None:
+        """
+        Starts a frame: until `write_frame`, duty cycles set through the servos are only staged, and then
+        written all at once.
+        """
+        ...
+
+    @abstractmethod
+    def write_frame(self, duty_cycles: Sequence[Optional[int]] = None) -> None:
+        """
+        Writes the staged duty cycles, and ends the frame started by `begin_frame`, if any. If given,
+        ``duty_cycles`` holds the 16-bit duty cycle of each channel from channel 0 on, or None to leave it as it is.
+        """
+        ...
+
+    @property
+    def issued_writes(self) -> int:
+        """Channel writes that changed the channel's registers, and were sent to the chip."""
+        return self.get_write_counts()[0]
+
+    @property
+    def skipped_writes(self) -> int:
+        """Channel writes that were dropped, because the channel's registers already held the value."""
+        return self.get_write_counts()[1]
+
+    @abstractmethod
+    def get_write_counts(self) -> Tuple[int, int]:
+        """Returns the numbers of issued and skipped writes."""
+        ...
+
+    @abstractmethod
+    def reset_stats(self) -> None:
+        ...
+
     def disable(self) -> None:
         """Disables all servos."""
         for channel in range(self.channel_count):
             servo = self.get_servo(channel)
             servo.angle = None
 
+    @property
+    def sleeping(self) -> bool:
+        return self.is_sleeping()
+
+    @abstractmethod
+    def is_sleeping(self) -> bool:
+        ...
+
+    @abstractmethod
+    def sleep(self) -> None:
+        """Stops the oscillator to save power. The servos go limp until `wake`."""
+        ...
+
+    @abstractmethod
+    def wake(self) -> None:
+        """Restarts the oscillator, and the PWM outputs where they were before `sleep`."""
+        ...
+
 
 class PCA9685ServoController(PCA9685, ServoController):
+    """
+    Keeps a copy of the channels' registers, so that a frame of duty cycles is written in a single
+    auto-increment burst, from the lowest to the highest changed channel, instead of one transaction per servo.
+
+    Reads come from the copy, and writes that wouldn't change a channel's 12-bit registers are dropped.
+    """
+
+    def __init__(self, *args, **kwargs):
+        PCA9685.__init__(self, *args, **kwargs)
+        self.mode1_reg = MODE1_AI
+
+        # One register address byte followed by the four registers of every channel
+        self._frame_buffer = bytearray(1 + 4 * 16)
+        self._frame_buffer[0] = LED0_ON_L
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(self._frame_buffer, self._frame_buffer, out_end=1, in_start=1)
+
+        self._in_frame = False
+        self._first_changed = 16
+        self._last_changed = -1
+        self.reset_stats()
+
+        self._servos = [None] * 16
+        self._sleeping = False
+
+    def __repr__(self) -> str:
+        return (
+            f'PCA9685ServoController(address=0x{self.i2c_device.device_address:x}; '
+            f'issued_writes={self._issued_writes}; skipped_writes={self._skipped_writes})'
+        )
+
     def __exit__(self, exception_type, exception_value, traceback) -> None:
         self.disable()
         PCA9685.__exit__(self, exception_type, exception_value, traceback)
@@ -69,19 +178,240 @@ class PCA9685ServoController(PCA9685, ServoController):
     def get_channel_count(self) -> int:
         return 16
 
-    def get_servo(self, channel: Channel) -> Servo:
-        return Servo(self.channels[channel])
+    def get_servo(self, channel: Channel) -> 'FrameServo':
+        """Returns the channel's servo, created on first use and reused after that."""
+
+        servo = self._servos[channel]
+        if servo is None:
+            servo = self._servos[channel] = FrameServo(self, channel)
+        return servo
+
+    def disable(self) -> None:
+        """Disables all servos in one write to the ALL_LED registers."""
+
+        with self.i2c_device as i2c:
+            i2c.write(bytes((ALL_LED_ON_L, 0, 0, 0, FULL_ON_OFF >> 8)))
+
+        buffer = self._frame_buffer
+        for channel in range(16):
+            i = 1 + 4 * channel
+            buffer[i] = buffer[i + 1] = buffer[i + 2] = 0
+            buffer[i + 3] = FULL_ON_OFF >> 8
+
+    def is_sleeping(self) -> bool:
+        return self._sleeping
+
+    def sleep(self) -> None:
+        if self._sleeping:
+            return
+
+        self.write_frame()
+        # Writing 1 to RESTART would clear it, so it's masked, like `PCA9685.frequency` does
+        self.mode1_reg = (self.mode1_reg & ~MODE1_RESTART) | MODE1_SLEEP
+        self._sleeping = True
+
+    def wake(self) -> None:
+        """
+        Follows the datasheet's restart sequence: clears SLEEP, waits for the oscillator, then, if PWM was
+        running, sets RESTART to resume it.
+        """
+
+        if not self._sleeping:
+            return
+
+        mode1 = self.mode1_reg
+        self.mode1_reg = mode1 & ~(MODE1_SLEEP | MODE1_RESTART)
+        time.sleep(OSCILLATOR_STARTUP)
+        if mode1 & MODE1_RESTART:
+            self.mode1_reg = (mode1 & ~MODE1_SLEEP) | MODE1_RESTART
+        self._sleeping = False
+
+    def get_duty_cycle(self, channel: Channel) -> int:
+        """The last duty cycle written or staged, without reading it from the chip."""
+
+        buffer, i = self._frame_buffer, 1 + 4 * channel
+        on = buffer[i] | buffer[i + 1] << 8
+        off = buffer[i + 2] | buffer[i + 3] << 8
+        if on == FULL_ON_OFF:
+            return 0xFFFF
+        if off == FULL_ON_OFF:
+            return 0
+        return off << 4
+
+    def set_duty_cycle(self, channel: Channel, value: int) -> None:
+        """Stages the duty cycle during a frame, or else writes it right away."""
+
+        if not 0 <= value <= 0xFFFF:
+            raise ValueError(f'Out of range: value {value} not 0 <= value <= 65,535')
+
+        # Same encoding as `adafruit_pca9685.PWMChannel`
+        if value == 0xFFFF:
+            self._set_registers(channel, FULL_ON_OFF, 0)
+        elif value < 0x0010:
+            self._set_registers(channel, 0, FULL_ON_OFF)
+        else:
+            self._set_registers(channel, 0, value >> 4)
+
+    def set_count(self, channel: Channel, count: int) -> None:
+        """Like `set_duty_cycle`, but with the 12-bit count the channel turns off at, from 1 to 4095."""
+
+        if not 0 < count < 0x1000:
+            raise ValueError(f'Out of range: count {count} not 0 < count < 4,096')
+
+        self._set_registers(channel, 0, count)
+
+    def _set_registers(self, channel: Channel, on: int, off: int) -> None:
+        buffer, i = self._frame_buffer, 1 + 4 * channel
+        on_l, on_h, off_l, off_h = on & 0xFF, on >> 8, off & 0xFF, off >> 8
+        if buffer[i] == on_l and buffer[i + 1] == on_h and buffer[i + 2] == off_l and buffer[i + 3] == off_h:
+            self._skipped_writes += 1
+            return
+
+        buffer[i] = on_l
+        buffer[i + 1] = on_h
+        buffer[i + 2] = off_l
+        buffer[i + 3] = off_h
+        self._issued_writes += 1
+
+        self._first_changed = min(self._first_changed, channel)
+        self._last_changed = max(self._last_changed, channel)
+        if not self._in_frame:
+            self._write_changed()
+
+    def get_write_counts(self) -> Tuple[int, int]:
+        return self._issued_writes, self._skipped_writes
+
+    def reset_stats(self) -> None:
+        self._issued_writes = 0
+        self._skipped_writes = 0
+
+    def begin_frame(self) -> None:
+        self._in_frame = True
+
+    def write_frame(self, duty_cycles: Sequence[Optional[int]] = None) -> None:
+        assert duty_cycles is None or len(duty_cycles) <= 16, len(duty_cycles)
+
+        self._in_frame = True
+        if duty_cycles is not None:
+            for channel, value in enumerate(duty_cycles):
+                if value is not None:
+                    self.set_duty_cycle(channel, value)
+
+        self._in_frame = False
+        self._write_changed()
+
+    def _write_changed(self) -> None:
+        first, last = self._first_changed, self._last_changed
+        if last < first:
+            return
+
+        # The register address goes right before the first changed channel's registers, in place of the last
+        # byte of the channel before it, which is put back afterwards
+        buffer, start = self._frame_buffer, 4 * first
+        saved = buffer[start]
+        buffer[start] = LED0_ON_L + start
+        try:
+            with self.i2c_device as i2c:
+                i2c.write(buffer, start=start, end=1 + 4 * (last + 1))
+        finally:
+            buffer[start] = saved
+
+        self._first_changed = 16
+        self._last_changed = -1
+
+
+class FrameServo(Servo):
+    """
+    Servo on a `PCA9685ServoController` channel, which can also be set straight to a 12-bit count, skipping the
+    angle to duty cycle conversion.
+    """
+
+    channel: Channel
+
+    def __init__(self, controller: PCA9685ServoController, channel: Channel):
+        super().__init__(FrameChannel(controller, channel))
+        self._controller = controller
+        self.channel = channel
+
+    @property
+    def min_count(self) -> float:
+        """Count at an angle of 0, before rounding."""
+        return self._min_duty / 16
+
+    @property
+    def max_count(self) -> float:
+        """Count at an angle of ``actuation_range``, before rounding."""
+        return (self._min_duty + self._duty_range) / 16
+
+    def set_count(self, count: int) -> None:
+        self._controller.set_count(self.channel, count)
+
+
+class FrameChannel:
+    """One channel of a `PCA9685ServoController`, matching the `pwmio.PWMOut` API like `PWMChannel` does."""
+
+    def __init__(self, controller: PCA9685ServoController, channel: Channel):
+        self._controller = controller
+        self._channel = channel
+
+    @property
+    def frequency(self) -> float:
+        return self._controller.frequency
+
+    @property
+    def duty_cycle(self) -> int:
+        return self._controller.get_duty_cycle(self._channel)
+
+    @duty_cycle.setter
+    def duty_cycle(self, value: int) -> None:
+        self._controller.set_duty_cycle(self._channel, value)
 
 
 class DualServoController(ServoController):
-    """Operates like a single, 32-channel servo controller."""
+    """
+    Operates like a single, 32-channel servo controller.
+
+    `write_frame` commits both chips back to back, and records how long each commit takes, and the skew: the
+    time from the end of the first chip's write to the end of the second's, while half of the frame is out.
+    """
 
     servo_controller_0: ServoController
     servo_controller_1: ServoController
+    time_func: TimeFunc
 
-    def __init__(self, servo_controller_0: ServoController, servo_controller_1: ServoController):
+    commits: int
+    max_commit_time: float
+    total_commit_time: float
+    max_skew: float
+    total_skew: float
+
+    def __init__(
+            self,
+            servo_controller_0: ServoController,
+            servo_controller_1: ServoController,
+            time_func: TimeFunc = time.monotonic,
+    ):
         self.servo_controller_0 = servo_controller_0
         self.servo_controller_1 = servo_controller_1
+        self.time_func = time_func
+        self._reset_commit_stats()
+
+    def __repr__(self) -> str:
+        issued, skipped = self.get_write_counts()
+        return (
+            f'DualServoController(issued_writes={issued}; skipped_writes={skipped}; commits={self.commits}; '
+            f'mean_commit_time={self.mean_commit_time * 1000:.2f} ms; '
+            f'max_commit_time={self.max_commit_time * 1000:.2f} ms; '
+            f'mean_skew={self.mean_skew * 1000:.2f} ms; max_skew={self.max_skew * 1000:.2f} ms)'
+        )
+
+    @property
+    def mean_commit_time(self) -> float:
+        return self.total_commit_time / self.commits if self.commits else 0.
+
+    @property
+    def mean_skew(self) -> float:
+        return self.total_skew / self.commits if self.commits else 0.
 
     def __enter__(self) -> 'ServoController':
         self.servo_controller_0.__enter__()
@@ -102,3 +432,63 @@ class DualServoController(ServoController):
             return self.servo_controller_1.get_servo(channel - 16)
         else:
             raise ValueError(f'Invalid channel: {channel}')
+
+    def begin_frame(self) -> None:
+        self.servo_controller_0.begin_frame()
+        self.servo_controller_1.begin_frame()
+
+    def write_frame(self, duty_cycles: Sequence[Optional[int]] = None) -> None:
+        time_func = self.time_func
+        start = time_func()
+
+        if duty_cycles is None:
+            self.servo_controller_0.write_frame()
+            middle = time_func()
+            self.servo_controller_1.write_frame()
+        else:
+            assert len(duty_cycles) <= 32, len(duty_cycles)
+            self.servo_controller_0.write_frame(duty_cycles[:16])
+            middle = time_func()
+            self.servo_controller_1.write_frame(duty_cycles[16:])
+
+        end = time_func()
+        commit_time, skew = end - start, end - middle
+        self.commits += 1
+        self.total_commit_time += commit_time
+        self.total_skew += skew
+        if commit_time > self.max_commit_time:
+            self.max_commit_time = commit_time
+        if skew > self.max_skew:
+            self.max_skew = skew
+
+    def disable(self) -> None:
+        self.servo_controller_0.disable()
+        self.servo_controller_1.disable()
+
+    def is_sleeping(self) -> bool:
+        return self.servo_controller_0.sleeping and self.servo_controller_1.sleeping
+
+    def sleep(self) -> None:
+        self.servo_controller_0.sleep()
+        self.servo_controller_1.sleep()
+
+    def wake(self) -> None:
+        self.servo_controller_0.wake()
+        self.servo_controller_1.wake()
+
+    def get_write_counts(self) -> Tuple[int, int]:
+        issued_0, skipped_0 = self.servo_controller_0.get_write_counts()
+        issued_1, skipped_1 = self.servo_controller_1.get_write_counts()
+        return issued_0 + issued_1, skipped_0 + skipped_1
+
+    def reset_stats(self) -> None:
+        self.servo_controller_0.reset_stats()
+        self.servo_controller_1.reset_stats()
+        self._reset_commit_stats()
+
+    def _reset_commit_stats(self) -> None:
+        self.commits = 0
+        self.max_commit_time = 0.
+        self.total_commit_time = 0.
+        self.max_skew = 0.
+        self.total_skew = 0.
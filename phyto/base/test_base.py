@@ -0,0 +1,241 @@
+import asyncio
+import unittest
+from math import pi
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from phyto import config
+from phyto.base.base import Base, get_base
+from phyto.base.commands import WalkCommands
+from phyto.base.leg import REST_POSITION, get_legs
+from phyto.base.servo_controller import get_servo_controller
+from phyto.control import ControlLoop
+from phyto.i2c import BusArbiter
+from phyto.i2c_sim import get_simulated_i2c_bus
+from phyto.motion import FixedPositionSmoother, TrajectorySmoother
+from phyto.types import Point3D
+
+
+class BaseTest(TestCase):
+    def setUp(self) -> None:
+        self.bus = get_simulated_i2c_bus()
+        self.chips = (
+            self.bus.devices[config.PCA9685_0_I2C_ADDRESS],
+            self.bus.devices[config.PCA9685_1_I2C_ADDRESS],
+        )
+        self.servo_controller = get_servo_controller(BusArbiter(self.bus))
+
+        # The real wiring, with every clock replaced by the fake one
+        self.clock = FakeClock()
+        self.base = get_base(self.servo_controller)
+        self.base.time_func = self.clock
+        self.base.control_loop = ControlLoop(time_func=self.clock, sleep=self.clock.sleep)
+        for leg in self.base.legs:
+            leg.smoother = TrajectorySmoother(leg.position, leg.smoother.speed, time_func=self.clock)
+
+    def run_base(self, coroutine) -> None:
+        asyncio.run(coroutine)
+
+    def assert_feet_at_targets(self) -> None:
+        for i, leg in enumerate(self.base.legs):
+            self.assertTrue(leg.at_target, leg)
+            self.assertTrue(leg.position.almost_equal(self.base.foot_targets[i], tolerance=0.001), leg)
+
+    def assert_chips_match_controller(self) -> None:
+        controllers = self.servo_controller.servo_controller_0, self.servo_controller.servo_controller_1
+        for controller, chip in zip(controllers, self.chips):
+            for channel in range(16):
+                self.assertEqual(controller.get_duty_cycle(channel), chip.get_duty_cycle(channel), (chip, channel))
+
+    def test_legs_in_a_phase_arrive_together(self):
+        targets, speeds = self.base._get_step_phases(0.1, pi / 3)[0]
+        distances = [leg.position.distance(targets[i]) for i, leg in enumerate(self.base.legs)]
+        self.assertGreater(max(distances) - min(distances), 0.02)
+
+        arrivals = [None] * len(self.base.legs)
+        move_legs = self.base._move_legs
+
+        def record_arrivals(legs, now):
+            move_legs(legs, now)
+            for i, leg in enumerate(self.base.legs):
+                if arrivals[i] is None and leg.at_target:
+                    arrivals[i] = self.base.control_loop.ticks
+
+        self.base._move_legs = record_arrivals
+        self.base._set_leg_targets((targets, speeds))
+        self.run_base(self.base._until_legs_reach_targets())
+
+        self.assertGreater(arrivals[0], 1)
+        self.assertEqual([arrivals[0]] * len(self.base.legs), arrivals)
+        self.assert_feet_at_targets()
+
+    def test_step_replays_cached_keyframes(self):
+        cache = self.base.keyframe_cache
+
+        self.run_base(self.base.step(0.1, 0.))
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+        self.assert_feet_at_targets()
+        first_step_end = self.clock.now
+
+        self.run_base(self.base.step(0.1, 0.))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        self.assert_feet_at_targets()
+        self.assertGreater(self.clock.now, first_step_end)
+
+    def test_keyframe_entry_is_timed_like_the_first_phase(self):
+        self.run_base(self.base.walk_gait(0.1, 0., 0.7))
+        cache = self.base.keyframe_cache
+        targets, speeds = self.base._get_step_phases(0.1, cache.bucket_direction(cache.bucket(0.3)))[0]
+        expected = max(leg.duration_to(targets[i], speeds[i]) for i, leg in enumerate(self.base.legs))
+
+        arrivals = [None] * len(self.base.legs)
+        move_legs = self.base._move_legs
+
+        def record_arrivals(legs, now):
+            move_legs(legs, now)
+            for i, leg in enumerate(self.base.legs):
+                if arrivals[i] is None and leg.at_target:
+                    arrivals[i] = now
+
+        self.base._move_legs = record_arrivals
+        start = self.clock.now
+        self.run_base(self.base.step(0.1, 0.3))
+
+        self.assertEqual([arrivals[0]] * len(self.base.legs), arrivals)
+        self.assertAlmostEqual(expected, arrivals[0] - start, delta=2 * self.base.control_loop.period)
+
+    def test_opposite_headings_share_cached_keyframes(self):
+        cache = self.base.keyframe_cache
+
+        self.run_base(self.base.step(0.1, pi))
+        self.run_base(self.base.step(0.1, -pi))
+
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_walk_gait(self):
+        engine = self.base.gait_engine
+
+        self.run_base(self.base.walk_gait(0.1, 0., 1.))
+        self.assertTrue(engine.running)
+        walked_until = self.clock.now
+
+        # Carries on mid-stride
+        self.run_base(self.base.walk_gait(0.1, pi / 4, 0.5))
+        self.assertTrue(engine.running)
+        self.assertAlmostEqual(walked_until + 0.5, self.clock.now, delta=2 * self.base.control_loop.period)
+
+        self.assertFalse(self.base._frame_staged)
+        self.assert_chips_match_controller()
+        self.assert_feet_at_targets()
+
+    def test_walk_stream_stops_when_closed(self):
+        commands = WalkCommands()
+        commands.put(0.1, 0.)
+
+        async def close_later():
+            while self.clock.now < 1.:
+                await asyncio.sleep(0)
+            commands.put(0.05, pi / 2)
+            while self.clock.now < 1.5:
+                await asyncio.sleep(0)
+            commands.close()
+
+        async def run():
+            await asyncio.gather(self.base.walk_stream(commands), close_later())
+
+        self.run_base(run())
+
+        self.assertTrue(self.base.gait_engine.running)
+        self.assertGreaterEqual(self.clock.now, 1.5)
+        self.assertLess(self.clock.now, 1.5 + 2 * self.base.control_loop.period)
+        self.assertFalse(self.base._frame_staged)
+        self.assert_chips_match_controller()
+
+    def test_rest_sleep_and_wake(self):
+        self.run_base(self.base.step(0.1, 0.))
+        self.run_base(self.base.rest(0.1))
+
+        self.assertFalse(self.base.gait_engine.running)
+        self.assert_feet_at_targets()
+        self.assertEqual([0] * 16, [self.chips[0].get_duty_cycle(channel) for channel in range(16)])
+
+        self.base.sleep()
+        self.assertTrue(self.servo_controller.sleeping)
+        self.assertTrue(all(chip.sleeping for chip in self.chips))
+
+        # The next move wakes the chips up, and restarts their PWM
+        self.run_base(self.base.step(0.1, 0.))
+        self.assertFalse(self.servo_controller.sleeping)
+        self.assertFalse(any(chip.sleeping or chip.halted for chip in self.chips))
+        self.assert_chips_match_controller()
+
+    def test_last_frame_is_committed_when_move_ends(self):
+        self.run_base(self.base.step(0.1, pi / 2))
+
+        self.assertFalse(self.base._frame_staged)
+        self.assert_chips_match_controller()
+        self.assertTrue(any(chip.get_duty_cycle(channel) for chip in self.chips for channel in range(16)))
+
+    def test_fixed_point_legs_solve_their_own_angles(self):
+        left_legs, right_legs = get_legs(self.servo_controller, fixed_point=True)
+        for leg in left_legs + right_legs:
+            leg.smoother = FixedPositionSmoother(REST_POSITION, leg.smoother.speed, time_func=self.clock)
+        base = Base(
+            left_legs,
+            right_legs,
+            time_func=self.clock,
+            control_loop=self.base.control_loop,
+            servo_controller=self.servo_controller,
+        )
+        self.assertIsNone(base.solver)
+
+        self.run_base(base.rest(0.1, Point3D(0.1, 0., -0.05)))
+
+        for leg in base.legs:
+            self.assertTrue(leg.position.almost_equal(Point3D(0.1, 0., -0.05)), leg)
+        self.assertFalse(base._frame_staged)
+
+    @parameterized.expand([
+        ('step', lambda base: base.step(0.1, 0.)),
+        ('walk_gait', lambda base: base.walk_gait(0.1, 0., 1.)),
+    ])
+    def test_failed_frame_is_not_left_staged(self, _, move):
+        leg = self.base.legs[3]
+        calls = []
+
+        def set_joint_angles(*angles):
+            calls.append(angles)
+            if len(calls) > 5:
+                raise ValueError('Angle out of range')
+            type(leg).set_joint_angles(leg, *angles)
+
+        leg.set_joint_angles = set_joint_angles
+
+        with self.assertRaises(ValueError):
+            self.run_base(move(self.base))
+
+        self.assertFalse(self.base._frame_staged)
+        self.assert_chips_match_controller()
+
+        # Single servo writes go straight to the chip again
+        for servo in self.base.legs[0].servos:
+            servo.angle = 45
+        self.assert_chips_match_controller()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.now += delay
+        # Lets other tasks run, like asyncio.sleep does
+        await asyncio.sleep(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import asyncio
+import math
+import unittest
+from unittest import TestCase
+
+from phyto.base.commands import WalkCommands
+
+
+class WalkCommandsTest(TestCase):
+    def setUp(self) -> None:
+        self.commands = WalkCommands(0.1, 0., 0.)
+
+    def test_latest_command_replaces_unread_ones(self):
+        self.commands.put_velocity(0.1, 0., 0.5)
+        self.commands.put_velocity(0.05, 0., -0.5)
+
+        self.assertEqual((0.05, 0., -0.5), self.commands.latest)
+        self.assertEqual(2, self.commands.version)
+
+    def test_put_moves_in_direction_without_turning(self):
+        self.commands.put(0.1, math.pi / 2)
+
+        vx, vy, yaw_rate = self.commands.latest
+        self.assertAlmostEqual(0., vx)
+        self.assertAlmostEqual(0.1, vy)
+        self.assertEqual(0., yaw_rate)
+
+    def test_put_after_close_fails(self):
+        self.commands.close()
+
+        self.assertTrue(self.commands.closed)
+        self.assertRaises(AssertionError, self.commands.put_velocity, 0.1, 0., 0.)
+
+    def test_feed_puts_every_command_then_closes(self):
+        async def source():
+            yield 0.1, 0., 0.5
+            yield 0.05, 0., -0.5
+
+        asyncio.run(self.commands.feed(source()))
+
+        self.assertEqual((0.05, 0., -0.5), self.commands.latest)
+        self.assertEqual(2, self.commands.version)
+        self.assertTrue(self.commands.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import math
+import unittest
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from phyto.base.gait import GAITS, GaitEngine, TRIPOD
+from phyto.types import Point3D, PointArray
+
+CENTER = Point3D(0.1, 0, -0.08)
+
+
+class GaitTest(TestCase):
+    @parameterized.expand([(gait.name, gait) for gait in GAITS])
+    def test_each_leg_swings_alone_or_with_its_tripod(self, _, gait):
+        swinging_counts = set()
+        for i in range(600):
+            phase = i / 600
+            swinging = [(phase + offset) % 1 >= gait.duty_factor for offset in gait.phase_offsets]
+            swinging_counts.add(sum(swinging))
+
+        self.assertLessEqual(max(swinging_counts), 3)
+        self.assertGreaterEqual(6 - max(swinging_counts), 3)
+
+
+class GaitEngineTest(TestCase):
+    def setUp(self) -> None:
+        left_legs = (FakeLeg(0.9), FakeLeg(0.), FakeLeg(-0.9))
+        right_legs = (FakeLeg(0.9), FakeLeg(0.), FakeLeg(-0.9))
+        self.engine = GaitEngine(left_legs, right_legs, TRIPOD, cycle_period=1., stride=0.08, center=CENTER)
+
+        self.engine.start(0., PointArray.from_points([CENTER] * 6))
+
+    def run_engine(self, start: float, end: float, dt: float = 0.01) -> list:
+        positions = []
+        steps = round((end - start) / dt)
+        for i in range(1, steps + 1):
+            positions.append(self.engine.update(start + i * dt).to_points())
+        return positions
+
+    def test_center_is_not_shared(self):
+        left_legs = (FakeLeg(0.9), FakeLeg(0.), FakeLeg(-0.9))
+        right_legs = (FakeLeg(0.9), FakeLeg(0.), FakeLeg(-0.9))
+        engine_0 = GaitEngine(left_legs, right_legs)
+        engine_1 = GaitEngine(left_legs, right_legs)
+        center = Point3D(0.1, 0, -0.08)
+
+        engine_0.center.iadd(Point3D(0.01, 0, 0))
+        self.engine.center.iadd(Point3D(0.01, 0, 0))
+
+        self.assertEqual(center, engine_1.center)
+        self.assertEqual(center, CENTER)
+
+    def test_speed_is_limited_by_stride(self):
+        self.engine.set_command(1., 0.)
+        self.assertAlmostEqual(0.16, self.engine.speed)
+        self.assertAlmostEqual(0.16, self.engine.max_speed)
+
+    def test_stance_feet_stay_on_the_ground_and_move_at_speed(self):
+        self.engine.set_command(0.1, 0.)
+        positions = self.run_engine(0., 2.)
+
+        # Leg 0 is in stance for the first half of each cycle
+        for before, after in zip(positions[100:148], positions[101:149]):
+            self.assertAlmostEqual(CENTER.z, after[0].z)
+            self.assertAlmostEqual(0.1 * 0.01, after[0].distance(before[0]), places=6)
+
+    def test_swing_feet_lift_and_touch_down_half_a_stride_ahead(self):
+        self.engine.set_command(0.1, 0.)
+        positions = self.run_engine(0., 2.)
+
+        # Leg 1 swings for the first half of each cycle
+        swing = [p[1] for p in positions[100:150]]
+        self.assertAlmostEqual(CENTER.z + self.engine.step_height, max(p.z for p in swing), places=3)
+
+        touchdown = positions[149][1]
+        self.assertAlmostEqual(CENTER.z, touchdown.z)
+        self.assertAlmostEqual(0.1 * 0.5 / 2, touchdown.distance(CENTER), places=3)
+
+    def test_direction_change_mid_stride_does_not_jump(self):
+        self.engine.set_command(0.16, 0.)
+        positions = self.run_engine(0., 1.25)
+
+        self.engine.set_command(0.16, math.pi / 2)
+        positions += self.run_engine(1.25, 3.)
+
+        for before, after in zip(positions, positions[1:]):
+            for leg in range(6):
+                self.assertLess(after[leg].distance(before[leg]), 0.01)
+
+    @parameterized.expand([
+        (0., 0.),
+        (0.1, 0.),
+        (0.1, 1.),
+        (0.05, -2.5),
+    ])
+    def test_set_command_is_velocity_in_direction(self, speed, direction):
+        self.engine.set_command(speed, direction)
+
+        self.assertAlmostEqual(speed * math.cos(direction), self.engine.vx)
+        self.assertAlmostEqual(speed * math.sin(direction), self.engine.vy)
+        self.assertEqual(0., self.engine.yaw_rate)
+
+    def test_turning_in_place_is_limited_by_foot_speed(self):
+        self.engine.set_velocity(0., 0., 10.)
+
+        self.assertAlmostEqual(self.engine.max_yaw_rate, self.engine.yaw_rate)
+        self.assertAlmostEqual(0., self.engine.speed)
+
+    def test_turning_in_place_moves_stance_feet_around_the_body_center(self):
+        yaw_rate = self.engine.max_yaw_rate / 2
+        self.engine.set_velocity(0., 0., yaw_rate)
+        positions = self.run_engine(0., 2.)
+
+        # Leg 0 is in stance for the first half of each cycle, and moves around the body's center at about the
+        # radius of the center position
+        radius = self.engine.hip_radius + CENTER.x
+        for before, after in zip(positions[100:148], positions[101:149]):
+            self.assertAlmostEqual(CENTER.z, after[0].z)
+            self.assertAlmostEqual(yaw_rate * radius * 0.01, after[0].distance(before[0]), delta=0.00005)
+
+    def test_left_and_right_feet_move_opposite_ways_when_turning(self):
+        self.engine.set_velocity(0., 0., 0.5)
+
+        # Counterclockwise, the left side of the body moves back and the right side forward, and the feet opposite
+        for left, right in ((0, 3), (1, 4), (2, 5)):
+            left_vy = self.engine._foot_velocity(left, CENTER.x, CENTER.y)[1]
+            right_vy = self.engine._foot_velocity(right, CENTER.x, CENTER.y)[1]
+            self.assertGreater(left_vy, 0.)
+            self.assertLess(right_vy, 0.)
+
+    def test_zero_speed_steps_in_place_at_center(self):
+        self.engine.set_command(0.16, 0.5)
+        self.run_engine(0., 1.3)
+
+        self.engine.set_command(0., 0.)
+        positions = self.run_engine(1.3, 2.3)
+
+        for foot in positions[-1]:
+            self.assertAlmostEqual(CENTER.x, foot.x)
+            self.assertAlmostEqual(CENTER.y, foot.y)
+
+
+class FakeLeg:
+    def __init__(self, angle_from_base: float):
+        self.angle_from_base = angle_from_base
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import math
+import unittest
+from array import array
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from phyto.base.keyframes import JOINTS, KeyframeCache, Keyframes, encode_angles
+from phyto.types import PointArray
+
+
+def get_keyframes(*angles: float) -> Keyframes:
+    """Keyframes one unit of time apart, with every joint at the given angle."""
+
+    encoded = array('h', [0] * (len(angles) * JOINTS))
+    for k, angle in enumerate(angles):
+        encode_angles([angle] * JOINTS, encoded, k * JOINTS)
+
+    feet = PointArray.zeros(6)
+    return Keyframes(array('f', range(len(angles))), encoded, feet, feet, array('f', [1.] * 6), 1, feet)
+
+
+class KeyframesTest(TestCase):
+    @parameterized.expand([
+        (-1., 0.),
+        (0., 0.),
+        (0.5, 0.25),
+        (1., 0.5),
+        (1.75, -0.625),
+        (2., -1.),
+        (3., -1.),
+    ])
+    def test_interpolate(self, t, expected):
+        keyframes = get_keyframes(0., 0.5, -1.)
+        angles = [0.] * JOINTS
+
+        keyframes.interpolate(t, angles)
+
+        for angle in angles:
+            self.assertAlmostEqual(expected, angle, places=4)
+
+    def test_duration(self):
+        self.assertEqual(2., get_keyframes(0., 0.5, -1.).duration)
+
+
+class KeyframeCacheTest(TestCase):
+    def setUp(self) -> None:
+        self.keyframes = get_keyframes(0., 1.)
+        self.cache = KeyframeCache(bucket_size=math.radians(5), max_bytes=2 * self.keyframes.nbytes)
+
+    @parameterized.expand([
+        (0., 0),
+        (math.radians(2.4), 0),
+        (math.radians(2.6), 1),
+        (math.radians(-12), -2),
+        (math.pi, -36),
+        (-math.pi, -36),
+        (math.radians(179), -36),
+        (math.radians(-179), -36),
+        (math.radians(177), 35),
+    ])
+    def test_bucket(self, direction, expected):
+        self.assertEqual(expected, self.cache.bucket(direction))
+
+    def test_bucket_direction_is_clamped(self):
+        self.assertAlmostEqual(math.radians(10), self.cache.bucket_direction(2))
+        self.assertAlmostEqual(math.pi, self.cache.bucket_direction(36))
+
+    def test_get_and_stats(self):
+        self.assertIsNone(self.cache.get(1))
+        self.cache.put(1, self.keyframes)
+        self.assertIs(self.keyframes, self.cache.get(1))
+
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+        self.assertEqual(0.5, self.cache.hit_rate)
+        self.assertEqual(self.keyframes.nbytes, self.cache.nbytes)
+
+    def test_evicts_least_recently_used_under_memory_cap(self):
+        self.cache.put(1, get_keyframes(0., 1.))
+        self.cache.put(2, get_keyframes(0., 1.))
+        self.cache.get(1)
+        self.cache.put(3, get_keyframes(0., 1.))
+
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual(1, self.cache.evictions)
+        self.assertIsNotNone(self.cache.get(1))
+        self.assertIsNone(self.cache.get(2))
+        self.assertLessEqual(self.cache.nbytes, self.cache.max_bytes)
+
+    def test_too_large_entry_is_not_cached(self):
+        self.cache.put(1, get_keyframes(*([0.] * 20)))
+        self.assertEqual(0, len(self.cache))
+
+    def test_clear(self):
+        self.cache.put(1, self.keyframes)
+        self.cache.clear()
+
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.nbytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import math
+import time
+import unittest
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from phyto.base.leg import Leg
+from phyto.base.servo_controller import PCA9685ServoController
+from phyto.base.test_servo_controller import FakeI2C
+from phyto.fixedpoint import to_rad
+from phyto.kinematics.fixed import FixedInverseSolver3Dof
+from phyto.kinematics.inverse import InverseSolver3Dof, NoSolution
+from phyto.motion import FixedPositionSmoother
+from phyto.types import Point3D
+
+LINK_LENGTHS = (.032, .090, .112)
+
+
+def get_leg(flip_angles: bool) -> Leg:
+    controller = PCA9685ServoController(FakeI2C(), address=0x40)
+    controller.frequency = 50
+    return Leg(
+        id='test',
+        servos=controller.get_servos(0, 1, 2),
+        solver=InverseSolver3Dof(*LINK_LENGTHS),
+        angle_from_base=0.,
+        angle_offsets=(90 + 5, 90 + 2, 180 + 3),
+        flip_angles=flip_angles,
+    )
+
+
+class LegTest(TestCase):
+    @parameterized.expand([
+        (False, 0., 0., -1.5),
+        (False, 0.3, -0.5, -2.),
+        (True, 0., 0., -1.5),
+        (True, -0.6, 0.7, -0.4),
+    ])
+    def test_count_maps_give_nearest_count_to_servo_angles(self, flip_angles, theta0, theta1, theta2):
+        leg = get_leg(flip_angles)
+        leg.set_joint_angles(theta0, theta1, theta2)
+        counts = [servo._pwm_out.duty_cycle >> 4 for servo in leg.servos]
+
+        # The exact pulse of each servo angle, as `Servo.angle` would set it before truncating
+        offset0, offset1, offset2 = leg.angle_offsets
+        angles = (offset0 - math.degrees(theta0), offset1 - math.degrees(theta1), offset2 + math.degrees(theta2))
+        expected_counts = []
+        for servo, angle in zip(leg.servos, angles):
+            fraction = (180 - angle if flip_angles else angle) / servo.actuation_range
+            expected_counts.append(round((servo._min_duty + fraction * servo._duty_range) / 16))
+
+        self.assertEqual(expected_counts, counts)
+
+    @parameterized.expand([
+        (False, 0.3, -0.5, -2.),
+        (True, -0.6, 0.7, -0.4),
+    ])
+    def test_count_maps_are_within_a_count_of_servo_angles(self, flip_angles, theta0, theta1, theta2):
+        leg = get_leg(flip_angles)
+        leg.set_joint_angles(theta0, theta1, theta2)
+        counts = [servo._pwm_out.duty_cycle >> 4 for servo in leg.servos]
+
+        # `Servo.angle` truncates, where the count maps round
+        reference_leg = get_leg(flip_angles)
+        reference_leg._count_maps = None
+        reference_leg.set_joint_angles(theta0, theta1, theta2)
+        expected_counts = [servo._pwm_out.duty_cycle >> 4 for servo in reference_leg.servos]
+
+        for expected, count in zip(expected_counts, counts):
+            self.assertIn(count - expected, (0, 1))
+
+    @parameterized.expand([
+        (False, 0, 0, -1500),
+        (False, 300, -500, -2000),
+        (True, -600, 700, -400),
+        (True, 123, -457, -1789),
+    ])
+    def test_joint_angles_in_milliradians_give_the_same_counts(self, flip_angles, theta0, theta1, theta2):
+        leg = get_leg(flip_angles)
+        leg.set_joint_angles_mrad(theta0, theta1, theta2)
+
+        expected_leg = get_leg(flip_angles)
+        expected_leg.set_joint_angles(to_rad(theta0), to_rad(theta1), to_rad(theta2))
+
+        self.assertEqual(
+            [servo._pwm_out.duty_cycle for servo in expected_leg.servos],
+            [servo._pwm_out.duty_cycle for servo in leg.servos],
+        )
+
+    def test_fixed_point_move_stays_in_integers(self):
+        leg = get_leg(flip_angles=False)
+        leg.solver = FixedInverseSolver3Dof(*LINK_LENGTHS)
+        leg.smoother = FixedPositionSmoother(Point3D(0.1, 0., -0.05), 0.1)
+        leg.set_target(Point3D(0.12, 0.03, -0.07), duration=0.01)
+
+        def float_solve(x, y, z):
+            raise AssertionError('Solved in floats')
+
+        leg.solver.solve = float_solve
+        leg.move(now=time.monotonic() + 1)
+
+        self.assertTrue(leg.fixed_point)
+        expected_leg = get_leg(flip_angles=False)
+        expected_leg.set_joint_angles(*expected_leg.solver.solve(0.12, 0.03, -0.07))
+        for expected, servo in zip(expected_leg.servos, leg.servos):
+            self.assertAlmostEqual(expected._pwm_out.duty_cycle >> 4, servo._pwm_out.duty_cycle >> 4, delta=1)
+
+    def test_count_maps_reject_angles_out_of_range(self):
+        leg = get_leg(flip_angles=False)
+        self.assertRaises(ValueError, leg.set_joint_angles, math.pi, 0., -1.5)
+
+    def test_move_to_unreachable_target_is_clamped(self):
+        leg = get_leg(flip_angles=False)
+        leg.hold(Point3D(0.1, 0., -0.05))
+        leg.set_target(Point3D(0.3, 0., -0.05), duration=0.01)
+
+        leg.move(now=time.monotonic() + 1)
+
+        position = leg.position
+        self.assertRaises(NoSolution, leg.solver.solve, position.x, position.y, position.z)
+        expected_leg = get_leg(flip_angles=False)
+        expected_leg.set_joint_angles(*leg.workspace.solve_clamped(position.x, position.y, position.z))
+        self.assertEqual(
+            [servo._pwm_out.duty_cycle for servo in expected_leg.servos],
+            [servo._pwm_out.duty_cycle for servo in leg.servos],
+        )
+
+    def test_servos_are_reused(self):
+        leg = get_leg(flip_angles=False)
+        controller = leg.servos[0]._controller
+
+        self.assertIs(leg.servos[1], controller.get_servo(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+import unittest
+from unittest import TestCase
+
+from adafruit_pca9685 import PCA9685
+from parameterized import parameterized
+
+from phyto.base.servo_controller import (
+    ALL_LED_ON_L,
+    DualServoController,
+    LED0_ON_L,
+    MODE1_AI,
+    MODE1_RESTART,
+    MODE1_SLEEP,
+    PCA9685ServoController,
+)
+
+
+class PCA9685ServoControllerTest(TestCase):
+    def setUp(self) -> None:
+        self.bus = FakeI2C()
+        self.bus.registers[0x40][LED0_ON_L + 4 * 9:LED0_ON_L + 4 * 10] = bytes([0, 0, 0x34, 0x01])
+        self.controller = PCA9685ServoController(self.bus, address=0x40)
+        self.bus.writes.clear()
+
+    @parameterized.expand([
+        (0,),
+        (0x0008,),
+        (0x1234,),
+        (0xFFFF,),
+    ])
+    def test_registers_match_pwm_channel(self, duty_cycle):
+        expected_bus = FakeI2C()
+        expected_channel = PCA9685(expected_bus, address=0x40).channels[3]
+        expected_channel.duty_cycle = duty_cycle
+
+        self.controller.set_duty_cycle(3, duty_cycle)
+
+        channel_3 = slice(LED0_ON_L + 4 * 3, LED0_ON_L + 4 * 4)
+        self.assertEqual(expected_bus.registers[0x40][channel_3], self.bus.registers[0x40][channel_3])
+        self.assertEqual(expected_channel.duty_cycle, self.controller.get_duty_cycle(3))
+
+    def test_duty_cycles_are_read_from_the_chip_once(self):
+        self.assertEqual(0x134 << 4, self.controller.get_duty_cycle(9))
+        self.assertEqual(0, len(self.bus.writes))
+
+    def test_servo_writes_outside_a_frame_are_one_transaction_each(self):
+        for servo in self.controller.get_servos(1, 2, 3):
+            servo.angle = 90
+
+        self.assertEqual([(0x40, 5)] * 3, [(address, len(data)) for address, data in self.bus.writes])
+
+    def test_frame_is_written_in_one_burst_from_the_first_changed_channel(self):
+        servos = self.controller.get_servos(4, 7, 5)
+
+        self.controller.begin_frame()
+        for servo in servos:
+            servo.angle = 90
+        self.assertEqual(0, len(self.bus.writes))
+        self.controller.write_frame()
+
+        self.assertEqual(1, len(self.bus.writes))
+        address, data = self.bus.writes[0]
+        self.assertEqual(LED0_ON_L + 4 * 4, data[0])
+        self.assertEqual(1 + 4 * 4, len(data))
+
+        # The channels in between are unchanged
+        self.assertEqual(0x134 << 4, self.controller.get_duty_cycle(9))
+        for servo in servos:
+            self.assertAlmostEqual(90, servo.angle, delta=0.5)
+
+    def test_unchanged_writes_are_skipped(self):
+        servo = self.controller.get_servo(2)
+
+        servo.angle = 90
+        servo.angle = 90
+        self.controller.set_duty_cycle(9, 0x1340)
+
+        self.assertEqual(1, len(self.bus.writes))
+        self.assertEqual(1, self.controller.issued_writes)
+        self.assertEqual(2, self.controller.skipped_writes)
+
+    def test_frame_without_changes_is_not_written(self):
+        self.controller.write_frame([0] * 9 + [0x1340])
+
+        self.assertEqual(0, len(self.bus.writes))
+        self.assertEqual(10, self.controller.skipped_writes)
+
+    def test_reset_stats(self):
+        self.controller.set_duty_cycle(2, 0x2000)
+        self.controller.reset_stats()
+
+        self.assertEqual((0, 0), self.controller.get_write_counts())
+
+    def test_disable_is_one_write(self):
+        self.controller.write_frame([0x2000] * 16)
+        self.bus.writes.clear()
+
+        self.controller.disable()
+
+        self.assertEqual([(0x40, bytes((ALL_LED_ON_L, 0, 0, 0, 0x10)))], self.bus.writes)
+        for channel in range(16):
+            self.assertEqual(0, self.controller.get_duty_cycle(channel))
+
+    def test_sleep_and_wake_restart_pwm(self):
+        self.controller.sleep()
+        self.assertTrue(self.controller.sleeping)
+        self.assertEqual(MODE1_AI | MODE1_SLEEP, self.bus.registers[0x40][0])
+
+        # The chip sets RESTART when it goes to sleep with PWM running
+        self.bus.registers[0x40][0] |= MODE1_RESTART
+        self.bus.writes.clear()
+
+        self.controller.wake()
+
+        self.assertFalse(self.controller.sleeping)
+        self.assertEqual([bytes((0, MODE1_AI)), bytes((0, MODE1_AI | MODE1_RESTART))],
+                         [data for _, data in self.bus.writes])
+
+    def test_sleep_does_not_write_restart(self):
+        self.bus.registers[0x40][0] = MODE1_AI | MODE1_RESTART
+
+        self.controller.sleep()
+
+        self.assertEqual([bytes((0, MODE1_AI | MODE1_SLEEP))], [data for _, data in self.bus.writes])
+
+    def test_wake_when_awake_does_nothing(self):
+        self.controller.wake()
+        self.assertEqual(0, len(self.bus.writes))
+
+    def test_write_frame_with_duty_cycles(self):
+        self.controller.write_frame([None, 0x2000, None, 0x3000])
+
+        self.assertEqual(1, len(self.bus.writes))
+        self.assertEqual(0x2000, self.controller.get_duty_cycle(1))
+        self.assertEqual(0x3000, self.controller.get_duty_cycle(3))
+
+
+class DualServoControllerTest(TestCase):
+    def test_frame_is_one_burst_per_chip(self):
+        bus = FakeI2C()
+        controller = DualServoController(
+            PCA9685ServoController(bus, address=0x40),
+            PCA9685ServoController(bus, address=0x41),
+        )
+        bus.writes.clear()
+
+        controller.write_frame([0x2000] * 32)
+
+        self.assertEqual([0x40, 0x41], [address for address, _ in bus.writes])
+        self.assertEqual(0x2000, controller.get_servo(31)._pwm_out.duty_cycle)
+
+        controller.write_frame([0x2000] * 30 + [0x3000] * 2)
+        self.assertEqual(3, len(bus.writes))
+        self.assertEqual((34, 30), controller.get_write_counts())
+
+    def test_commit_time_and_skew(self):
+        bus = FakeI2C()
+        times = iter([0., 0.004, 0.006, 1., 1.001, 1.003])
+        controller = DualServoController(
+            PCA9685ServoController(bus, address=0x40),
+            PCA9685ServoController(bus, address=0x41),
+            time_func=lambda: next(times),
+        )
+
+        controller.write_frame([0x2000] * 32)
+        controller.write_frame([0x3000] * 32)
+
+        self.assertEqual(2, controller.commits)
+        self.assertAlmostEqual(0.006, controller.max_commit_time)
+        self.assertAlmostEqual(0.0045, controller.mean_commit_time)
+        self.assertAlmostEqual(0.002, controller.max_skew)
+        self.assertAlmostEqual(0.002, controller.mean_skew)
+
+        controller.reset_stats()
+        self.assertEqual(0, controller.commits)
+        self.assertEqual(0., controller.max_skew)
+
+
+class FakeI2C:
+    """Register-level model of PCA9685s with auto-increment on, recording the writes."""
+
+    def __init__(self):
+        self.registers = {0x40: bytearray(256), 0x41: bytearray(256)}
+        self.writes = []
+
+        # Power-on defaults: every channel fully off, and prescale for 200 Hz
+        for registers in self.registers.values():
+            for channel in range(16):
+                registers[LED0_ON_L + 4 * channel + 3] = 0x10
+            registers[0xFE] = 0x1E
+
+    def try_lock(self) -> bool:
+        return True
+
+    def unlock(self) -> None:
+        pass
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        data = bytes(buffer[start:end])
+        if not data:
+            return
+
+        self.writes.append((address, data))
+        register = data[0]
+        self.registers[address][register:register + len(data) - 1] = data[1:]
+
+    def writeto_then_readfrom(self, address: int, out_buffer, in_buffer, *, out_start: int = 0,
+                              out_end: int = None, in_start: int = 0, in_end: int = None) -> None:
+        register = out_buffer[out_start]
+        in_end = len(in_buffer) if in_end is None else in_end
+        in_buffer[in_start:in_end] = self.registers[address][register:register + in_end - in_start]
+
+
+if __name__ == '__main__':
+    unittest.main()
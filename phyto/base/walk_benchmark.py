@@ -0,0 +1,99 @@
+"""
+Measures how long the light-seeking policies take to reach a light, in simulated time.
+
+Only the gait engine runs, not the servos: the body is assumed to move at the velocity the engine commands
+its stance feet with, and the eyes are simulated with each sensor reading the cosine of the light's bearing
+from it. Run it on the host with ``python3 -m phyto.base.walk_benchmark``.
+"""
+
+import math
+
+from phyto.base.commands import face_direction
+from phyto.base.gait import GaitEngine
+from phyto.base.leg import ANGLE_FROM_BASE
+from phyto.eyes import Eye, Eyes
+from phyto.types import PointArray
+
+BEARINGS = (0, 45, 90, 135, 180)
+"""Bearings of the light at the start, in degrees counterclockwise from straight ahead."""
+
+DISTANCE: float = 1.
+"""Distance to the light at the start."""
+
+REACHED: float = 0.1
+"""Distance to the light that counts as reaching it."""
+
+
+def walk_benchmark(dt: float = 0.02, steer_period: float = 0.1, timeout: float = 120.) -> None:
+    speed = 0.1
+
+    def translate(direction: float) -> tuple:
+        return speed * math.cos(direction), speed * math.sin(direction), 0.
+
+    def face(direction: float) -> tuple:
+        return face_direction(speed, direction)
+
+    print(' ' * 10 + ''.join(f'{bearing:>7}°' for bearing in BEARINGS))
+    for name, policy in (('translate', translate), ('face', face)):
+        times = [time_to_light(policy, math.radians(b), dt, steer_period, timeout) for b in BEARINGS]
+        print(f'{name:>10}' + ''.join(f'{t:7.1f}s' for t in times))
+
+
+def time_to_light(policy, bearing: float, dt: float, steer_period: float, timeout: float) -> float:
+    """Returns the simulated time for the policy to bring the body within `REACHED` of the light."""
+
+    engine = GaitEngine(*get_fake_legs())
+    engine.start(0., PointArray.from_points([engine.center] * 6))
+
+    light_x, light_y = DISTANCE * math.cos(bearing), DISTANCE * math.sin(bearing)
+    x, y, heading = 0., 0., 0.
+    eyes = Eyes(FakeEye(math.radians(60)), FakeEye(math.radians(-60)), FakeEye(math.pi))
+
+    t = 0.
+    next_steer = 0.
+    while t < timeout:
+        dx, dy = light_x - x, light_y - y
+        if math.sqrt(dx * dx + dy * dy) <= REACHED:
+            return t
+
+        if t >= next_steer:
+            next_steer += steer_period
+            light_bearing = math.atan2(dy, dx) - heading
+            for eye in (eyes.left_eye, eyes.right_eye, eyes.back_eye):
+                eye.light_bearing = light_bearing
+            engine.set_velocity(*policy(eyes.read().brightest_direction))
+
+        t += dt
+        engine.update(t)
+
+        cos_h, sin_h = math.cos(heading), math.sin(heading)
+        x += (engine.vx * cos_h - engine.vy * sin_h) * dt
+        y += (engine.vx * sin_h + engine.vy * cos_h) * dt
+        heading += engine.yaw_rate * dt
+
+    return timeout
+
+
+def get_fake_legs() -> tuple:
+    angles = (ANGLE_FROM_BASE, 0., -ANGLE_FROM_BASE)
+    return tuple(FakeLeg(a) for a in angles), tuple(FakeLeg(a) for a in angles)
+
+
+class FakeLeg:
+    def __init__(self, angle_from_base: float):
+        self.angle_from_base = angle_from_base
+
+
+class FakeEye(Eye):
+    """Reads the cosine of the light's bearing from the direction the eye faces, or 0 from behind it."""
+
+    def __init__(self, angle: float):
+        self.angle = angle
+        self.light_bearing = 0.
+
+    def read(self) -> float:
+        return max(0., math.cos(self.light_bearing - self.angle))
+
+
+if __name__ == '__main__':
+    walk_benchmark()
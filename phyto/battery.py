@@ -31,9 +31,12 @@ class Battery:
     def voltage(self) -> float:
         return self.adc.read(self.channel)
 
-    @property
-    def voltage_is_low(self) -> bool:
-        return self.voltage <= self.low_voltage
+    async def read_voltage(self) -> float:
+        """Reads the voltage in an idle gap on the bus."""
+        return await self.adc.read_when_idle(self.channel)
+
+    async def is_low(self) -> bool:
+        return await self.read_voltage() <= self.low_voltage
 
 
 class Batteries:
@@ -55,13 +58,15 @@ class BatteryMonitor:
 
     async def run(self):
         while True:
-            if self.batteries.logic_battery.voltage_is_low:
-                print(f'WARN: Logic battery is low! voltage={self.batteries.logic_battery.voltage}')
+            voltage = await self.batteries.logic_battery.read_voltage()
+            if voltage <= self.batteries.logic_battery.low_voltage:
+                print(f'WARN: Logic battery is low! voltage={voltage}')
                 await self.buzzer.chirp(1)
                 await asyncio.sleep(1)
 
-            if self.batteries.motor_battery.voltage_is_low:
-                print(f'WARN: Motor battery is low! voltage={self.batteries.motor_battery.voltage}')
+            voltage = await self.batteries.motor_battery.read_voltage()
+            if voltage <= self.batteries.motor_battery.low_voltage:
+                print(f'WARN: Motor battery is low! voltage={voltage}')
                 await self.buzzer.chirp(2)
 
             await asyncio.sleep(60)
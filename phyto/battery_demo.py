@@ -15,6 +15,7 @@ def battery_demo():
                     ('Logic battery', batteries.logic_battery),
                     ('Motor battery', batteries.motor_battery),
             ):
-                print(f'{name}: {battery.voltage} (is_low={battery.voltage_is_low})')
+                voltage = battery.voltage
+                print(f'{name}: {voltage} (is_low={voltage <= battery.low_voltage})')
             print()
             time.sleep(1)
@@ -27,13 +27,33 @@ except AttributeError:
 
     BUZZER_PIN: Pin = ...
 
-I2C_BUS_FREQ: int = 100000
+I2C_BUS_FREQS: tuple = (100000, 400000)
+"""
+Bus frequencies to try at startup, slowest first. The fastest that passes `I2C_BUS_PROBES` is used, falling back
+to slower ones on errors. The PCA9685s support 1 MHz, but the ADS7830 on the same bus only 400 kHz.
+"""
+
+I2C_INSTRUMENTED: bool = False
+"""Record per-address I2C transaction statistics. See `phyto.i2c.InstrumentedI2C`."""
+
+IK_LOOKUP_TABLE_PATH: str = 'ik_table.bin'
 
 PCA9685_0_I2C_ADDRESS: I2cAddress = 0x40
 PCA9685_1_I2C_ADDRESS: I2cAddress = 0x41
 PCA9685_PWM_FREQ: int = 50
+CONTROL_LOOP_RATE: int = PCA9685_PWM_FREQ
 
 ADS7830_I2C_ADDRESS: I2cAddress = 0x48
 LOGIC_BATTERY_CHANNEL: int = 4
 MOTOR_BATTERY_CHANNEL: int = 0
 LOW_BATTERY_VOLTAGE: float = 3.2 * 2
+
+I2C_BUS_PROBES: dict = {
+    PCA9685_0_I2C_ADDRESS: 0x02,
+    PCA9685_1_I2C_ADDRESS: 0x02,
+    ADS7830_I2C_ADDRESS: None,
+}
+"""
+Devices that verify each bus frequency, with a register that can be written and read back: the PCA9685s'
+SUBADR1, which they ignore unless told to respond to it. The ADS7830 has no readable registers, so it's only read.
+"""
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+from phyto import config
+from phyto.asyncio import be_nice
+from phyto.types import TimeFunc
+
+try:
+    from typing import Awaitable, Callable
+
+    SleepFunc = Callable[[float], Awaitable[None]]
+except ImportError:
+    Awaitable = ...
+    Callable = ...
+
+    SleepFunc = ...
+
+
+class ControlLoop:
+    """
+    Paces a control loop at a fixed rate, e.g. once per servo PWM period, sleeping until each deadline
+    instead of spinning on the event loop.
+
+    Each `tick` returns one timestamp for the whole tick, so everything computed in the tick sees the same
+    time. Records how late each tick was (jitter) and how many ticks missed their deadline by more than a
+    whole period (overruns); missed deadlines are skipped rather than run back to back.
+    """
+
+    period: float
+    time_func: TimeFunc
+    sleep: SleepFunc
+
+    ticks: int
+    overruns: int
+    max_jitter: float
+    total_jitter: float
+
+    def __init__(
+            self,
+            rate: float = config.CONTROL_LOOP_RATE,
+            time_func: TimeFunc = time.monotonic,
+            sleep: SleepFunc = asyncio.sleep,
+    ):
+        assert rate > 0, rate
+
+        self.period = 1 / rate
+        self.time_func = time_func
+        self.sleep = sleep
+
+        self._deadline = None
+        self._last_tick = None
+        self.reset_stats()
+
+    @property
+    def rate(self) -> float:
+        return 1 / self.period
+
+    @property
+    def mean_jitter(self) -> float:
+        return self.total_jitter / self.ticks if self.ticks else 0.
+
+    def __repr__(self) -> str:
+        return (
+            f'ControlLoop(rate={self.rate:.0f} Hz; ticks={self.ticks}; overruns={self.overruns}; '
+            f'mean_jitter={self.mean_jitter * 1000:.2f} ms; max_jitter={self.max_jitter * 1000:.2f} ms)'
+        )
+
+    def reset_stats(self) -> None:
+        self.ticks = 0
+        self.overruns = 0
+        self.max_jitter = 0.
+        self.total_jitter = 0.
+
+    def start(self) -> None:
+        """
+        Call before a run of ticks. If the loop has been idle for more than a period, the next tick runs
+        right away and the schedule restarts from it, so the idle time doesn't count as an overrun.
+        """
+
+        if self._last_tick is not None and self.time_func() - self._last_tick > self.period:
+            self._deadline = None
+
+    async def tick(self) -> float:
+        """
+        Waits until the next deadline, and returns the time of the tick. Always yields to the event loop, even
+        when late, so an overrunning loop doesn't starve the other tasks.
+        """
+
+        now = self.time_func()
+        if self._deadline is None:
+            self._deadline = now
+
+        delay = self._deadline - now
+        if delay > 0:
+            await self.sleep(delay)
+        else:
+            await be_nice()
+        now = self.time_func()
+
+        jitter = now - self._deadline
+        self.ticks += 1
+        self.total_jitter += jitter
+        if jitter > self.max_jitter:
+            self.max_jitter = jitter
+
+        if jitter >= self.period:
+            self.overruns += 1
+            self._deadline += (jitter // self.period) * self.period
+
+        self._deadline += self.period
+        self._last_tick = now
+        return now
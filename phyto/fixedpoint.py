@@ -0,0 +1,147 @@
+"""
+Integer math for the kinematics and smoothing chain on FPU-less targets like the RP2040.
+
+Lengths are integer micrometres and angles are integer milliradians. Sines and cosines are Q14 integers,
+i.e. ``16384`` is ``1.0``. Trig functions are table lookups with linear interpolation, and square roots are
+integer Newton iterations. Squared lengths are taken in 16 µm units, so intermediates normally stay below
+``2 ** 30`` and remain small ints on the microcontroller.
+"""
+
+import math
+
+UM_PER_M: int = 1000000
+
+ONE: int = 1 << 14
+"""1.0 in Q14."""
+
+_SQUARE_SHIFT: int = 4
+"""Lengths are shifted right by this many bits before being squared."""
+
+_BAM_PER_MRAD_Q10: int = 10681
+"""Binary angle units (65536 per turn) per milliradian, in Q10. Makes wrapping around a turn exact."""
+
+_SIN_TABLE = tuple(round(math.sin(i * math.pi / 512) * ONE) for i in range(258))
+"""Q14 sine of a quarter turn in steps of 64 binary angle units, plus one extra entry past the end."""
+
+_ATAN_STEP_BITS: int = 8
+_ATAN_TABLE = tuple(round(math.atan(i / (ONE >> _ATAN_STEP_BITS)) * 1000000) for i in range((ONE >> _ATAN_STEP_BITS) + 1))
+"""Arctangent in µrad of 0, 1/64, 2/64, ... 1."""
+
+_HALF_PI_URAD: int = 1570796
+_PI_URAD: int = 3141593
+
+
+def to_um(meters: float) -> int:
+    return int(round(meters * UM_PER_M))
+
+
+def to_m(micrometers: int) -> float:
+    return micrometers / UM_PER_M
+
+
+def to_mrad(radians: float) -> int:
+    return int(round(radians * 1000))
+
+
+def to_rad(milliradians: int) -> float:
+    return milliradians / 1000
+
+
+def isqrt(n: int) -> int:
+    """Floor of the square root of a non-negative integer."""
+
+    if n < 2:
+        if n < 0:
+            raise ValueError(f'Square root of negative number: {n}')
+        return n
+
+    # Start from a power of two at or above the root, then Newton iterations only decrease
+    x, t = 1, n
+    while t > 3:
+        t >>= 2
+        x <<= 1
+    x <<= 1
+
+    y = (x + n // x) >> 1
+    while y < x:
+        x = y
+        y = (x + n // x) >> 1
+
+    return x
+
+
+def norm_um(x: int, y: int, z: int = 0) -> int:
+    """Euclidean norm of a vector of micrometres, with 16 µm resolution."""
+
+    x >>= _SQUARE_SHIFT
+    y >>= _SQUARE_SHIFT
+    z >>= _SQUARE_SHIFT
+    return isqrt(x * x + y * y + z * z) << _SQUARE_SHIFT
+
+
+def sin_q14(theta: int) -> int:
+    """Q14 sine of an angle in milliradians."""
+    return _sin_bam((theta * _BAM_PER_MRAD_Q10) >> 10)
+
+
+def cos_q14(theta: int) -> int:
+    """Q14 cosine of an angle in milliradians."""
+    return _sin_bam(((theta * _BAM_PER_MRAD_Q10) >> 10) + 0x4000)
+
+
+def _sin_bam(angle: int) -> int:
+    """Q14 sine of an angle in binary angle units."""
+
+    angle &= 0xFFFF
+    quadrant = angle >> 14
+    angle &= 0x3FFF
+    if quadrant & 1:
+        angle = 0x4000 - angle
+
+    i = angle >> 6
+    a = _SIN_TABLE[i]
+    value = a + (((_SIN_TABLE[i + 1] - a) * (angle & 0x3F)) >> 6)
+
+    return -value if quadrant & 2 else value
+
+
+def atan2_mrad(y: int, x: int) -> int:
+    """Arctangent of ``y / x`` in milliradians, in the range [-pi, pi]. Units of ``x`` and ``y`` don't matter."""
+
+    ax, ay = abs(x), abs(y)
+    if ax == 0 and ay == 0:
+        return 0
+
+    while ax >= 1 << 16 or ay >= 1 << 16:
+        ax >>= 4
+        ay >>= 4
+
+    if ay <= ax:
+        angle = _atan_urad((ay << 14) // ax)
+    else:
+        angle = _HALF_PI_URAD - _atan_urad((ax << 14) // ay)
+
+    if x < 0:
+        angle = _PI_URAD - angle
+
+    angle = (angle + 500) // 1000
+    return -angle if y < 0 else angle
+
+
+def _atan_urad(t: int) -> int:
+    """Arctangent in µrad of a Q14 ratio in the range [0, 1]."""
+
+    i = t >> _ATAN_STEP_BITS
+    frac = t & ((1 << _ATAN_STEP_BITS) - 1)
+    if frac == 0:
+        return _ATAN_TABLE[i]
+
+    a = _ATAN_TABLE[i]
+    return a + (((_ATAN_TABLE[i + 1] - a) * frac) >> _ATAN_STEP_BITS)
+
+
+def acos_mrad(c: int) -> int:
+    """Arccosine in milliradians, in the range [0, pi], of a Q14 value. Clamps values outside of [-1, 1]."""
+
+    c = -ONE if c < -ONE else ONE if c > ONE else c
+    return atan2_mrad(isqrt(ONE * ONE - c * c), c)
@@ -1,20 +1,621 @@
+import asyncio
+import time
 from time import sleep
 
 from busio import I2C
 
 from phyto import config
-from phyto.types import Pin
+from phyto.types import I2cAddress, Pin, TimeFunc
+
+try:
+    from typing import Callable, Dict, List, Optional, Sequence
+
+    TimeNsFunc = Callable[[], int]
+    I2CFactory = Callable[[Pin, Pin, int], I2C]
+except ImportError:
+    Callable = ...
+    Dict = ...
+    List = ...
+    Optional = ...
+    Sequence = ...
+
+    I2CFactory = ...
+
+    TimeNsFunc = ...
+
+Priority = int
+
+FRAMES: Priority = 0
+"""Servo frames. Never deferred."""
+
+TELEMETRY: Priority = 1
+"""Sensor reads, e.g. battery voltages. Deferred to the idle gaps between servo frames."""
 
 
 def get_i2c_bus(
         scl: Pin = config.I2C_BUS_SCL,
         sda: Pin = config.I2C_BUS_SDA,
-        freq: int = config.I2C_BUS_FREQ,
-) -> I2C:
+        freqs: Sequence[int] = config.I2C_BUS_FREQS,
+        instrumented: bool = config.I2C_INSTRUMENTED,
+) -> 'BusArbiter':
+    """
+    With more than one of ``freqs``, the bus runs at the fastest that works, see `AdaptiveI2C`.
+
+    If ``instrumented``, the bus records per-address statistics, which ``i2c_bus.i2c_bus.print_stats()`` prints.
+    Otherwise, the arbiter uses the bus directly, at no extra cost.
+    """
+
     while True:
         try:
-            return I2C(scl, sda, frequency=freq)
+            if len(freqs) > 1:
+                i2c_bus = AdaptiveI2C(scl, sda, freqs)
+                print(f'I2C bus frequency: {i2c_bus.frequency} Hz')
+            else:
+                i2c_bus = I2C(scl, sda, frequency=freqs[0])
+            return BusArbiter(InstrumentedI2C(i2c_bus) if instrumented else i2c_bus)
         except RuntimeError as e:
             print(f'Error creating I2C bus; error={e}')
             print('Retrying...')
             sleep(1)
+
+
+ETIMEDOUT: int = 110
+"""Error number of the `OSError` that a bus timeout raises. Other errors are NACKs."""
+
+
+def _create_i2c(scl: Pin, sda: Pin, frequency: int) -> I2C:
+    return I2C(scl, sda, frequency=frequency)
+
+
+class AdaptiveI2C:
+    """
+    Runs the bus at the fastest of the given frequencies that works, with the same API as `busio.I2C`.
+
+    At startup, it tries each frequency, slowest first, and keeps the fastest at which every probe passes:
+    registers written to and read back, or plain reads, see `config.I2C_BUS_PROBES`. The slowest frequency is
+    always kept. While running, it counts the NACKs and timeouts, and when more than ``max_window_errors``
+    happen within ``window`` transactions, it drops to the next slower frequency once the bus is unlocked.
+    Errors are still raised to the caller.
+    """
+
+    scl: Pin
+    sda: Pin
+    frequencies: Sequence[int]
+    probes: Dict[I2cAddress, Optional[int]]
+
+    frequency: int
+    i2c_bus: I2C
+
+    window: int
+    max_window_errors: int
+
+    transactions: int
+    nacks: int
+    timeouts: int
+    fallbacks: int
+
+    def __init__(
+            self,
+            scl: Pin,
+            sda: Pin,
+            frequencies: Sequence[int],
+            probes: Dict[I2cAddress, Optional[int]] = config.I2C_BUS_PROBES,
+            window: int = 200,
+            max_window_errors: int = 3,
+            i2c_factory: I2CFactory = _create_i2c,
+    ):
+        assert len(frequencies) > 0, frequencies
+        assert list(frequencies) == sorted(frequencies), frequencies
+
+        self.scl = scl
+        self.sda = sda
+        self.frequencies = frequencies
+        self.probes = probes
+        self.window = window
+        self.max_window_errors = max_window_errors
+        self._i2c_factory = i2c_factory
+
+        self.transactions = 0
+        self.nacks = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+        self._window_transactions = 0
+        self._window_errors = 0
+        self._fallback_pending = False
+
+        self._set_frequency(self._select_frequency())
+
+    def __repr__(self) -> str:
+        return (
+            f'AdaptiveI2C(frequency={self.frequency}; transactions={self.transactions}; nacks={self.nacks}; '
+            f'timeouts={self.timeouts}; fallbacks={self.fallbacks})'
+        )
+
+    def deinit(self) -> None:
+        self.i2c_bus.deinit()
+
+    def _select_frequency(self) -> int:
+        """Returns the index of the fastest frequency that passes the probes."""
+
+        best = 0
+        for i, frequency in enumerate(self.frequencies):
+            i2c_bus = self._i2c_factory(self.scl, self.sda, frequency)
+            try:
+                passed = self._probe(i2c_bus)
+            finally:
+                i2c_bus.deinit()
+
+            if not passed:
+                if i == 0:
+                    print(f'WARN: I2C bus probes failed at the slowest frequency, {frequency} Hz')
+                break
+            best = i
+
+        return best
+
+    def _probe(self, i2c_bus: I2C) -> bool:
+        while not i2c_bus.try_lock():
+            pass
+
+        buffer = bytearray(1)
+        try:
+            for address, register in self.probes.items():
+                if register is None:
+                    i2c_bus.readfrom_into(address, buffer)
+                    continue
+
+                i2c_bus.writeto_then_readfrom(address, bytes((register,)), buffer)
+                original = buffer[0]
+                for pattern in (0x55, 0xAA, original):
+                    i2c_bus.writeto(address, bytes((register, pattern)))
+                    i2c_bus.writeto_then_readfrom(address, bytes((register,)), buffer)
+                    if buffer[0] != pattern:
+                        return False
+        except OSError:
+            return False
+        finally:
+            i2c_bus.unlock()
+
+        return True
+
+    def _set_frequency(self, index: int) -> None:
+        self._index = index
+        self.frequency = self.frequencies[index]
+        self.i2c_bus = self._i2c_factory(self.scl, self.sda, self.frequency)
+
+    def _fall_back(self) -> None:
+        self._fallback_pending = False
+        self._window_transactions = 0
+        self._window_errors = 0
+        self.fallbacks += 1
+
+        self.i2c_bus.deinit()
+        self._set_frequency(self._index - 1)
+        print(f'WARN: Too many I2C errors; falling back to {self.frequency} Hz. {self}')
+
+    def _count_transaction(self) -> None:
+        self.transactions += 1
+        self._window_transactions += 1
+        if self._window_transactions >= self.window:
+            self._window_transactions = 0
+            self._window_errors = 0
+
+    def _failed(self, error: OSError) -> None:
+        if error.errno == ETIMEDOUT:
+            self.timeouts += 1
+        else:
+            self.nacks += 1
+
+        self._window_errors += 1
+        if self._window_errors > self.max_window_errors and self._index > 0:
+            self._fallback_pending = True
+        self._count_transaction()
+
+    def try_lock(self) -> bool:
+        return self.i2c_bus.try_lock()
+
+    def unlock(self) -> None:
+        self.i2c_bus.unlock()
+        if self._fallback_pending:
+            self._fall_back()
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        try:
+            self.i2c_bus.writeto(address, buffer, start=start, end=len(buffer) if end is None else end)
+        except OSError as e:
+            self._failed(e)
+            raise
+        self._count_transaction()
+
+    def readfrom_into(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        try:
+            self.i2c_bus.readfrom_into(address, buffer, start=start, end=len(buffer) if end is None else end)
+        except OSError as e:
+            self._failed(e)
+            raise
+        self._count_transaction()
+
+    def writeto_then_readfrom(self, address: int, out_buffer, in_buffer, *, out_start: int = 0,
+                              out_end: int = None, in_start: int = 0, in_end: int = None) -> None:
+        try:
+            self.i2c_bus.writeto_then_readfrom(
+                address,
+                out_buffer,
+                in_buffer,
+                out_start=out_start,
+                out_end=len(out_buffer) if out_end is None else out_end,
+                in_start=in_start,
+                in_end=len(in_buffer) if in_end is None else in_end,
+            )
+        except OSError as e:
+            self._failed(e)
+            raise
+        self._count_transaction()
+
+
+def transaction_bits(sent: int, received: int, addressings: int = 1) -> int:
+    """
+    Clocks a transaction takes on the wire: nine per byte, for the data and the acknowledgement, address bytes
+    included, plus a start bit per addressing and a stop bit. A write then read addresses the device twice.
+    """
+    return 9 * (sent + received + addressings) + addressings + 1
+
+
+LATENCY_BUCKETS: tuple = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+"""Upper bounds of the latency histogram buckets, in microseconds. Longer transactions go in one more bucket."""
+
+
+class I2CStats:
+    """Transaction statistics of one I2C address."""
+
+    transactions: int
+    bytes_sent: int
+    bytes_received: int
+
+    bits: int
+    """Clocks on the wire, see `transaction_bits`."""
+
+    total_latency: int
+    max_latency: int
+    """In microseconds, from the start of the transaction's call to its return."""
+
+    histogram: List[int]
+    """Transactions per `LATENCY_BUCKETS` bucket, plus the overflow bucket."""
+
+    def __init__(self):
+        self.transactions = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.bits = 0
+        self.total_latency = 0
+        self.max_latency = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def __repr__(self) -> str:
+        return (
+            f'I2CStats(transactions={self.transactions}; sent={self.bytes_sent} B; '
+            f'received={self.bytes_received} B; mean_latency={self.mean_latency:.0f} us; '
+            f'p99_latency<={self.percentile(0.99)} us; max_latency={self.max_latency} us)'
+        )
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.transactions if self.transactions else 0.
+
+    def percentile(self, fraction: float) -> int:
+        """
+        Upper bound of the histogram bucket that the given fraction of the transactions are in or below,
+        in microseconds. In the overflow bucket, the max latency.
+        """
+
+        count = fraction * self.transactions
+        below = 0
+        for bound, n in zip(LATENCY_BUCKETS, self.histogram):
+            below += n
+            if below >= count:
+                return bound
+        return self.max_latency
+
+    def record(self, sent: int, received: int, latency: int, addressings: int = 1) -> None:
+        self.transactions += 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.bits += transaction_bits(sent, received, addressings)
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+        histogram = self.histogram
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                histogram[i] += 1
+                return
+        histogram[-1] += 1
+
+    def copy(self) -> 'I2CStats':
+        stats = I2CStats()
+        stats.add(self)
+        return stats
+
+    def add(self, other: 'I2CStats') -> None:
+        self.transactions += other.transactions
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.bits += other.bits
+        self.total_latency += other.total_latency
+        self.max_latency = max(self.max_latency, other.max_latency)
+        for i, n in enumerate(other.histogram):
+            self.histogram[i] += n
+
+
+class InstrumentedI2C:
+    """
+    Passes transactions through to the bus, with the same API as `busio.I2C`, and records `I2CStats` for each
+    address: e.g. the PCA9685s' servo frames and the ADS7830's reads. Costs two clock reads and a few additions
+    per transaction.
+    """
+
+    i2c_bus: I2C
+
+    def __init__(self, i2c_bus: I2C, time_ns_func: TimeNsFunc = time.monotonic_ns):
+        self.i2c_bus = i2c_bus
+        self._time_ns_func = time_ns_func
+        self._stats = {}
+
+    def __repr__(self) -> str:
+        return f'InstrumentedI2C(addresses={[hex(address) for address in sorted(self._stats)]})'
+
+    def deinit(self) -> None:
+        self.i2c_bus.deinit()
+
+    def snapshot(self) -> Dict[I2cAddress, I2CStats]:
+        """Copies of the statistics so far, by address."""
+        return {address: stats.copy() for address, stats in self._stats.items()}
+
+    def total(self) -> I2CStats:
+        """Statistics of all addresses together."""
+
+        total = I2CStats()
+        for stats in self._stats.values():
+            total.add(stats)
+        return total
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
+    def print_stats(self) -> None:
+        """Prints each address's statistics and latency histogram, e.g. over serial."""
+
+        print('Latency buckets (us): ' + ' '.join(f'<={bound}' for bound in LATENCY_BUCKETS) + ' more')
+        for address, stats in sorted(self._stats.items()):
+            print(f'{hex(address)}: {stats}')
+            print(f'      histogram: {" ".join(str(n) for n in stats.histogram)}')
+
+    def _get_stats(self, address: I2cAddress) -> I2CStats:
+        stats = self._stats.get(address)
+        if stats is None:
+            stats = self._stats[address] = I2CStats()
+        return stats
+
+    def try_lock(self) -> bool:
+        return self.i2c_bus.try_lock()
+
+    def unlock(self) -> None:
+        self.i2c_bus.unlock()
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        end = len(buffer) if end is None else end
+        t0 = self._time_ns_func()
+        self.i2c_bus.writeto(address, buffer, start=start, end=end)
+        latency = (self._time_ns_func() - t0) // 1000
+        self._get_stats(address).record(end - start, 0, latency)
+
+    def readfrom_into(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        end = len(buffer) if end is None else end
+        t0 = self._time_ns_func()
+        self.i2c_bus.readfrom_into(address, buffer, start=start, end=end)
+        latency = (self._time_ns_func() - t0) // 1000
+        self._get_stats(address).record(0, end - start, latency)
+
+    def writeto_then_readfrom(self, address: int, out_buffer, in_buffer, *, out_start: int = 0,
+                              out_end: int = None, in_start: int = 0, in_end: int = None) -> None:
+        out_end = len(out_buffer) if out_end is None else out_end
+        in_end = len(in_buffer) if in_end is None else in_end
+        t0 = self._time_ns_func()
+        self.i2c_bus.writeto_then_readfrom(
+            address, out_buffer, in_buffer, out_start=out_start, out_end=out_end, in_start=in_start, in_end=in_end)
+        latency = (self._time_ns_func() - t0) // 1000
+        self._get_stats(address).record(out_end - out_start, in_end - in_start, latency, addressings=2)
+
+
+class BusArbiter:
+    """
+    Shares one I2C bus between users of different priorities, each through its own `ArbitratedI2C`.
+
+    Servo frames (`FRAMES`) go straight to the bus, and mark the frame schedule: one frame per control period.
+    Lower priority users await `ArbitratedI2C.until_idle` before their transactions, which returns in the gap
+    after a frame, so they don't delay the next one. When no frames are being written, the bus is always idle.
+
+    Also works like the bus itself, at `FRAMES` priority, e.g. as a context manager that deinitializes it.
+    """
+
+    i2c_bus: I2C
+    """The bus itself, or an `AdaptiveI2C` or `InstrumentedI2C` around it."""
+
+    frame_period: float
+    """Expected time between servo frames."""
+
+    guard_time: float
+    """Time before the next expected frame that lower priority transactions won't start in."""
+
+    time_func: TimeFunc
+
+    def __init__(
+            self,
+            i2c_bus: I2C,
+            frame_period: float = 1 / config.CONTROL_LOOP_RATE,
+            guard_time: float = 0.002,
+            time_func: TimeFunc = time.monotonic,
+    ):
+        self.i2c_bus = i2c_bus
+        self.frame_period = frame_period
+        self.guard_time = guard_time
+        self.time_func = time_func
+
+        self._buses = {}
+        self._last_frame = None
+
+    def __enter__(self) -> 'BusArbiter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.deinit()
+
+    def __repr__(self) -> str:
+        return f'BusArbiter({"; ".join(repr(bus) for bus in self._buses.values())})'
+
+    def deinit(self) -> None:
+        self.i2c_bus.deinit()
+
+    def get_bus(self, priority: Priority) -> 'ArbitratedI2C':
+        """Returns the bus for users of the given priority, which also keeps their wait statistics."""
+
+        bus = self._buses.get(priority)
+        if bus is None:
+            bus = self._buses[priority] = ArbitratedI2C(self, priority)
+        return bus
+
+    def reset_stats(self) -> None:
+        for bus in self._buses.values():
+            bus.reset_stats()
+
+    def is_idle(self) -> bool:
+        """True if a lower priority transaction started now would be done before the next expected frame."""
+
+        last_frame = self._last_frame
+        if last_frame is None:
+            return True
+
+        since_frame = self.time_func() - last_frame
+        if since_frame >= 2 * self.frame_period:
+            # Frames have stopped
+            return True
+
+        return since_frame + self.guard_time <= self.frame_period
+
+    async def until_idle(self) -> None:
+        while not self.is_idle():
+            # Sleep until just after the next expected frame
+            next_frame = self._last_frame + self.frame_period
+            await asyncio.sleep(max(next_frame - self.time_func(), 0.) + self.guard_time / 2)
+
+    def _frame_written(self) -> None:
+        # Writes within half a period of the frame's first write, e.g. to the second chip, are the same frame
+        now = self.time_func()
+        if self._last_frame is None or now - self._last_frame > self.frame_period / 2:
+            self._last_frame = now
+
+    # The bus API, at FRAMES priority
+
+    def try_lock(self) -> bool:
+        return self.get_bus(FRAMES).try_lock()
+
+    def unlock(self) -> None:
+        self.get_bus(FRAMES).unlock()
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        self.get_bus(FRAMES).writeto(address, buffer, start=start, end=end)
+
+    def readfrom_into(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        self.get_bus(FRAMES).readfrom_into(address, buffer, start=start, end=end)
+
+    def writeto_then_readfrom(self, address: int, out_buffer, in_buffer, *, out_start: int = 0,
+                              out_end: int = None, in_start: int = 0, in_end: int = None) -> None:
+        self.get_bus(FRAMES).writeto_then_readfrom(
+            address, out_buffer, in_buffer, out_start=out_start, out_end=out_end, in_start=in_start, in_end=in_end)
+
+
+class ArbitratedI2C:
+    """
+    One priority's view of a `BusArbiter`'s bus, with the same API as `busio.I2C`, so it works with
+    `I2CDevice`. Records how long its users wait: for the bus lock, and in `until_idle`.
+    """
+
+    arbiter: BusArbiter
+    priority: Priority
+
+    transactions: int
+    max_wait: float
+    total_wait: float
+
+    def __init__(self, arbiter: BusArbiter, priority: Priority):
+        self.arbiter = arbiter
+        self.priority = priority
+
+        self._lock_requested = None
+        self.reset_stats()
+
+    def __repr__(self) -> str:
+        return (
+            f'ArbitratedI2C(priority={self.priority}; transactions={self.transactions}; '
+            f'mean_wait={self.mean_wait * 1000:.2f} ms; max_wait={self.max_wait * 1000:.2f} ms)'
+        )
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.transactions if self.transactions else 0.
+
+    def reset_stats(self) -> None:
+        self.transactions = 0
+        self.max_wait = 0.
+        self.total_wait = 0.
+
+    async def until_idle(self) -> None:
+        """Waits for an idle gap on the bus, unless this is the top priority, which never waits."""
+
+        if self.priority == FRAMES:
+            return
+
+        arbiter = self.arbiter
+        start = arbiter.time_func()
+        await arbiter.until_idle()
+        self._lock_requested = start
+
+    def try_lock(self) -> bool:
+        now = self.arbiter.time_func()
+        if self._lock_requested is None:
+            self._lock_requested = now
+
+        if not self.arbiter.i2c_bus.try_lock():
+            return False
+
+        wait = now - self._lock_requested
+        self._lock_requested = None
+        self.transactions += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        return True
+
+    def unlock(self) -> None:
+        self.arbiter.i2c_bus.unlock()
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        self.arbiter.i2c_bus.writeto(address, buffer, start=start, end=len(buffer) if end is None else end)
+        if self.priority == FRAMES:
+            self.arbiter._frame_written()
+
+    def readfrom_into(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        self.arbiter.i2c_bus.readfrom_into(address, buffer, start=start, end=len(buffer) if end is None else end)
+
+    def writeto_then_readfrom(self, address: int, out_buffer, in_buffer, *, out_start: int = 0,
+                              out_end: int = None, in_start: int = 0, in_end: int = None) -> None:
+        self.arbiter.i2c_bus.writeto_then_readfrom(
+            address,
+            out_buffer,
+            in_buffer,
+            out_start=out_start,
+            out_end=len(out_buffer) if out_end is None else out_end,
+            in_start=in_start,
+            in_end=len(in_buffer) if in_end is None else in_end,
+        )
@@ -0,0 +1,301 @@
+"""
+Host-side stand-ins for the robot's I2C devices, for tests and benchmarks without the robot.
+
+`SimulatedI2C` has the same API as `busio.I2C`, and passes transactions to the simulated devices at their
+addresses, charging each the time it would take on the wire at the bus frequency. E.g. to benchmark the servo
+frames on Linux: ``servo_benchmark(i2c_bus=get_simulated_i2c_bus(blocking=True))``.
+"""
+
+import time
+
+from phyto import config
+from phyto.base.servo_controller import ALL_LED_ON_L, FULL_ON_OFF, LED0_ON_L, MODE1_AI, MODE1_RESTART, MODE1_SLEEP
+from phyto.i2c import transaction_bits
+from phyto.types import I2cAddress
+
+try:
+    from typing import Dict, List, Tuple
+except ImportError:
+    Dict = ...
+    List = ...
+    Tuple = ...
+
+ENODEV: int = 19
+"""Error number of the `OSError` raised when no device acknowledges the address."""
+
+MODE1: int = 0x00
+MODE2: int = 0x01
+PRESCALE: int = 0xFE
+
+LAST_LED_REGISTER: int = LED0_ON_L + 4 * 16 - 1
+"""Last register of the last channel, after which auto-increment wraps back to MODE1."""
+
+
+def get_simulated_i2c_bus(frequency: int = config.I2C_BUS_FREQS[-1], blocking: bool = False) -> 'SimulatedI2C':
+    """The robot's bus: both PCA9685s and the ADS7830, with full batteries."""
+
+    return SimulatedI2C(
+        {
+            config.PCA9685_0_I2C_ADDRESS: SimulatedPCA9685(),
+            config.PCA9685_1_I2C_ADDRESS: SimulatedPCA9685(),
+            config.ADS7830_I2C_ADDRESS: SimulatedADS7830(
+                {config.LOGIC_BATTERY_CHANNEL: 8.4, config.MOTOR_BATTERY_CHANNEL: 8.4}),
+        },
+        frequency=frequency,
+        blocking=blocking,
+    )
+
+
+class SimulatedDevice:
+    def write(self, data: bytes) -> None:
+        ...
+
+    def read(self, count: int) -> bytes:
+        ...
+
+
+class SimulatedI2C:
+    """
+    Bus of simulated devices, with the same API as `busio.I2C`. Addresses without a device NACK, raising an
+    `OSError` like the real bus.
+
+    Each transaction costs its `transaction_bits` at ``frequency``, plus ``overhead``, added to `busy_time`. If
+    ``blocking``, transactions also take that long in real time, like on the robot, so wall-clock benchmarks
+    and time-based statistics see it.
+    """
+
+    devices: Dict[I2cAddress, SimulatedDevice]
+    frequency: int
+
+    overhead: float
+    """Time per transaction on top of the bits on the wire, e.g. for the driver's setup."""
+
+    blocking: bool
+
+    transactions: int
+    busy_time: float
+    """Total time of all transactions so far, in seconds."""
+
+    def __init__(
+            self,
+            devices: Dict[I2cAddress, SimulatedDevice],
+            frequency: int = config.I2C_BUS_FREQS[-1],
+            overhead: float = 0.,
+            blocking: bool = False,
+    ):
+        self.devices = devices
+        self.frequency = frequency
+        self.overhead = overhead
+        self.blocking = blocking
+
+        self._locked = False
+        self.transactions = 0
+        self.busy_time = 0.
+
+    def __repr__(self) -> str:
+        return (
+            f'SimulatedI2C(frequency={self.frequency}; transactions={self.transactions}; '
+            f'busy_time={self.busy_time * 1000:.2f} ms)'
+        )
+
+    def deinit(self) -> None:
+        pass
+
+    def try_lock(self) -> bool:
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self) -> None:
+        self._locked = False
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        end = len(buffer) if end is None else end
+        self._charge(end - start, 0, 1)
+        self._get_device(address).write(bytes(buffer[start:end]))
+
+    def readfrom_into(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        end = len(buffer) if end is None else end
+        self._charge(0, end - start, 1)
+        buffer[start:end] = self._get_device(address).read(end - start)
+
+    def writeto_then_readfrom(self, address: int, out_buffer, in_buffer, *, out_start: int = 0,
+                              out_end: int = None, in_start: int = 0, in_end: int = None) -> None:
+        out_end = len(out_buffer) if out_end is None else out_end
+        in_end = len(in_buffer) if in_end is None else in_end
+        self._charge(out_end - out_start, in_end - in_start, 2)
+
+        device = self._get_device(address)
+        device.write(bytes(out_buffer[out_start:out_end]))
+        in_buffer[in_start:in_end] = device.read(in_end - in_start)
+
+    def _get_device(self, address: int) -> SimulatedDevice:
+        device = self.devices.get(address)
+        if device is None:
+            raise OSError(ENODEV, 'No device at address')
+        return device
+
+    def _charge(self, sent: int, received: int, addressings: int) -> None:
+        duration = transaction_bits(sent, received, addressings) / self.frequency + self.overhead
+        self.transactions += 1
+        self.busy_time += duration
+
+        if self.blocking:
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                pass
+
+
+class SimulatedPCA9685(SimulatedDevice):
+    """
+    Register map of a PCA9685: MODE1 and MODE2, the four registers of each channel, ALL_LED, and PRESCALE.
+
+    The first byte of each write sets the register pointer, and the rest are written from there. Reads start
+    at the pointer. With MODE1's AI bit set, the pointer moves on after each byte, wrapping from the last
+    channel back to MODE1. Writes to ALL_LED go to every channel, and ALL_LED reads as zero. PRESCALE can
+    only be written while asleep. Sleeping while PWM is running sets RESTART, and PWM stays halted after
+    waking until RESTART is written.
+    """
+
+    registers: bytearray
+    halted: bool
+    """PWM is stopped, by sleeping, until restarted."""
+
+    def __init__(self):
+        self.registers = bytearray(256)
+        self._pointer = 0
+        self.halted = True
+
+        # Power-on defaults: asleep with ALLCALL on, outputs totem pole, every channel fully off, 200 Hz
+        self.registers[MODE1] = MODE1_SLEEP | 0x01
+        self.registers[MODE2] = 0x04
+        self.registers[0x02:0x06] = bytes((0xE2, 0xE4, 0xE8, 0xE0))
+        for channel in range(16):
+            self.registers[LED0_ON_L + 4 * channel + 3] = FULL_ON_OFF >> 8
+        self.registers[PRESCALE] = 0x1E
+
+    @property
+    def sleeping(self) -> bool:
+        return bool(self.registers[MODE1] & MODE1_SLEEP)
+
+    @property
+    def prescale(self) -> int:
+        return self.registers[PRESCALE]
+
+    def get_registers(self, channel: int) -> Tuple[int, int]:
+        """The channel's 13-bit ON and OFF registers, full on/off bits included."""
+
+        i = LED0_ON_L + 4 * channel
+        registers = self.registers
+        return registers[i] | registers[i + 1] << 8, registers[i + 2] | registers[i + 3] << 8
+
+    def get_duty_cycle(self, channel: int) -> int:
+        """The channel's output as a 16-bit duty cycle, like `PWMChannel.duty_cycle`. Zero while PWM is stopped."""
+
+        if self.sleeping or self.halted:
+            return 0
+
+        on, off = self.get_registers(channel)
+        if off & FULL_ON_OFF:
+            return 0
+        if on & FULL_ON_OFF:
+            return 0xFFFF
+        return ((off - on) & 0xFFF) << 4
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+
+        self._pointer = data[0]
+        for value in data[1:]:
+            self._write_register(self._pointer, value)
+            self._advance()
+
+    def read(self, count: int) -> bytes:
+        data = bytearray(count)
+        for i in range(count):
+            pointer = self._pointer
+            data[i] = 0 if ALL_LED_ON_L <= pointer < ALL_LED_ON_L + 4 else self.registers[pointer]
+            self._advance()
+        return bytes(data)
+
+    def _advance(self) -> None:
+        if not self.registers[MODE1] & MODE1_AI:
+            return
+
+        pointer = self._pointer
+        if pointer == LAST_LED_REGISTER:
+            self._pointer = MODE1
+        else:
+            self._pointer = (pointer + 1) & 0xFF
+
+    def _write_register(self, register: int, value: int) -> None:
+        registers = self.registers
+
+        if register == MODE1:
+            self._write_mode1(value)
+        elif register == PRESCALE:
+            if self.sleeping:
+                registers[PRESCALE] = value
+        elif ALL_LED_ON_L <= register < ALL_LED_ON_L + 4:
+            for channel in range(16):
+                registers[LED0_ON_L + 4 * channel + register - ALL_LED_ON_L] = value
+        else:
+            registers[register] = value
+
+    def _write_mode1(self, value: int) -> None:
+        mode1 = self.registers[MODE1]
+        restart = mode1 & MODE1_RESTART
+
+        if value & MODE1_SLEEP and not mode1 & MODE1_SLEEP and not self.halted:
+            # Going to sleep with PWM running
+            restart = MODE1_RESTART
+            self.halted = True
+        elif value & MODE1_RESTART and not value & MODE1_SLEEP:
+            # Writing RESTART restarts PWM and clears it. Writing 0 to it does nothing.
+            restart = 0
+            self.halted = False
+        elif not value & MODE1_SLEEP and not restart:
+            # Waking with nothing to restart, e.g. from power-on, starts PWM
+            self.halted = False
+
+        self.registers[MODE1] = (value & ~MODE1_RESTART) | restart
+
+
+class SimulatedADS7830(SimulatedDevice):
+    """
+    An ADS7830, converting on each read the channel selected by the last command byte written: single-ended
+    or differential, with the datasheet's channel order. Inputs are in volts at the board's connectors, with
+    ``full_scale`` reading 255, like `ADS7830`'s scaling.
+    """
+
+    voltages: List[float]
+    full_scale: float
+    command: int
+
+    def __init__(self, voltages: Dict[int, float] = None, full_scale: float = 15.6):
+        self.voltages = [0.] * 8
+        for channel, voltage in (voltages or {}).items():
+            self.voltages[channel] = voltage
+        self.full_scale = full_scale
+        self.command = 0x84
+
+    def write(self, data: bytes) -> None:
+        if data:
+            self.command = data[-1]
+
+    def read(self, count: int) -> bytes:
+        return bytes([self.convert()] * count)
+
+    def convert(self) -> int:
+        select = (self.command >> 4) & 0x07
+        channel = ((select & 0x03) << 1) | (select >> 2)
+
+        voltage = self.voltages[channel]
+        if not self.command & 0x80:
+            # Differential: CH0 against CH1, CH1 against CH0, and so on
+            voltage -= self.voltages[channel ^ 1]
+
+        code = int(round(voltage * 255 / self.full_scale))
+        return max(0, min(255, code))
@@ -0,0 +1,65 @@
+try:
+    from typing import Sequence, Tuple
+except ImportError:
+    pass
+
+from phyto.fixedpoint import ONE, acos_mrad, atan2_mrad, cos_q14, norm_um, sin_q14, to_rad, to_um
+from phyto.kinematics.inverse import InverseSolver3Dof, NoSolution
+from phyto.types import Angle, Length
+
+_SHIFT: int = 4
+"""Lengths are shifted right by this many bits (16 µm units) before being multiplied together."""
+
+
+class FixedInverseSolver3Dof(InverseSolver3Dof):
+    """
+    Integer-only version of `InverseSolver3Dof`, for microcontrollers without an FPU.
+
+    `solve_um` works in micrometres and milliradians end to end. `solve` keeps the float interface of the
+    exact solver, converting at the boundary, so it can be used anywhere the exact solver is.
+
+    Over the walking workspace, angles are within 0.003 rad of the exact solver for 99% of targets. Close to
+    the fully folded singularity, where ``acos`` is steep, the error grows to about 0.03 rad.
+    """
+
+    def __init__(self, l0: Length, l1: Length, l2: Length):
+        super().__init__(l0, l1, l2)
+
+        self._l0_um = to_um(l0)
+        l1_s = to_um(l1) >> _SHIFT
+        l2_s = to_um(l2) >> _SHIFT
+        self._l1_s = l1_s
+        self._l2_s = l2_s
+        self._r_squared_offset = l1_s * l1_s + l2_s * l2_s
+        self._cos_denominator = (2 * l1_s * l2_s) >> 14
+
+    def solve(self, x: float, y: float, z: float) -> Tuple[Angle, Angle, Angle]:
+        theta0, theta1, theta2 = self.solve_um(to_um(x), to_um(y), to_um(z))
+        return to_rad(theta0), to_rad(theta1), to_rad(theta2)
+
+    def solve_batch(self, xs: Sequence[float], ys: Sequence[float], zs: Sequence[float]) -> Sequence[Angle]:
+        return self._solve_batch_py(xs, ys, zs)
+
+    def solve_um(self, x: int, y: int, z: int) -> Tuple[int, int, int]:
+        """Solves for a target in micrometres, returning the joint angles in milliradians."""
+
+        theta0 = atan2_mrad(y, x)
+
+        x_proj = norm_um(x, y) - self._l0_um
+        x_s, z_s = x_proj >> _SHIFT, z >> _SHIFT
+        numerator = x_s * x_s + z_s * z_s - self._r_squared_offset
+        cos_theta2 = numerator // self._cos_denominator
+
+        if not -ONE <= cos_theta2 <= ONE:
+            raise NoSolution(
+                f'No solution for x={x}, y={y}, z={z} µm with ' +
+                f'link lengths l0={self.l0}, l1={self.l1}, l2={self.l2}.'
+            )
+
+        theta2 = -acos_mrad(cos_theta2)
+
+        k1 = self._l1_s + ((self._l2_s * cos_q14(theta2)) >> 14)
+        k2 = (self._l2_s * sin_q14(theta2)) >> 14
+        theta1 = atan2_mrad(z, x_proj) - atan2_mrad(k2, k1)
+
+        return theta0, theta1, theta2
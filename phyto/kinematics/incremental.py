@@ -0,0 +1,119 @@
+import math
+
+try:
+    from typing import Tuple
+except ImportError:
+    pass
+
+from phyto.kinematics.inverse import InverseSolver3Dof
+from phyto.types import Angle, Length
+
+_RESIDUAL_GAIN: float = 5.
+"""
+Largest measured ratio of the linearisation error to ``distance ** 2 * curvature`` over the walking workspace.
+"""
+
+
+class IncrementalSolver3Dof:
+    """
+    Warm-started inverse kinematics for one leg, whose foot only moves a few millimetres per tick.
+
+    After each closed-form solve, the inverse Jacobian at that point is cached. Nearby targets are then solved
+    by a single matrix-vector product from the cached solution, without any trig or square roots. The
+    linearisation error grows with the square of the distance from the cached point. It isn't measured, which
+    would need the closed-form solve that is being skipped: it is estimated from that distance and the
+    curvature at the cached point. Once the estimate exceeds ``tolerance``, the closed-form solver is used
+    again and the cache is refreshed, which is the only time the linearisation point moves.
+
+    Keeps state, so each leg needs its own instance.
+    """
+
+    solver: InverseSolver3Dof
+
+    tolerance: Angle
+    """
+    Largest estimated joint angle error accepted before falling back to the closed-form solver. The measured
+    error stays below it over the walking workspace, see ``test_incremental.py``.
+    """
+
+    full_solves: int
+    incremental_solves: int
+
+    def __init__(self, solver: InverseSolver3Dof, tolerance: Angle = 0.01):
+        self.solver = solver
+        self.tolerance = tolerance
+
+        self.full_solves = 0
+        self.incremental_solves = 0
+
+        self.reset()
+
+    @property
+    def l0(self) -> Length:
+        return self.solver.l0
+
+    @property
+    def l1(self) -> Length:
+        return self.solver.l1
+
+    @property
+    def l2(self) -> Length:
+        return self.solver.l2
+
+    def reset(self) -> None:
+        """Forgets the cached solution, so the next solve is closed-form."""
+        self._target = None
+
+    def solve(self, x: float, y: float, z: float) -> Tuple[Angle, Angle, Angle]:
+        if self._target is not None:
+            x0, y0, z0 = self._target
+            dx, dy, dz = x - x0, y - y0, z - z0
+
+            if (dx * dx + dy * dy + dz * dz) * self._curvature <= self.tolerance:
+                self.incremental_solves += 1
+                return self._solve_incremental(dx, dy, dz)
+
+        self.full_solves += 1
+        return self._solve_full(x, y, z)
+
+    def _solve_incremental(self, dx: float, dy: float, dz: float) -> Tuple[Angle, Angle, Angle]:
+        theta0, theta1, theta2 = self._angles
+        j = self._jacobian_inv
+
+        # Radial and tangential components of the displacement in the ground plane
+        d_rho = j[0] * dx + j[1] * dy
+        d_theta0 = j[2] * dy - j[3] * dx
+
+        return (
+            theta0 + d_theta0,
+            theta1 + j[4] * d_rho + j[5] * dz,
+            theta2 + j[6] * d_rho + j[7] * dz,
+        )
+
+    def _solve_full(self, x: float, y: float, z: float) -> Tuple[Angle, Angle, Angle]:
+        angles = self.solver.solve(x, y, z)
+        theta0, theta1, theta2 = angles
+
+        l1, l2 = self.solver.l1, self.solver.l2
+        rho = math.sqrt(x * x + y * y)
+        x_proj = rho - self.solver.l0
+        c12 = math.cos(theta1 + theta2)
+        s12 = math.sin(theta1 + theta2)
+        det = l1 * l2 * math.sin(theta2)
+
+        if rho == 0 or det == 0:
+            # Singular; don't cache, so the next solve is closed-form too
+            self._target = None
+            return angles
+
+        self._target = (x, y, z)
+        self._angles = angles
+        self._jacobian_inv = (
+            x / rho, y / rho,
+            x / (rho * rho), y / (rho * rho),
+            l2 * c12 / det, l2 * s12 / det,
+            -x_proj / det, -z / det,
+        )
+        self._curvature = _RESIDUAL_GAIN * max(1 / abs(det), 1 / (rho * rho))
+
+        return angles
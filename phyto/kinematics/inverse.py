@@ -1,10 +1,18 @@
 import math
 
 try:
-    from typing import Tuple
+    from typing import Sequence, Tuple
 except ImportError:
     pass
 
+try:
+    from ulab import numpy as np
+except ImportError:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
 from phyto.types import Angle, Length
 
 
@@ -27,15 +35,49 @@ class InverseSolver2Dof:
         theta0 = self._solve_theta0(x, y, theta1)
         return theta0, theta1
 
+    def solve_batch(self, xs: Sequence[float], ys: Sequence[float]) -> Tuple[Sequence[Angle], Sequence[Angle]]:
+        """
+        Solves many targets at once. Returns ``(theta0s, theta1s)``, each with one angle per target.
+
+        Uses NumPy (or ``ulab.numpy`` on the microcontroller) when available, and plain Python otherwise.
+        """
+
+        if np is not None:
+            return self._solve_batch_np(np.array(xs), np.array(ys))
+
+        theta0s, theta1s = [], []
+        for x, y in zip(xs, ys):
+            theta0, theta1 = self.solve(x, y)
+            theta0s.append(theta0)
+            theta1s.append(theta1)
+
+        return theta0s, theta1s
+
+    def _solve_batch_np(self, xs, ys):
+        numerator = xs * xs + ys * ys - self.l0 ** 2 - self.l1 ** 2
+        cos_theta1 = numerator / (2 * self.l0 * self.l1)
+
+        if len(xs) and (np.max(cos_theta1) > 1 or np.min(cos_theta1) < -1):
+            raise NoSolution(f'No solution for some of xs={xs}, ys={ys} with link lengths l0={self.l0}, l1={self.l1}.')
+
+        theta1 = -np.arccos(cos_theta1)
+
+        k1 = self.l0 + self.l1 * np.cos(theta1)
+        k2 = self.l1 * np.sin(theta1)
+        theta0 = np.arctan2(ys, xs) - np.arctan2(k2, k1)
+
+        return theta0, theta1
+
     def _solve_theta1(self, x: float, y: float) -> Angle:
         numerator = x ** 2 + y ** 2 - self.l0 ** 2 - self.l1 ** 2
         denominator = 2 * self.l0 * self.l1
+        cos_theta1 = numerator / denominator
 
-        try:
-            return -math.acos(numerator / denominator)
-        except ValueError:
+        if not -1 <= cos_theta1 <= 1:
             raise NoSolution(f'No solution for x={x}, y={y} with link lengths l0={self.l0}, l1={self.l1}.')
 
+        return -math.acos(cos_theta1)
+
     def _solve_theta0(self, x: float, y: float, theta1: Angle) -> Angle:
         k1 = self.l0 + self.l1 * math.cos(theta1)
         k2 = self.l1 * math.sin(theta1)
@@ -79,6 +121,44 @@ class InverseSolver3Dof:
 
         return theta0, theta1, theta2
 
+    def solve_batch(self, xs: Sequence[float], ys: Sequence[float], zs: Sequence[float]) -> Sequence[Angle]:
+        """
+        Solves many targets at once, e.g. all six feet of the base, in a single call.
+
+        Returns one flat sequence of ``3 * len(xs)`` angles, grouped by joint: all ``theta0`` values,
+        then all ``theta1`` values, then all ``theta2`` values. The angles of target ``i`` are therefore
+        at indices ``i``, ``n + i`` and ``2 * n + i``.
+        """
+
+        if np is not None:
+            return self._solve_batch_np(np.array(xs), np.array(ys), np.array(zs))
+
+        return self._solve_batch_py(xs, ys, zs)
+
+    def _solve_batch_py(self, xs: Sequence[float], ys: Sequence[float], zs: Sequence[float]) -> Sequence[Angle]:
+        theta0s, theta1s, theta2s = [], [], []
+        for x, y, z in zip(xs, ys, zs):
+            theta0, theta1, theta2 = self.solve(x, y, z)
+            theta0s.append(theta0)
+            theta1s.append(theta1)
+            theta2s.append(theta2)
+
+        return theta0s + theta1s + theta2s
+
+    def _solve_batch_np(self, xs, ys, zs):
+        theta0 = np.arctan2(ys, xs)
+        x_proj = np.sqrt(xs * xs + ys * ys) - self.l0
+
+        try:
+            theta1, theta2 = self._solver_2dof.solve_batch(x_proj, zs)
+        except NoSolution:
+            raise NoSolution(
+                f'No solution for some of xs={xs}, ys={ys}, zs={zs} with ' +
+                f'link lengths l0={self.l0}, l1={self.l1}, l2={self.l2}.'
+            )
+
+        return np.concatenate((theta0, theta1, theta2))
+
     def _solve_theta0(self, x: float, y: float) -> Angle:
         return math.atan2(y, x)
 
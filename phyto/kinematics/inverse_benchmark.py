@@ -0,0 +1,91 @@
+"""
+Compares the per-call cost of the inverse kinematics solvers on a walking foot path.
+
+Run it on the host with ``python3 -m phyto.kinematics.inverse_benchmark``, or on the Pico from the REPL with
+``from phyto.kinematics.inverse_benchmark import inverse_benchmark; inverse_benchmark()``. It uses ``ticks_us``
+where available, so it also runs on MicroPython ports that have the libraries in ``lib`` on their path.
+"""
+
+import time
+
+from phyto.kinematics.incremental import IncrementalSolver3Dof
+from phyto.kinematics.inverse import InverseSolver3Dof
+from phyto.kinematics.lookup import LookupSolver3Dof, LookupTable
+from phyto.types import Point3D
+
+try:
+    _ticks_us = time.ticks_us
+    _ticks_diff = time.ticks_diff
+except AttributeError:
+    def _ticks_us() -> int:
+        return int(time.perf_counter() * 1e6)
+
+
+    def _ticks_diff(end: int, start: int) -> int:
+        return end - start
+
+LINK_LENGTHS = (.032, .090, .112)
+
+WAYPOINTS = (
+    (0.1, -0.04, -0.08),
+    (0.1, -0.05, -0.08),
+    (0.1, -0.04, -0.03),
+    (0.1, 0.05, -0.03),
+    (0.1, 0.04, -0.08),
+    (0.1, 0.0, -0.08),
+)
+
+
+def inverse_benchmark(step: float = 0.002, repeat: int = 20) -> None:
+    path = get_path(step)
+    print(f'Path: {len(path)} points, {step * 1000:.1f} mm apart; {repeat} repeats')
+
+    solver = InverseSolver3Dof(*LINK_LENGTHS)
+    table = LookupTable.build(solver, Point3D(0.05, -0.06, -0.09), Point3D(0.15, 0.06, -0.02), 0.01)
+
+    incremental_solver = IncrementalSolver3Dof(solver)
+
+    for name, s in (
+            ('closed-form', solver),
+            ('lookup', LookupSolver3Dof(*LINK_LENGTHS, table)),
+            ('incremental', incremental_solver),
+    ):
+        us_per_call = time_solver(s, path, repeat)
+        print(f'{name:>12}: {us_per_call:8.2f} us/call')
+
+    calls = incremental_solver.full_solves + incremental_solver.incremental_solves
+    print(f'Incremental solver fell back to closed-form on {100 * incremental_solver.full_solves / calls:.1f}% of calls')
+
+    incremental_solver.reset()
+    error = 0.
+    for x, y, z in path:
+        for approx, exact in zip(incremental_solver.solve(x, y, z), solver.solve(x, y, z)):
+            error = max(error, abs(approx - exact))
+    print(f'Incremental solver max error: {error:.5f} rad')
+
+
+def get_path(step: float) -> list:
+    path = []
+    for i, (x0, y0, z0) in enumerate(WAYPOINTS):
+        x1, y1, z1 = WAYPOINTS[(i + 1) % len(WAYPOINTS)]
+        distance = ((x1 - x0) ** 2 + (y1 - y0) ** 2 + (z1 - z0) ** 2) ** 0.5
+        n = max(1, int(distance / step))
+        for j in range(n):
+            t = j / n
+            path.append((x0 + (x1 - x0) * t, y0 + (y1 - y0) * t, z0 + (z1 - z0) * t))
+
+    return path
+
+
+def time_solver(solver, path: list, repeat: int) -> float:
+    start = _ticks_us()
+    for _ in range(repeat):
+        for x, y, z in path:
+            solver.solve(x, y, z)
+    elapsed = _ticks_diff(_ticks_us(), start)
+
+    return elapsed / (repeat * len(path))
+
+
+if __name__ == '__main__':
+    inverse_benchmark()
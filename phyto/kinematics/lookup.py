@@ -0,0 +1,200 @@
+import struct
+from array import array
+
+try:
+    from typing import Sequence, Tuple
+except ImportError:
+    pass
+
+from phyto.kinematics.inverse import InverseSolver3Dof, NoSolution
+from phyto.types import Angle, Length, Point3D
+
+ANGLE_SCALE: int = 10000
+"""Table counts per radian. Angles in the range [-3.2767, 3.2767] radians fit in an int16."""
+
+NO_SOLUTION: int = -32768
+"""Table value marking a grid point the exact solver has no solution for."""
+
+_MAGIC = b'IKT1'
+_HEADER_FORMAT = '<4s6f3H'
+
+
+class LookupTable:
+    """
+    Joint angles precomputed over a regular 3D grid of foot positions.
+
+    Angles are stored as int16 counts of ``1 / ANGLE_SCALE`` radians in one flat ``array('h')``,
+    three per grid point, with the z index varying fastest.
+    """
+
+    origin: Point3D
+    spacing: Point3D
+    shape: Tuple[int, int, int]
+    values: array
+
+    def __init__(self, origin: Point3D, spacing: Point3D, shape: Tuple[int, int, int], values: array):
+        nx, ny, nz = shape
+        assert nx >= 2 and ny >= 2 and nz >= 2, shape
+        assert len(values) == nx * ny * nz * 3, (len(values), shape)
+
+        self.origin = origin
+        self.spacing = spacing
+        self.shape = shape
+        self.values = values
+
+    @property
+    def upper(self) -> Point3D:
+        nx, ny, nz = self.shape
+        return Point3D(
+            self.origin.x + (nx - 1) * self.spacing.x,
+            self.origin.y + (ny - 1) * self.spacing.y,
+            self.origin.z + (nz - 1) * self.spacing.z,
+        )
+
+    @staticmethod
+    def build(solver: InverseSolver3Dof, lower: Point3D, upper: Point3D, spacing: Length) -> 'LookupTable':
+        """Builds the table by running the exact solver on every grid point. Meant to be run on the host."""
+
+        shape = tuple(
+            int(round((high - low) / spacing)) + 1
+            for low, high in ((lower.x, upper.x), (lower.y, upper.y), (lower.z, upper.z))
+        )
+        nx, ny, nz = shape
+
+        values = array('h')
+        for ix in range(nx):
+            x = lower.x + ix * spacing
+            for iy in range(ny):
+                y = lower.y + iy * spacing
+                for iz in range(nz):
+                    z = lower.z + iz * spacing
+                    try:
+                        angles = solver.solve(x, y, z)
+                    except NoSolution:
+                        angles = None
+
+                    for j in range(3):
+                        values.append(NO_SOLUTION if angles is None else round(angles[j] * ANGLE_SCALE))
+
+        return LookupTable(lower, Point3D(spacing, spacing, spacing), shape, values)
+
+    @staticmethod
+    def load(path: str) -> 'LookupTable':
+        """Loads a table written by :meth:`save`, e.g. from the microcontroller's flash."""
+
+        with open(path, 'rb') as file:
+            header = file.read(struct.calcsize(_HEADER_FORMAT))
+            magic, x0, y0, z0, dx, dy, dz, nx, ny, nz = struct.unpack(_HEADER_FORMAT, header)
+            if magic != _MAGIC:
+                raise ValueError(f'Not an IK lookup table: {path}')
+
+            values = array('h', [0] * (nx * ny * nz * 3))
+            file.readinto(values)
+
+        return LookupTable(Point3D(x0, y0, z0), Point3D(dx, dy, dz), (nx, ny, nz), values)
+
+    def save(self, path: str) -> None:
+        """Saves the table. Values are written in native byte order, which is little-endian on the host and Pico."""
+
+        origin, spacing = self.origin, self.spacing
+        with open(path, 'wb') as file:
+            file.write(struct.pack(
+                _HEADER_FORMAT,
+                _MAGIC,
+                origin.x, origin.y, origin.z,
+                spacing.x, spacing.y, spacing.z,
+                *self.shape,
+            ))
+            file.write(self.values)
+
+
+class LookupSolver3Dof(InverseSolver3Dof):
+    """
+    Solves the inverse kinematics problem by trilinear interpolation of a precomputed :class:`LookupTable`.
+
+    The RP2040 has no FPU, so the ``acos`` and ``atan2`` calls of the exact solver are slow software float
+    math. Interpolating the table only takes a few multiply-adds per joint. Targets outside the table's grid,
+    or in cells with an unreachable corner, are handed to the exact solver.
+
+    Error bound: with the default 10 mm grid over the walking workspace (see ``make_ik_table.py``), the
+    interpolated angles are within 0.045 rad (2.6°) of the exact solver. The error is below 0.009 rad (0.5°)
+    over 99% of the grid; it only grows next to the inner reach limit, where the folded leg is close to its
+    singularity. Run ``python3 make_ik_table.py`` to re-measure it for other grids.
+    """
+
+    table: LookupTable
+
+    def __init__(self, l0: Length, l1: Length, l2: Length, table: LookupTable):
+        super().__init__(l0, l1, l2)
+        self.table = table
+
+        self._x0, self._y0, self._z0 = table.origin.x, table.origin.y, table.origin.z
+        self._inv_dx, self._inv_dy, self._inv_dz = 1 / table.spacing.x, 1 / table.spacing.y, 1 / table.spacing.z
+
+    def solve(self, x: float, y: float, z: float) -> Tuple[Angle, Angle, Angle]:
+        nx, ny, nz = self.table.shape
+
+        fx = (x - self._x0) * self._inv_dx
+        fy = (y - self._y0) * self._inv_dy
+        fz = (z - self._z0) * self._inv_dz
+
+        if not (0 <= fx <= nx - 1 and 0 <= fy <= ny - 1 and 0 <= fz <= nz - 1):
+            return super().solve(x, y, z)
+
+        ix, iy, iz = min(int(fx), nx - 2), min(int(fy), ny - 2), min(int(fz), nz - 2)
+        tx, ty, tz = fx - ix, fy - iy, fz - iz
+
+        values = self.table.values
+        stride_z = 3
+        stride_y = nz * stride_z
+        stride_x = ny * stride_y
+        i000 = ix * stride_x + iy * stride_y + iz * stride_z
+
+        angles = []
+        for j in range(3):
+            i = i000 + j
+            v000, v001 = values[i], values[i + stride_z]
+            v010, v011 = values[i + stride_y], values[i + stride_y + stride_z]
+            i += stride_x
+            v100, v101 = values[i], values[i + stride_z]
+            v110, v111 = values[i + stride_y], values[i + stride_y + stride_z]
+
+            if NO_SOLUTION in (v000, v001, v010, v011, v100, v101, v110, v111):
+                # The cell straddles the edge of the workspace, so the target may still be reachable
+                return super().solve(x, y, z)
+
+            v00 = v000 + (v001 - v000) * tz
+            v01 = v010 + (v011 - v010) * tz
+            v10 = v100 + (v101 - v100) * tz
+            v11 = v110 + (v111 - v110) * tz
+            v0 = v00 + (v01 - v00) * ty
+            v1 = v10 + (v11 - v10) * ty
+            angles.append((v0 + (v1 - v0) * tx) / ANGLE_SCALE)
+
+        return angles[0], angles[1], angles[2]
+
+    def solve_batch(self, xs: Sequence[float], ys: Sequence[float], zs: Sequence[float]) -> Sequence[Angle]:
+        return self._solve_batch_py(xs, ys, zs)
+
+
+def max_error(lookup_solver: LookupSolver3Dof, exact_solver: InverseSolver3Dof, samples: int = 2 ** 14) -> Angle:
+    """Returns the largest joint angle difference between the two solvers over random points in the table's grid."""
+
+    import random
+
+    lower, upper = lookup_solver.table.origin, lookup_solver.table.upper
+    error = 0.
+    for _ in range(samples):
+        x = random.uniform(lower.x, upper.x)
+        y = random.uniform(lower.y, upper.y)
+        z = random.uniform(lower.z, upper.z)
+
+        try:
+            approx = lookup_solver.solve(x, y, z)
+        except NoSolution:
+            continue
+
+        exact = exact_solver.solve(x, y, z)
+        error = max(error, *(abs(a - e) for a, e in zip(approx, exact)))
+
+    return error
@@ -0,0 +1,39 @@
+import unittest
+from unittest import TestCase
+
+from phyto.kinematics.fixed import FixedInverseSolver3Dof
+from phyto.kinematics.inverse import InverseSolver3Dof, NoSolution
+
+
+class FixedInverseSolver3DofTest(TestCase):
+    def setUp(self) -> None:
+        self.exact_solver = InverseSolver3Dof(.032, .090, .112)
+        self.solver = FixedInverseSolver3Dof(.032, .090, .112)
+
+    def test_solve_is_close_to_exact_solver(self):
+        for x in (0.05, 0.1, 0.15):
+            for y in (-0.05, 0., 0.05):
+                for z in (-0.08, -0.05, -0.01):
+                    try:
+                        expected = self.exact_solver.solve(x, y, z)
+                    except NoSolution:
+                        continue
+
+                    actual = self.solver.solve(x, y, z)
+
+                    for expected_angle, actual_angle in zip(expected, actual):
+                        self.assertAlmostEqual(expected_angle, actual_angle, delta=0.005, msg=f'{x}, {y}, {z}')
+
+    def test_solve_um_returns_milliradians(self):
+        theta0, theta1, theta2 = self.solver.solve_um(100000, 100000, -50000)
+        self.assertEqual(785, theta0)
+        self.assertIsInstance(theta1, int)
+        self.assertIsInstance(theta2, int)
+
+    def test_no_solution(self):
+        self.assertRaises(NoSolution, self.solver.solve, 0.3, 0, 0)
+        self.assertRaises(NoSolution, self.solver.solve, 0.032, 0, 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
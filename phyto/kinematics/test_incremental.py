@@ -0,0 +1,72 @@
+import math
+import unittest
+from unittest import TestCase
+
+from phyto.kinematics.incremental import IncrementalSolver3Dof
+from phyto.kinematics.inverse import InverseSolver3Dof
+from phyto.types import Point3D
+
+LINK_LENGTHS = (.032, .090, .112)
+WORKSPACE_LOWER = Point3D(0.05, -0.05, -0.08)
+WORKSPACE_UPPER = Point3D(0.15, 0.05, -0.01)
+
+
+class IncrementalSolver3DofTest(TestCase):
+    def setUp(self) -> None:
+        self.exact_solver = InverseSolver3Dof(0.5, 1, 1)
+        self.solver = IncrementalSolver3Dof(self.exact_solver, tolerance=0.01)
+
+    def test_first_solve_is_closed_form(self):
+        self.assertEqual(self.exact_solver.solve(1.5, 0, -1), self.solver.solve(1.5, 0, -1))
+        self.assertEqual(1, self.solver.full_solves)
+        self.assertEqual(0, self.solver.incremental_solves)
+
+    def test_small_steps_are_incremental_and_close_to_exact_solver(self):
+        self.solver.solve(1.5, 0, -1)
+
+        for i in range(1, 6):
+            x, y, z = 1.5 + 0.002 * i, 0.003 * i, -1 - 0.001 * i
+            actual = self.solver.solve(x, y, z)
+            expected = self.exact_solver.solve(x, y, z)
+
+            for expected_angle, actual_angle in zip(expected, actual):
+                self.assertAlmostEqual(expected_angle, actual_angle, delta=self.solver.tolerance)
+
+        self.assertEqual(1, self.solver.full_solves)
+        self.assertEqual(5, self.solver.incremental_solves)
+
+    def test_large_step_falls_back_to_closed_form(self):
+        self.solver.solve(1.5, 0, -1)
+        self.assertEqual(self.exact_solver.solve(1.2, 0.5, -0.5), self.solver.solve(1.2, 0.5, -0.5))
+        self.assertEqual(2, self.solver.full_solves)
+
+    def test_measured_error_is_within_tolerance_over_walking_workspace(self):
+        exact_solver = InverseSolver3Dof(*LINK_LENGTHS)
+        solver = IncrementalSolver3Dof(exact_solver, tolerance=0.01)
+        center = (WORKSPACE_LOWER + WORKSPACE_UPPER) / 2
+        amplitude = (WORKSPACE_UPPER - WORKSPACE_LOWER) * 0.45
+
+        # A Lissajous path through the workspace, a few millimetres per tick
+        error = 0.
+        for i in range(3000):
+            t = 0.002 * i
+            x = center.x + amplitude.x * math.sin(1.3 * t)
+            y = center.y + amplitude.y * math.sin(2.1 * t + 1)
+            z = center.z + amplitude.z * math.sin(0.7 * t + 2)
+
+            actual = solver.solve(x, y, z)
+            expected = exact_solver.solve(x, y, z)
+            error = max(error, *(abs(a - e) for a, e in zip(actual, expected)))
+
+        self.assertLessEqual(error, solver.tolerance)
+        self.assertGreater(solver.incremental_solves, 10 * solver.full_solves)
+
+    def test_reset(self):
+        self.solver.solve(1.5, 0, -1)
+        self.solver.reset()
+        self.solver.solve(1.5, 0, -1)
+        self.assertEqual(2, self.solver.full_solves)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from math import pi
 from unittest import TestCase
+from unittest.mock import patch
 
 from parameterized import parameterized
 
@@ -33,6 +34,19 @@ class InverseSolver2DofTest(TestCase):
     def test_no_solution(self, x: float, y: float):
         self.assertRaises(NoSolution, self.solver.solve, x, y)
 
+    def test_solve_batch(self):
+        xs, ys = (3, 2, 1.5), (0, -1, -1.5)
+
+        theta0s, theta1s = self.solver.solve_batch(xs, ys)
+
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            theta0, theta1 = self.solver.solve(x, y)
+            self.assertAlmostEqual(theta0, theta0s[i])
+            self.assertAlmostEqual(theta1, theta1s[i])
+
+    def test_solve_batch_no_solution(self):
+        self.assertRaises(NoSolution, self.solver.solve_batch, (3, 3.001), (0, 0))
+
 
 class InverseSolver3DofTest(TestCase):
     def setUp(self) -> None:
@@ -58,6 +72,38 @@ class InverseSolver3DofTest(TestCase):
     def test_no_solution(self, x: float, y: float, z: float):
         self.assertRaises(NoSolution, self.solver.solve, x, y, z)
 
+    def test_solve_batch(self):
+        xs, ys, zs = (2.5, 1.5, 0, .5), (0, 0, 2.5, 0), (0, -1, 0, 2)
+        n = len(xs)
+
+        angles = self.solver.solve_batch(xs, ys, zs)
+
+        self.assertEqual(3 * n, len(angles))
+        for i, (x, y, z) in enumerate(zip(xs, ys, zs)):
+            theta0, theta1, theta2 = self.solver.solve(x, y, z)
+            self.assertAlmostEqual(theta0, angles[i])
+            self.assertAlmostEqual(theta1, angles[n + i])
+            self.assertAlmostEqual(theta2, angles[2 * n + i])
+
+    def test_solve_batch_no_solution(self):
+        self.assertRaises(NoSolution, self.solver.solve_batch, (2.5, 2.501), (0, 0), (0, 0))
+
+
+
+@patch('phyto.kinematics.inverse.np', None)
+class InverseSolver2DofWithoutNumPyTest(InverseSolver2DofTest):
+    def test_solve_batch_uses_plain_python(self):
+        theta0s, theta1s = self.solver.solve_batch((3, 2), (0, -1))
+
+        self.assertIsInstance(theta0s, list)
+        self.assertIsInstance(theta1s, list)
+
+
+@patch('phyto.kinematics.inverse.np', None)
+class InverseSolver3DofWithoutNumPyTest(InverseSolver3DofTest):
+    def test_solve_batch_uses_plain_python(self):
+        self.assertIsInstance(self.solver.solve_batch((2.5, 1.5), (0, 0), (0, -1)), list)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from phyto.kinematics.inverse import InverseSolver3Dof, NoSolution
+from phyto.kinematics.lookup import LookupSolver3Dof, LookupTable, NO_SOLUTION
+from phyto.types import Point3D
+
+
+class LookupSolver3DofTest(TestCase):
+    def setUp(self) -> None:
+        self.exact_solver = InverseSolver3Dof(0.5, 1, 1)
+        self.table = LookupTable.build(self.exact_solver, Point3D(1, -0.5, -1), Point3D(2, 0.5, 0), 0.05)
+        self.solver = LookupSolver3Dof(0.5, 1, 1, self.table)
+
+    @parameterized.expand([
+        (1.5, 0, -1),
+        (1.23, 0.17, -0.42),
+        (1.9, -0.31, -0.05),
+        (1, -0.5, -1),
+        (2, 0.5, 0),
+    ])
+    def test_solve_is_close_to_exact_solver(self, x: float, y: float, z: float):
+        expected = self.exact_solver.solve(x, y, z)
+        actual = self.solver.solve(x, y, z)
+
+        for expected_angle, actual_angle in zip(expected, actual):
+            self.assertAlmostEqual(expected_angle, actual_angle, delta=0.01)
+
+    def test_solve_outside_grid_uses_exact_solver(self):
+        self.assertEqual(self.exact_solver.solve(2.5, 0, 0), self.solver.solve(2.5, 0, 0))
+
+    def test_solve_next_to_unsolvable_grid_point_uses_exact_solver(self):
+        self.table.values[0] = NO_SOLUTION
+        self.assertEqual(self.exact_solver.solve(1.01, -0.49, -0.99), self.solver.solve(1.01, -0.49, -0.99))
+
+    @parameterized.expand([
+        (2.46, 0.01, -0.01),
+        (2.48, -0.01, -0.01),
+    ])
+    def test_solve_reachable_target_in_cell_at_edge_of_workspace(self, x: float, y: float, z: float):
+        table = LookupTable.build(self.exact_solver, Point3D(2, -0.5, -1), Point3D(3, 0.5, 0), 0.05)
+        solver = LookupSolver3Dof(0.5, 1, 1, table)
+
+        self.assertEqual(self.exact_solver.solve(x, y, z), solver.solve(x, y, z))
+        self.assertEqual(list(self.exact_solver.solve(x, y, z)), list(solver.solve_batch([x], [y], [z])))
+
+    def test_solve_raises_no_solution_for_unreachable_target(self):
+        table = LookupTable.build(self.exact_solver, Point3D(2, -0.5, -1), Point3D(3, 0.5, 0), 0.05)
+        solver = LookupSolver3Dof(0.5, 1, 1, table)
+
+        self.assertRaises(NoSolution, solver.solve, 2.9, 0, -0.01)
+
+    def test_solve_batch(self):
+        xs, ys, zs = (1.5, 1.23), (0, 0.17), (-1, -0.42)
+
+        angles = self.solver.solve_batch(xs, ys, zs)
+
+        for i, (x, y, z) in enumerate(zip(xs, ys, zs)):
+            self.assertEqual(self.solver.solve(x, y, z), (angles[i], angles[2 + i], angles[4 + i]))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'table.bin')
+            self.table.save(path)
+            table = LookupTable.load(path)
+
+        self.assertEqual(self.table.shape, table.shape)
+        self.assertEqual(list(self.table.values), list(table.values))
+        self.assertTrue(self.table.origin.almost_equal(table.origin))
+        self.assertTrue(self.table.spacing.almost_equal(table.spacing))
+
+
+if __name__ == '__main__':
+    unittest.main()
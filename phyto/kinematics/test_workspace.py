@@ -0,0 +1,59 @@
+import unittest
+from math import pi
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from phyto.kinematics.inverse import InverseSolver3Dof
+from phyto.kinematics.workspace import Workspace
+
+
+class WorkspaceTest(TestCase):
+    def setUp(self) -> None:
+        self.solver = InverseSolver3Dof(0.5, 1, 1)
+        self.workspace = Workspace(self.solver, ((-pi / 2, pi / 2), (-pi / 2, pi / 2), (-pi * 3 / 4, 0)))
+
+    @parameterized.expand([
+        (2.5, 0, 0, True),
+        (1.5, 0, -1, True),
+        (0, 2.5, 0, True),
+        (.5, 0, 2, True),
+        (2.501, 0, 0, False),
+        (0, 0, 2.001, False),
+        (-2, 0, 0, False),
+        (0.6, 0, 0, False),
+        (.45, 0, 1.99, False),
+    ])
+    def test_is_reachable(self, x: float, y: float, z: float, reachable: bool):
+        self.assertEqual(reachable, self.workspace.is_reachable(x, y, z))
+
+    @parameterized.expand([
+        (2.5, 0, 0),
+        (1.5, 0, -1),
+        (1.2, 0.7, 0.3),
+    ])
+    def test_solve_clamped_matches_solver_when_reachable(self, x: float, y: float, z: float):
+        expected = self.solver.solve(x, y, z)
+        actual = self.workspace.solve_clamped(x, y, z)
+
+        for expected_angle, actual_angle in zip(expected, actual):
+            self.assertAlmostEqual(expected_angle, actual_angle)
+
+    def test_solve_clamped_projects_too_far_target_onto_max_reach(self):
+        self.assertEqual((0, 0, 0), self.workspace.solve_clamped(10, 0, 0))
+
+    def test_solve_clamped_respects_joint_limits(self):
+        theta0, theta1, theta2 = self.workspace.solve_clamped(-2, 0.1, 0)
+
+        self.assertAlmostEqual(pi / 2, theta0)
+        self.assertGreaterEqual(theta1, -pi / 2)
+        self.assertLessEqual(theta1, pi / 2)
+        self.assertGreaterEqual(theta2, -pi * 3 / 4)
+
+    def test_solve_clamped_projects_too_near_target_onto_min_reach(self):
+        _, _, theta2 = self.workspace.solve_clamped(0.5, 0, 0)
+        self.assertAlmostEqual(-pi * 3 / 4, theta2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import math
+
+try:
+    from typing import Tuple
+
+    JointLimits = Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]]
+except ImportError:
+    Tuple = ...
+
+    JointLimits = ...
+
+from phyto.kinematics.inverse import InverseSolver3Dof
+from phyto.types import Angle
+
+
+class Workspace:
+    """
+    The set of foot positions a 3 DOF leg can reach without exceeding its joint limits.
+
+    The reach of the two outer links is precomputed as an annulus, so checking a target only takes a few
+    multiplications and trig calls, and never raises. This is much cheaper on CircuitPython than letting
+    the solver fail with ``NoSolution``.
+    """
+
+    solver: InverseSolver3Dof
+
+    joint_limits: JointLimits
+    """``(min, max)`` of each joint angle in radians, in the solver's convention."""
+
+    _r_squared_min: float
+    _r_squared_max: float
+
+    def __init__(self, solver: InverseSolver3Dof, joint_limits: JointLimits):
+        self.solver = solver
+        self.joint_limits = joint_limits
+
+        # The solver always bends the outer joint the same way, i.e. theta2 in [-pi, 0]
+        theta2_min, theta2_max = joint_limits[2]
+        theta2_min, theta2_max = max(theta2_min, -math.pi), min(theta2_max, 0.)
+
+        l1, l2 = solver.l1, solver.l2
+        self._cos_theta2_min = math.cos(theta2_min)
+        self._cos_theta2_max = math.cos(theta2_max)
+        self._r_squared_min = l1 ** 2 + l2 ** 2 + 2 * l1 * l2 * self._cos_theta2_min
+        self._r_squared_max = l1 ** 2 + l2 ** 2 + 2 * l1 * l2 * self._cos_theta2_max
+
+    def is_reachable(self, x: float, y: float, z: float) -> bool:
+        theta0 = math.atan2(y, x)
+        theta0_min, theta0_max = self.joint_limits[0]
+        if not theta0_min <= theta0 <= theta0_max:
+            return False
+
+        x_proj = math.sqrt(x * x + y * y) - self.solver.l0
+        r_squared = x_proj * x_proj + z * z
+        if not self._r_squared_min <= r_squared <= self._r_squared_max:
+            return False
+
+        theta1 = self._solve_theta1(x_proj, z, self._solve_theta2(r_squared))
+        theta1_min, theta1_max = self.joint_limits[1]
+        return theta1_min <= theta1 <= theta1_max
+
+    def solve_clamped(self, x: float, y: float, z: float) -> Tuple[Angle, Angle, Angle]:
+        """
+        Solves the joint angles of the target or, if it cannot be reached, of the nearest reachable point.
+
+        The target is projected onto the workspace by clamping its direction around the first joint, its
+        distance from the second joint, and then the angle of the second joint. Never raises ``NoSolution``.
+        """
+
+        theta0 = _clamp(math.atan2(y, x), *self.joint_limits[0])
+
+        x_proj = math.sqrt(x * x + y * y) - self.solver.l0
+        r_squared = _clamp(x_proj * x_proj + z * z, self._r_squared_min, self._r_squared_max)
+        theta2 = self._solve_theta2(r_squared)
+        theta1 = _clamp(self._solve_theta1(x_proj, z, theta2), *self.joint_limits[1])
+
+        return theta0, theta1, theta2
+
+    def _solve_theta2(self, r_squared: float) -> Angle:
+        l1, l2 = self.solver.l1, self.solver.l2
+        cos_theta2 = (r_squared - l1 * l1 - l2 * l2) / (2 * l1 * l2)
+        return -math.acos(_clamp(cos_theta2, self._cos_theta2_min, self._cos_theta2_max))
+
+    def _solve_theta1(self, x_proj: float, z: float, theta2: Angle) -> Angle:
+        l1, l2 = self.solver.l1, self.solver.l2
+        k1 = l1 + l2 * math.cos(theta2)
+        k2 = l2 * math.sin(theta2)
+        return math.atan2(z, x_proj) - math.atan2(k2, k1)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return low if value < low else high if value > high else value
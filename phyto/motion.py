@@ -1,3 +1,4 @@
+import math
 import time
 
 try:
@@ -5,52 +6,501 @@ try:
 except ImportError:
     Callable = ...
 
+from phyto.fixedpoint import UM_PER_M, norm_um, to_m, to_um
 from phyto.types import Point3D, TimeFunc
 
 
 class PositionSmoother:
+    """
+    Moves a position towards a target at a constant speed, as time passes.
+
+    Position and target are kept as scalar fields and updated in place, and the at-target state is cached,
+    so reading the position allocates nothing and reads the clock at most once.
+    """
+
+    __slots__ = (
+        'speed', 'time_func', 'tolerance',
+        '_x', '_y', '_z', '_tx', '_ty', '_tz', '_target', '_point', '_at_target', '_t_last_update',
+    )
+
     speed: float
     time_func: TimeFunc
-    tolerance: float
 
-    _position: Point3D
-    _target: Point3D
-    _t_last_update: float
+    tolerance: float
+    """Distance at which the position counts as having reached the target. Applies from the next target set."""
 
     def __init__(self, position: Point3D, speed: float, time_func=time.monotonic, tolerance: float = 0.001):
         self.speed = speed
         self.time_func = time_func
         self.tolerance = tolerance
 
+        self._point = Point3D(0., 0., 0.)
+        self._x, self._y, self._z = position.x, position.y, position.z
+        self.target = position
+
+    @property
+    def position(self) -> Point3D:
+        """
+        The current position. The returned point is updated in place by later reads,
+        so copy it if it needs to be kept.
+        """
+
+        if not self._at_target:
+            return self.update(self.time_func())
+
+        point = self._point
+        point.x, point.y, point.z = self._x, self._y, self._z
+        return point
+
+    @position.setter
+    def position(self, position: Point3D) -> None:
+        self._x, self._y, self._z = position.x, position.y, position.z
+        self._t_last_update = self.time_func()
+        self._update_at_target()
+
+    def update(self, now: float) -> Point3D:
+        """
+        Moves the position towards the target, up to the given time, and returns the position.
+        Lets callers share one clock read.
+        """
+
+        if not self._at_target:
+            self._step(now)
+
+        point = self._point
+        point.x, point.y, point.z = self._x, self._y, self._z
+        return point
+
+    def _step(self, now: float) -> None:
+        dt = now - self._t_last_update
+        self._t_last_update = now
+
+        ex, ey, ez = self._tx - self._x, self._ty - self._y, self._tz - self._z
+        error_norm = math.sqrt(ex * ex + ey * ey + ez * ez)
+        step_norm = self.speed * dt
+
+        if step_norm < error_norm:
+            scale = step_norm / error_norm
+            self._x += ex * scale
+            self._y += ey * scale
+            self._z += ez * scale
+            self._at_target = error_norm - step_norm < self.tolerance
+        else:
+            self._x, self._y, self._z = self._tx, self._ty, self._tz
+            self._at_target = True
+
+    @property
+    def target(self) -> Point3D:
+        return self._target
+
+    @target.setter
+    def target(self, target: Point3D) -> None:
+        self._target = target
+        self._tx, self._ty, self._tz = target.x, target.y, target.z
+        self._t_last_update = self.time_func()
+        self._update_at_target()
+
+    @property
+    def at_target(self) -> bool:
+        return self._at_target
+
+    def set_target(self, target: Point3D, speed: float = None, duration: float = None) -> None:
+        """Sets the target point and, optionally, the speed or the duration of the movement."""
+
+        if speed is not None and duration is not None:
+            raise ValueError(f'Cannot set both speed and duration. speed={speed}; duration={duration}')
+
+        self.target = target
+        if speed is not None:
+            self.speed = speed
+        elif duration is not None:
+            self.speed = self._distance_to_target() / duration
+
+    def duration_to(self, target: Point3D, speed: float) -> float:
+        """How long moving from the current position to the target at the given speed would take."""
+        return self.position.distance(target) / speed
+
+    def _distance_to_target(self) -> float:
+        ex, ey, ez = self._tx - self._x, self._ty - self._y, self._tz - self._z
+        return math.sqrt(ex * ex + ey * ey + ez * ez)
+
+    def _update_at_target(self) -> None:
+        self._at_target = self._distance_to_target() < self.tolerance
+
+
+class FixedPositionSmoother:
+    """
+    Integer-only version of `PositionSmoother`, for microcontrollers without an FPU.
+
+    Position and target are kept in micrometres and the speed in micrometres per second, so each update is
+    integer math apart from reading the clock. The sub-micrometre part of each step is carried over to the
+    next, so frequent updates of slow moves don't round down to standing still. Has the same interface as
+    `PositionSmoother`, with points in meters, and `position_um` and `update_um` to stay in micrometres.
+    """
+
+    time_func: TimeFunc
+
+    def __init__(self, position: Point3D, speed: float, time_func=time.monotonic, tolerance: float = 0.001):
+        self.time_func = time_func
+        self.speed = speed
+        self.tolerance = tolerance
+
+        self._x = self._y = self._z = self._tx = self._ty = self._tz = 0
+        self._point_um = Point3D(0, 0, 0)
         self.position = position
         self.target = position
 
+    @property
+    def speed(self) -> float:
+        return self._speed / UM_PER_M
+
+    @speed.setter
+    def speed(self, speed: float) -> None:
+        # µm/s
+        self._speed = speed if speed == float('inf') else to_um(speed)
+        self._carry = 0
+
+    @property
+    def tolerance(self) -> float:
+        return to_m(self._tolerance)
+
+    @tolerance.setter
+    def tolerance(self, tolerance: float) -> None:
+        self._tolerance = to_um(tolerance)
+
     @property
     def position(self) -> Point3D:
         self._update_position()
-        return self._position
+        return Point3D(to_m(self._x), to_m(self._y), to_m(self._z))
+
+    @position.setter
+    def position(self, position: Point3D) -> None:
+        self._x, self._y, self._z = to_um(position.x), to_um(position.y), to_um(position.z)
+        self._t_last_update = self._now_us()
+        self._start_move()
+
+    @property
+    def position_um(self) -> Point3D:
+        """The current position in micrometres. Updated in place by later reads, so copy it to keep it."""
+
+        self._update_position()
+        point = self._point_um
+        point.x, point.y, point.z = self._x, self._y, self._z
+        return point
+
+    @property
+    def target(self) -> Point3D:
+        return Point3D(to_m(self._tx), to_m(self._ty), to_m(self._tz))
+
+    @target.setter
+    def target(self, target: Point3D) -> None:
+        self._tx, self._ty, self._tz = to_um(target.x), to_um(target.y), to_um(target.z)
+        self._t_last_update = self._now_us()
+        self._start_move()
+
+    @property
+    def at_target(self) -> bool:
+        return norm_um(self._tx - self._x, self._ty - self._y, self._tz - self._z) < self._tolerance
+
+    def set_target(self, target: Point3D, speed: float = None, duration: float = None) -> None:
+        """Sets the target point and, optionally, the speed or the duration of the movement."""
 
-    def _update_position(self) -> None:
+        if speed is not None and duration is not None:
+            raise ValueError(f'Cannot set both speed and duration. speed={speed}; duration={duration}')
+
+        self.target = target
+        if speed is not None:
+            self.speed = speed
+        elif duration is not None:
+            # Rounded up, so the move never takes longer than the duration, and never stalls at 0 µm/s
+            self._speed = -(-self._distance * 1000 // max(1, int(duration * 1000)))
+            self._carry = 0
+
+    def duration_to(self, target: Point3D, speed: float) -> float:
+        """How long moving from the current position to the target at the given speed would take."""
+        self._update_position()
+        error = norm_um(to_um(target.x) - self._x, to_um(target.y) - self._y, to_um(target.z) - self._z)
+        return to_m(error) / speed
+
+    def update(self, now: float) -> Point3D:
+        """
+        Moves the position towards the target, up to the given time, and returns the position.
+        Lets callers share one clock read.
+        """
+
+        if not self.at_target:
+            self._update_position(int(now * 1000000))
+        return Point3D(to_m(self._x), to_m(self._y), to_m(self._z))
+
+    def update_um(self, now: float) -> Point3D:
+        """Like `update`, but returns the position in micrometres, updated in place like `position_um`."""
+
+        if not self.at_target:
+            self._update_position(int(now * 1000000))
+        point = self._point_um
+        point.x, point.y, point.z = self._x, self._y, self._z
+        return point
+
+    def _start_move(self) -> None:
+        """Starts a straight move from the current position to the target."""
+
+        self._sx, self._sy, self._sz = self._x, self._y, self._z
+        self._distance = norm_um(self._tx - self._x, self._ty - self._y, self._tz - self._z)
+        self._travelled = 0
+        self._carry = 0
+
+    def _now_us(self) -> int:
+        return int(self.time_func() * 1000000)
+
+    def _update_position(self, now: int = None) -> None:
         if self.at_target:
             return
 
-        now = self.time_func()
+        if now is None:
+            now = self._now_us()
         dt = now - self._t_last_update
         self._t_last_update = now
 
-        error = (self.target - self._position)
-        error_norm = error.norm()
-        step = (error / error_norm) * self.speed * dt
+        speed = self._speed
+        if speed == float('inf'):
+            travelled = self._distance
+        else:
+            # In µm·µs, keeping what doesn't make a whole micrometre for the next update
+            travel = speed * dt + self._carry
+            step = travel // UM_PER_M
+            self._carry = travel - step * UM_PER_M
+            travelled = self._travelled + step
 
-        if step.norm() < error_norm:
-            self._position += step
+        distance = self._distance
+        if travelled < distance:
+            # From the start of the move rather than the last position, so rounding doesn't build up
+            self._travelled = travelled
+            self._x = self._sx + (self._tx - self._sx) * travelled // distance
+            self._y = self._sy + (self._ty - self._sy) * travelled // distance
+            self._z = self._sz + (self._tz - self._sz) * travelled // distance
         else:
-            self._position = self.target
+            self._x, self._y, self._z = self._tx, self._ty, self._tz
+
+
+class Trajectory:
+    """
+    Straight-line move from a start to an end point with a trapezoidal velocity profile.
+
+    Planned once per move, after which `position_at` is a closed-form evaluation, so the position at a given
+    time does not depend on how often it is queried. Without an acceleration, the profile is a constant speed.
+    """
+
+    __slots__ = (
+        'start', 'end', 'start_time', 'duration',
+        '_distance', '_ux', '_uy', '_uz', '_acceleration', '_peak_speed', '_t_accel', '_t_decel',
+    )
+
+    start: Point3D
+    end: Point3D
+    start_time: float
+    duration: float
+
+    def __init__(self, start: Point3D, end: Point3D, start_time: float, speed: float, acceleration: float = None):
+        self.start = Point3D(0., 0., 0.)
+        self.end = Point3D(0., 0., 0.)
+        self.plan(start, end, start_time, speed, acceleration)
+
+    def plan(self, start: Point3D, end: Point3D, start_time: float, speed: float, acceleration: float = None) -> None:
+        """Replans the trajectory in place, with the given peak speed and, optionally, acceleration."""
+
+        assert acceleration is None or acceleration > 0, acceleration
+
+        self.start.set(start)
+        self.end.set(end)
+        self.start_time = start_time
+
+        dx, dy, dz = end.x - start.x, end.y - start.y, end.z - start.z
+        distance = math.sqrt(dx * dx + dy * dy + dz * dz)
+        self._distance = distance
+        if distance > 0:
+            assert speed > 0, speed
+            self._ux, self._uy, self._uz = dx / distance, dy / distance, dz / distance
+        else:
+            self._ux = self._uy = self._uz = 0.
+            speed = float('inf')
+
+        if acceleration is None or acceleration == float('inf') or distance == 0:
+            acceleration = float('inf')
+            t_accel = 0.
+        elif speed * speed > distance * acceleration:
+            # Triangular profile: the move is too short to reach the full speed
+            speed = math.sqrt(distance * acceleration)
+            t_accel = speed / acceleration
+        else:
+            t_accel = speed / acceleration
+
+        self._acceleration = acceleration
+        self._peak_speed = speed
+        self._t_accel = t_accel
+        self.duration = distance / speed + t_accel
+        self._t_decel = self.duration - t_accel
+
+    @staticmethod
+    def duration_for(distance: float, speed: float, acceleration: float = None) -> float:
+        """Duration of a move of the given distance, peak speed and, optionally, acceleration."""
+
+        if distance == 0:
+            return 0.
+        if acceleration is None or acceleration == float('inf'):
+            return distance / speed
+        if speed * speed > distance * acceleration:
+            return 2 * math.sqrt(distance / acceleration)
+        return distance / speed + speed / acceleration
+
+    @staticmethod
+    def speed_for_duration(distance: float, duration: float, acceleration: float = None) -> float:
+        """
+        Peak speed that covers the distance in the given duration. If the duration is too short for the
+        acceleration, returns the speed of the fastest (triangular) profile instead.
+        """
+
+        if duration <= 0:
+            return float('inf')
+        if acceleration is None or acceleration == float('inf'):
+            return distance / duration
+
+        discriminant = acceleration * acceleration * duration * duration - 4 * acceleration * distance
+        if discriminant < 0:
+            return acceleration * duration / 2
+        return (acceleration * duration - math.sqrt(discriminant)) / 2
+
+    @property
+    def end_time(self) -> float:
+        return self.start_time + self.duration
+
+    def distance_at(self, t: float) -> float:
+        """Distance travelled along the line at time ``t``."""
+
+        t -= self.start_time
+        if t <= 0:
+            return 0.
+        if t >= self.duration:
+            return self._distance
+
+        if t < self._t_accel:
+            return 0.5 * self._acceleration * t * t
+        if t <= self._t_decel:
+            return self._peak_speed * (t - 0.5 * self._t_accel)
+
+        t_left = self.duration - t
+        return self._distance - 0.5 * self._acceleration * t_left * t_left
+
+    def position_at(self, t: float, out: Point3D = None) -> Point3D:
+        """Position at time ``t``. Written into ``out`` if given, to avoid allocating a point."""
+
+        if out is None:
+            out = Point3D(0., 0., 0.)
+
+        if t >= self.start_time + self.duration:
+            return out.set(self.end)
+
+        s = self.distance_at(t)
+        start = self.start
+        out.x = start.x + self._ux * s
+        out.y = start.y + self._uy * s
+        out.z = start.z + self._uz * s
+        return out
+
+
+class TrajectorySmoother:
+    """
+    Drop-in replacement for `PositionSmoother` that follows a planned `Trajectory` instead of integrating the
+    position step by step. Each new target, position or speed replans the move from the current position,
+    starting from rest, and reading the position is then a closed-form evaluation at the current time.
+    """
+
+    __slots__ = (
+        'time_func', 'tolerance', 'acceleration',
+        '_speed', '_trajectory', '_line', '_target', '_point', '_at_target',
+    )
+
+    time_func: TimeFunc
+
+    tolerance: float
+    """Distance at which the position counts as having reached the target when a move is planned."""
+
+    acceleration: float
+    """Acceleration and deceleration of each move. If None, moves are at constant speed."""
+
+    def __init__(
+            self,
+            position: Point3D,
+            speed: float,
+            time_func=time.monotonic,
+            tolerance: float = 0.001,
+            acceleration: float = None,
+    ):
+        self.time_func = time_func
+        self.tolerance = tolerance
+        self.acceleration = acceleration
+        self._speed = speed
+
+        self._point = position.copy()
+        self._target = position
+        self._line = Trajectory(position, position, time_func(), speed, acceleration)
+        self._trajectory = self._line
+        self._at_target = True
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    @speed.setter
+    def speed(self, speed: float) -> None:
+        self._speed = speed
+        if not self._at_target:
+            self._replan(self.time_func())
+
+    @property
+    def trajectory(self) -> Trajectory:
+        """The trajectory being followed."""
+        return self._trajectory
+
+    def duration_to(self, target: Point3D, speed: float) -> float:
+        """How long moving from the current position to the target at the given speed would take."""
+        return Trajectory.duration_for(self.position.distance(target), speed, self.acceleration)
+
+    def follow(self, trajectory) -> None:
+        """
+        Follows the given trajectory, e.g. a `phyto.spline.SplineTrajectory`, until it ends.
+        Anything with ``position_at`` and ``end_time`` will do.
+        """
+
+        self._trajectory = trajectory
+        self._target = trajectory.end
+        self._at_target = False
+
+    @property
+    def position(self) -> Point3D:
+        """
+        The current position. The returned point is updated in place by later reads,
+        so copy it if it needs to be kept.
+        """
+
+        if not self._at_target:
+            return self.update(self.time_func())
+        return self._point
 
     @position.setter
     def position(self, position: Point3D) -> None:
-        self._position = position
-        self._t_last_update = self.time_func()
+        self._point.set(position)
+        self._at_target = True
+        self._replan(self.time_func())
+
+    def update(self, now: float) -> Point3D:
+        """Evaluates the trajectory at the given time and returns the position. Lets callers share one clock read."""
+
+        if not self._at_target:
+            trajectory = self._trajectory
+            trajectory.position_at(now, self._point)
+            self._at_target = now >= trajectory.end_time
+
+        return self._point
 
     @property
     def target(self) -> Point3D:
@@ -59,11 +509,11 @@ class PositionSmoother:
     @target.setter
     def target(self, target: Point3D) -> None:
         self._target = target
-        self._t_last_update = self.time_func()
+        self._replan(self.time_func())
 
     @property
     def at_target(self) -> bool:
-        return self._position.almost_equal(self.target, tolerance=self.tolerance)
+        return self._at_target
 
     def set_target(self, target: Point3D, speed: float = None, duration: float = None) -> None:
         """Sets the target point and, optionally, the speed or the duration of the movement."""
@@ -71,8 +521,23 @@ class PositionSmoother:
         if speed is not None and duration is not None:
             raise ValueError(f'Cannot set both speed and duration. speed={speed}; duration={duration}')
 
-        self.target = target
+        now = self.time_func()
+        self.update(now)
+
+        self._target = target
         if speed is not None:
-            self.speed = speed
+            self._speed = speed
         elif duration is not None:
-            self.speed = (target - self._position).norm() / duration
+            self._speed = Trajectory.speed_for_duration(self._point.distance(target), duration, self.acceleration)
+
+        self._plan(now)
+
+    def _replan(self, now: float) -> None:
+        """Plans a new move from the position at the given time."""
+        self.update(now)
+        self._plan(now)
+
+    def _plan(self, now: float) -> None:
+        self._line.plan(self._point, self._target, now, self._speed, self.acceleration)
+        self._trajectory = self._line
+        self._at_target = self._point.distance(self._target) < self.tolerance
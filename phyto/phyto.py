@@ -1,16 +1,16 @@
 import asyncio
 import time
 
-from busio import I2C
-
 from phyto.adc import get_adc
 from phyto.asyncio import be_nice
 from phyto.base.base import Base, get_base
+from phyto.base.commands import WalkCommands, face_direction
 from phyto.base.servo_controller import ServoController
 from phyto.battery import get_batteries, Batteries, BatteryMonitor
 from phyto.buttons import Buttons, get_buttons
 from phyto.buzzer import get_buzzer
 from phyto.eyes import Eyes, get_eyes
+from phyto.i2c import BusArbiter
 
 Mode = str
 WALK = 'walk'
@@ -21,7 +21,7 @@ SLOW = 'slow'
 FAST = 'fast'
 
 
-def get_phyto(i2c_bus: I2C, servo_controller: ServoController) -> 'Phyto':
+def get_phyto(i2c_bus: BusArbiter, servo_controller: ServoController) -> 'Phyto':
     adc = get_adc(i2c_bus)
     batteries = get_batteries(adc)
     buzzer = get_buzzer()
@@ -48,6 +48,18 @@ class Phyto:
     slow_walk_speed: float
     rest_speed: float
 
+    steer_period: float
+    """Time between eye readings while walking fast."""
+
+    battery_check_period: float
+    """Time between motor battery reads for `can_walk`, about one step, to keep the I2C bus clear for the servos."""
+
+    face_light: bool
+    """
+    If true, walking fast turns to face the light and walks forward, instead of walking straight towards it
+    whichever way the body faces. See `phyto.base.walk_benchmark` for how long each takes to reach the light.
+    """
+
     def __init__(
             self,
             eyes: Eyes,
@@ -58,6 +70,9 @@ class Phyto:
             fast_walk_speed: float = 0.1,
             slow_walk_speed: float = 0.05,
             rest_speed: float = 0.05,
+            steer_period: float = 0.1,
+            battery_check_period: float = 1.,
+            face_light: bool = False,
     ):
         self.mode = WALK
         self.eyes = eyes
@@ -69,26 +84,42 @@ class Phyto:
         self.fast_walk_speed = fast_walk_speed
         self.slow_walk_speed = slow_walk_speed
         self.rest_speed = rest_speed
+        self.steer_period = steer_period
+        self.battery_check_period = battery_check_period
+        self.face_light = face_light
 
         self._walk_speed = SLOW
         self._resume_walking_time = None
         self._rested = False
+        self._motor_battery_low = False
+        self._walk_commands = None
 
         self._mode_toggle_button = self.buttons.button0
         self._walk_speed_button = self.buttons.button1
 
     @property
     def can_walk(self) -> bool:
-        return not self.batteries.motor_battery.voltage_is_low
+        """From the last motor battery check, so reading it costs no bus traffic."""
+        return not self._motor_battery_low
 
     async def run(self) -> None:
+        self._motor_battery_low = await self.batteries.motor_battery.is_low()
+
         await asyncio.gather(
             self.battery_monitor.run(),
+            self._check_motor_battery(),
             self._handle_mode_toggle_button(),
             self._handle_walk_speed_button(),
             self._run_base(),
         )
 
+    async def _check_motor_battery(self) -> None:
+        while True:
+            await asyncio.sleep(self.battery_check_period)
+            self._motor_battery_low = await self.batteries.motor_battery.is_low()
+            if self._motor_battery_low:
+                self._stop_walking_fast()
+
     async def _handle_mode_toggle_button(self) -> None:
         while True:
             await self._mode_toggle_button.until_pressed()
@@ -96,6 +127,7 @@ class Phyto:
             await self._mode_toggle_button.until_not_pressed()
 
     def _toggle_mode(self) -> None:
+        self._stop_walking_fast()
         if self.mode == WALK:
             self.mode = REST
             self._rested = False
@@ -114,6 +146,7 @@ class Phyto:
             await self._walk_speed_button.until_not_pressed()
 
     def _toggle_walk_speed(self) -> None:
+        self._stop_walking_fast()
         if self._walk_speed == FAST:
             self._walk_speed = SLOW
             self._resume_walking_time = None
@@ -146,8 +179,41 @@ class Phyto:
             raise RuntimeError(f'Unknown walk speed: {self._walk_speed}')
 
     async def _walk_fast(self) -> None:
+        commands = self._walk_commands = WalkCommands()
+        self._steer_towards_light(commands)
+        try:
+            await asyncio.gather(
+                self.base.walk_stream(commands),
+                self._steer_fast(commands),
+            )
+        finally:
+            self._walk_commands = None
+
+    def _stop_walking_fast(self) -> None:
+        """Ends the walk stream, if walking fast, without waiting for the steering to notice."""
+
+        commands = self._walk_commands
+        if commands is not None:
+            commands.close()
+
+    async def _steer_fast(self, commands: WalkCommands) -> None:
+        """Steers towards the light while walking fast, until the mode or walk speed changes."""
+
+        while not commands.closed and self._walk_speed == FAST and self.mode == WALK:
+            await asyncio.sleep(self.steer_period)
+            if commands.closed or not self.can_walk:
+                break
+
+            self._steer_towards_light(commands)
+
+        commands.close()
+
+    def _steer_towards_light(self, commands: WalkCommands) -> None:
         direction = self.eyes.read().brightest_direction
-        await self.base.walk(self.fast_walk_speed, direction, steps=1)
+        if self.face_light:
+            commands.put_velocity(*face_direction(self.fast_walk_speed, direction))
+        else:
+            commands.put(self.fast_walk_speed, direction)
 
     async def _walk_slow(self) -> None:
         if self._should_resume_walking():
@@ -157,6 +223,7 @@ class Phyto:
                 direction = eyes_reading.brightest_direction
                 await self.base.walk(self.slow_walk_speed, direction, steps=1)
                 await self.base.rest(self.rest_speed)
+                self.base.sleep()
 
             self._resume_walking_time = time.monotonic() + 60 * 1
 
@@ -167,3 +234,4 @@ class Phyto:
         if not self._rested:
             self._rested = True
             await self.base.rest(self.rest_speed)
+            self.base.sleep()
@@ -0,0 +1,164 @@
+"""
+Cubic spline trajectories through a sequence of waypoints, so feet pass through intermediate waypoints
+without stopping.
+
+Each segment is a cubic Hermite polynomial per axis, with Catmull-Rom tangents from the neighbouring
+waypoints. Vertical tangents are limited so the curve never overshoots its waypoints in z, e.g. a foot
+moving between two points on the ground never dips below it. Coefficients are computed once, so evaluating the
+position is one polynomial per axis.
+"""
+
+import math
+from array import array
+
+from phyto.types import Point3D
+
+try:
+    from typing import List, Sequence
+except ImportError:
+    List = ...
+    Sequence = ...
+
+
+class SplineTrajectory:
+    """
+    Passes through ``points[i]`` at ``times[i]``, starting and ending at rest.
+    Has the same evaluation interface as `phyto.motion.Trajectory`.
+
+    If ``closed``, the first and last points are the same point of a repeating cycle, and the curve passes
+    through it without stopping instead, so consecutive cycles join smoothly.
+    """
+
+    __slots__ = ('start', 'end', 'start_time', 'duration', '_times', '_xs', '_ys', '_zs', '_segment')
+
+    start: Point3D
+    end: Point3D
+    start_time: float
+    duration: float
+
+    def __init__(self, points: Sequence[Point3D], times: Sequence[float], closed: bool = False):
+        assert len(points) >= 2, len(points)
+        assert len(points) == len(times), (len(points), len(times))
+
+        self.start = points[0].copy()
+        self.end = points[-1].copy()
+        self.start_time = times[0]
+        self.duration = times[-1] - times[0]
+
+        # Relative to the start, so single-precision floats keep their resolution
+        times = [t - self.start_time for t in times]
+        for i in range(len(times) - 1):
+            assert times[i] < times[i + 1], times
+
+        self._times = array('f', times)
+        self._xs = _coefficients([p.x for p in points], times, closed, monotone=False)
+        self._ys = _coefficients([p.y for p in points], times, closed, monotone=False)
+        self._zs = _coefficients([p.z for p in points], times, closed, monotone=True)
+        self._segment = 0
+
+    @property
+    def end_time(self) -> float:
+        return self.start_time + self.duration
+
+    def position_at(self, t: float, out: Point3D = None) -> Point3D:
+        """Position at time ``t``. Written into ``out`` if given, to avoid allocating a point."""
+
+        if out is None:
+            out = Point3D(0., 0., 0.)
+
+        t -= self.start_time
+        if t <= 0:
+            return out.set(self.start)
+        if t >= self.duration:
+            return out.set(self.end)
+
+        i = self._find_segment(t)
+        u = t - self._times[i]
+        j = 4 * i
+        xs, ys, zs = self._xs, self._ys, self._zs
+        out.x = ((xs[j] * u + xs[j + 1]) * u + xs[j + 2]) * u + xs[j + 3]
+        out.y = ((ys[j] * u + ys[j + 1]) * u + ys[j + 2]) * u + ys[j + 3]
+        out.z = ((zs[j] * u + zs[j + 1]) * u + zs[j + 2]) * u + zs[j + 3]
+        return out
+
+    def peak_speeds(self, samples: int = 8) -> List[float]:
+        """Highest speed reached in each segment, sampled at ``samples + 1`` points."""
+
+        times = self._times
+        xs, ys, zs = self._xs, self._ys, self._zs
+        peaks = []
+        for i in range(len(times) - 1):
+            j = 4 * i
+            dt = times[i + 1] - times[i]
+            peak = 0.
+            for k in range(samples + 1):
+                u = dt * k / samples
+                vx = (3 * xs[j] * u + 2 * xs[j + 1]) * u + xs[j + 2]
+                vy = (3 * ys[j] * u + 2 * ys[j + 1]) * u + ys[j + 2]
+                vz = (3 * zs[j] * u + 2 * zs[j + 1]) * u + zs[j + 2]
+                peak = max(peak, math.sqrt(vx * vx + vy * vy + vz * vz))
+            peaks.append(peak)
+
+        return peaks
+
+    def _find_segment(self, t: float) -> int:
+        # Trajectories are normally evaluated at increasing times, so start from the last segment
+        times = self._times
+        last = len(times) - 2
+        i = self._segment
+        if t < times[i]:
+            i = 0
+        while i < last and t >= times[i + 1]:
+            i += 1
+
+        self._segment = i
+        return i
+
+
+def _coefficients(values: Sequence[float], times: Sequence[float], closed: bool, monotone: bool) -> array:
+    """
+    Cubic coefficients ``a, b, c, d`` of each segment, in time since the start of the segment.
+    If ``monotone``, each segment stays between its end values.
+    """
+
+    n = len(values)
+    slopes = [(values[i + 1] - values[i]) / (times[i + 1] - times[i]) for i in range(n - 1)]
+
+    def tangent(before: float, after: float, dt_before: float, dt_after: float) -> float:
+        # Catmull-Rom tangent for uneven knot spacing
+        if monotone and before * after <= 0:
+            return 0.
+        return (before * dt_after + after * dt_before) / (dt_before + dt_after)
+
+    tangents = [0.] * n
+    for i in range(1, n - 1):
+        tangents[i] = tangent(slopes[i - 1], slopes[i], times[i] - times[i - 1], times[i + 1] - times[i])
+
+    if closed:
+        tangents[0] = tangents[-1] = tangent(slopes[-1], slopes[0], times[-1] - times[-2], times[1] - times[0])
+
+    # Fritsch-Carlson limit, so each segment stays monotone between its end values
+    for i in range(n - 1 if monotone else 0):
+        slope = slopes[i]
+        if slope == 0:
+            tangents[i] = tangents[i + 1] = 0.
+            continue
+
+        alpha, beta = tangents[i] / slope, tangents[i + 1] / slope
+        r = alpha * alpha + beta * beta
+        if r > 9:
+            scale = 3 / math.sqrt(r)
+            tangents[i] = scale * alpha * slope
+            tangents[i + 1] = scale * beta * slope
+
+    coefficients = array('f', [0.] * (4 * (n - 1)))
+    for i in range(n - 1):
+        dt = times[i + 1] - times[i]
+        slope, m0, m1 = slopes[i], tangents[i], tangents[i + 1]
+        j = 4 * i
+        coefficients[j] = (m0 + m1 - 2 * slope) / (dt * dt)
+        coefficients[j + 1] = (3 * slope - 2 * m0 - m1) / dt
+        coefficients[j + 2] = m0
+        coefficients[j + 3] = values[i]
+
+    return coefficients
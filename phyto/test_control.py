@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from unittest import TestCase
+
+from phyto.control import ControlLoop
+
+
+class ControlLoopTest(TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.loop = ControlLoop(rate=50, time_func=self.clock, sleep=self.clock.sleep)
+
+    def ticks(self, count: int, work: float = 0.) -> list:
+        async def run():
+            times = []
+            for _ in range(count):
+                times.append(await self.loop.tick())
+                self.clock.now += work
+            return times
+
+        return asyncio.run(run())
+
+    def test_ticks_at_fixed_rate(self):
+        self.assertEqual([0., 0.02, 0.04, 0.06], [round(t, 6) for t in self.ticks(4, work=0.005)])
+        self.assertEqual(3, len(self.clock.sleeps))
+        self.assertEqual(0, self.loop.overruns)
+
+    def test_records_jitter(self):
+        self.clock.oversleep = 0.001
+        self.ticks(3)
+
+        self.assertEqual(3, self.loop.ticks)
+        self.assertAlmostEqual(0.001, self.loop.max_jitter)
+        self.assertAlmostEqual(0.002 / 3, self.loop.mean_jitter)
+
+    def test_overrun_skips_missed_deadlines(self):
+        times = self.ticks(3, work=0.05)
+
+        self.assertEqual([0., 0.05, 0.1], [round(t, 6) for t in times])
+        self.assertEqual(2, self.loop.overruns)
+
+        # Back on the original schedule
+        self.clock.now = 0.11
+        self.assertAlmostEqual(0.12, self.ticks(1)[0])
+
+    def test_start_after_idle_restarts_schedule(self):
+        self.ticks(2)
+        self.clock.now = 10.
+
+        self.loop.start()
+        self.assertEqual([10., 10.02], [round(t, 6) for t in self.ticks(2)])
+        self.assertEqual(0, self.loop.overruns)
+
+    def test_other_tasks_run_while_overrunning(self):
+        ran_at_tick = []
+
+        async def control():
+            while not ran_at_tick and self.loop.ticks < 100:
+                await self.loop.tick()
+                self.clock.now += 0.025
+
+        async def other():
+            while self.loop.ticks < 10:
+                await asyncio.sleep(0)
+            ran_at_tick.append(self.loop.ticks)
+
+        async def run():
+            await asyncio.gather(control(), other())
+
+        asyncio.run(run())
+
+        self.assertEqual([10], ran_at_tick)
+        self.assertGreater(self.loop.overruns, 0)
+
+    def test_reset_stats(self):
+        self.ticks(2, work=0.05)
+        self.loop.reset_stats()
+
+        self.assertEqual(0, self.loop.ticks)
+        self.assertEqual(0, self.loop.overruns)
+        self.assertEqual(0., self.loop.mean_jitter)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.
+        self.oversleep = 0.
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay + self.oversleep
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import math
+import unittest
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from phyto.fixedpoint import ONE, acos_mrad, atan2_mrad, cos_q14, isqrt, norm_um, sin_q14
+
+
+class FixedPointTest(TestCase):
+    @parameterized.expand([(0,), (1,), (2,), (3,), (4,), (15,), (16,), (17,), (10 ** 6,), (2 ** 30 - 1,), (10 ** 12,)])
+    def test_isqrt(self, n: int):
+        self.assertEqual(math.isqrt(n), isqrt(n))
+
+    def test_isqrt_negative(self):
+        self.assertRaises(ValueError, isqrt, -1)
+
+    def test_sin_and_cos_are_close_to_float_versions(self):
+        for theta in range(-7000, 7000, 7):
+            self.assertAlmostEqual(math.sin(theta / 1000), sin_q14(theta) / ONE, delta=0.001)
+            self.assertAlmostEqual(math.cos(theta / 1000), cos_q14(theta) / ONE, delta=0.001)
+
+    def test_atan2_is_close_to_float_version(self):
+        for i in range(0, 360, 3):
+            angle = math.radians(i)
+            for r in (1, 100, 200000):
+                y, x = round(r * math.sin(angle)), round(r * math.cos(angle))
+                expected = math.atan2(y, x) * 1000
+                self.assertAlmostEqual(expected, atan2_mrad(y, x), delta=1, msg=f'y={y}, x={x}')
+
+    def test_acos_is_close_to_float_version(self):
+        for c in range(-ONE, ONE + 1, 97):
+            self.assertAlmostEqual(math.acos(c / ONE) * 1000, acos_mrad(c), delta=1.5, msg=f'c={c}')
+
+    def test_norm_um(self):
+        self.assertAlmostEqual(math.sqrt(30000 ** 2 + 40000 ** 2 + 120000 ** 2), norm_um(30000, -40000, 120000), delta=16)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,287 @@
+import asyncio
+import time
+import unittest
+from unittest import TestCase
+
+from adafruit_bus_device.i2c_device import I2CDevice
+from parameterized import parameterized
+
+from phyto.i2c import AdaptiveI2C, BusArbiter, ETIMEDOUT, FRAMES, I2CStats, InstrumentedI2C, LATENCY_BUCKETS, TELEMETRY
+
+
+class BusArbiterTest(TestCase):
+    def setUp(self) -> None:
+        self.now = 0.
+        self.bus = FakeI2C()
+        self.arbiter = BusArbiter(self.bus, frame_period=0.02, guard_time=0.002, time_func=lambda: self.now)
+        self.frames = I2CDevice(self.arbiter.get_bus(FRAMES), 0x40, probe=False)
+        self.telemetry = I2CDevice(self.arbiter.get_bus(TELEMETRY), 0x48, probe=False)
+
+    def write_frame(self) -> None:
+        with self.frames as device:
+            device.write(bytes(5))
+
+    def test_idle_without_frames(self):
+        self.assertTrue(self.arbiter.is_idle())
+
+    def test_idle_in_the_gap_after_a_frame(self):
+        self.write_frame()
+
+        self.now = 0.017
+        self.assertTrue(self.arbiter.is_idle())
+
+        # Too close to the next frame
+        self.now = 0.019
+        self.assertFalse(self.arbiter.is_idle())
+
+        # Frames have stopped
+        self.now = 0.04
+        self.assertTrue(self.arbiter.is_idle())
+
+    def test_writes_to_both_chips_are_one_frame(self):
+        self.write_frame()
+        self.now = 0.005
+        self.write_frame()
+
+        self.now = 0.0185
+        self.assertFalse(self.arbiter.is_idle())
+
+    def test_busy_wait_for_lock_is_recorded(self):
+        self.bus.locked_until = 3
+        with self.telemetry:
+            pass
+
+        bus = self.arbiter.get_bus(TELEMETRY)
+        self.assertEqual(1, bus.transactions)
+        self.assertEqual(0., bus.total_wait)
+        self.assertEqual(0, self.arbiter.get_bus(FRAMES).transactions)
+
+
+class BusArbiterTimingTest(TestCase):
+    def test_until_idle_waits_for_the_next_frame(self):
+        arbiter = BusArbiter(FakeI2C(), frame_period=0.02, guard_time=0.002)
+        frames = arbiter.get_bus(FRAMES)
+        telemetry = arbiter.get_bus(TELEMETRY)
+        frame_times = []
+
+        async def write_frames():
+            for _ in range(5):
+                frames.writeto(0x40, bytes(5))
+                frame_times.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        async def read_telemetry():
+            await asyncio.sleep(0.0195)
+            await telemetry.until_idle()
+            telemetry.try_lock()
+            telemetry.unlock()
+            return time.monotonic()
+
+        async def run():
+            _, read_time = await asyncio.gather(write_frames(), read_telemetry())
+            return read_time
+
+        read_time = asyncio.run(run())
+
+        # The read waited for the second frame, and went right after it
+        self.assertGreater(read_time, frame_times[1])
+        self.assertLess(read_time, frame_times[2])
+        self.assertGreater(telemetry.total_wait, 0.)
+
+
+class I2CStatsTest(TestCase):
+    @parameterized.expand([
+        (0, 0),
+        (64, 0),
+        (65, 1),
+        (32768, len(LATENCY_BUCKETS) - 1),
+        (32769, len(LATENCY_BUCKETS)),
+    ])
+    def test_histogram_bucket(self, latency, expected):
+        stats = I2CStats()
+        stats.record(1, 0, latency)
+        self.assertEqual(1, stats.histogram[expected])
+
+    def test_bits(self):
+        stats = I2CStats()
+        stats.record(5, 0, 0)
+        stats.record(1, 1, 0, addressings=2)
+
+        self.assertEqual(9 * 6 + 2 + 9 * 4 + 3, stats.bits)
+
+    def test_percentile(self):
+        stats = I2CStats()
+        for latency in [100] * 99 + [40000]:
+            stats.record(1, 0, latency)
+
+        self.assertEqual(128, stats.percentile(0.5))
+        self.assertEqual(128, stats.percentile(0.99))
+        self.assertEqual(40000, stats.percentile(1.))
+
+
+class InstrumentedI2CTest(TestCase):
+    def setUp(self) -> None:
+        self.now = 0
+        self.bus = InstrumentedI2C(FakeI2C(latency=self.advance), time_ns_func=lambda: self.now)
+
+    def advance(self) -> None:
+        self.now += 300_000
+
+    def test_stats_by_address(self):
+        self.bus.writeto(0x40, bytes(5))
+        self.bus.writeto(0x40, bytes(65), start=1, end=9)
+        self.bus.writeto_then_readfrom(0x48, bytes(1), bytearray(1))
+
+        snapshot = self.bus.snapshot()
+
+        self.assertEqual([0x40, 0x48], sorted(snapshot))
+        pca, adc = snapshot[0x40], snapshot[0x48]
+        self.assertEqual(2, pca.transactions)
+        self.assertEqual(13, pca.bytes_sent)
+        self.assertEqual(0, pca.bytes_received)
+        self.assertEqual(1, adc.bytes_sent)
+        self.assertEqual(1, adc.bytes_received)
+        self.assertEqual(300, adc.max_latency)
+        self.assertEqual(1, adc.histogram[3])
+        self.assertEqual(3, self.bus.total().transactions)
+
+    def test_snapshot_is_a_copy(self):
+        self.bus.writeto(0x40, bytes(5))
+        snapshot = self.bus.snapshot()
+        self.bus.writeto(0x40, bytes(5))
+        self.bus.reset_stats()
+
+        self.assertEqual(1, snapshot[0x40].transactions)
+        self.assertEqual({}, self.bus.snapshot())
+
+    def test_works_behind_an_arbiter(self):
+        arbiter = BusArbiter(self.bus)
+        with I2CDevice(arbiter.get_bus(TELEMETRY), 0x48, probe=False) as device:
+            device.write_then_readinto(bytes(1), bytearray(1))
+
+        self.assertEqual(1, self.bus.snapshot()[0x48].transactions)
+
+
+class AdaptiveI2CTest(TestCase):
+    PROBES = {0x40: 0x02, 0x48: None}
+
+    def setUp(self) -> None:
+        self.max_frequency = 400000
+        self.buses = []
+
+    def get_bus(self, **kwargs) -> AdaptiveI2C:
+        return AdaptiveI2C(None, None, (100000, 400000, 1000000), self.PROBES, i2c_factory=self.create, **kwargs)
+
+    def create(self, scl, sda, frequency: int) -> 'ProbedI2C':
+        bus = ProbedI2C(frequency, self.max_frequency)
+        self.buses.append(bus)
+        return bus
+
+    @parameterized.expand([
+        (50000, 100000),
+        (100000, 100000),
+        (400000, 400000),
+        (1000000, 1000000),
+    ])
+    def test_selects_fastest_frequency_that_passes_probes(self, max_frequency, expected):
+        self.max_frequency = max_frequency
+
+        bus = self.get_bus()
+
+        self.assertEqual(expected, bus.frequency)
+        self.assertIs(self.buses[-1], bus.i2c_bus)
+        self.assertTrue(all(probe_bus.deinitialized for probe_bus in self.buses[:-1]))
+
+    def test_probes_restore_registers(self):
+        bus = self.get_bus()
+        self.assertEqual(0xE2, bus.i2c_bus.registers[0x02])
+
+    def test_falls_back_after_too_many_errors(self):
+        bus = self.get_bus(max_window_errors=1)
+        bus.i2c_bus.errors = [ETIMEDOUT, 5]
+
+        for _ in range(2):
+            bus.try_lock()
+            with self.assertRaises(OSError):
+                bus.writeto(0x40, bytes(2))
+            bus.unlock()
+
+        self.assertEqual(100000, bus.frequency)
+        self.assertEqual(1, bus.fallbacks)
+        self.assertEqual(1, bus.timeouts)
+        self.assertEqual(1, bus.nacks)
+        self.assertEqual(2, bus.transactions)
+        self.assertTrue(self.buses[-2].deinitialized)
+
+    def test_errors_spread_over_windows_dont_fall_back(self):
+        bus = self.get_bus(window=2, max_window_errors=1)
+
+        for _ in range(3):
+            bus.i2c_bus.errors = [5]
+            with self.assertRaises(OSError):
+                bus.writeto(0x40, bytes(2))
+            bus.writeto(0x40, bytes(2))
+            bus.unlock()
+
+        self.assertEqual(400000, bus.frequency)
+        self.assertEqual(0, bus.fallbacks)
+
+
+class ProbedI2C:
+    """Registers of a PCA9685 at 0x40, which read back wrong above ``max_frequency``."""
+
+    def __init__(self, frequency: int, max_frequency: int):
+        self.frequency = frequency
+        self.max_frequency = max_frequency
+        self.registers = bytearray(256)
+        self.registers[0x02] = 0xE2
+        self.errors = []
+        self.deinitialized = False
+
+    def deinit(self) -> None:
+        self.deinitialized = True
+
+    def try_lock(self) -> bool:
+        return True
+
+    def unlock(self) -> None:
+        pass
+
+    def _check(self) -> None:
+        if self.errors:
+            raise OSError(self.errors.pop(0), 'Fake error')
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        self._check()
+        self.registers[buffer[0]] = buffer[1]
+
+    def readfrom_into(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        self._check()
+
+    def writeto_then_readfrom(self, address: int, out_buffer, in_buffer, **kwargs) -> None:
+        self._check()
+        value = self.registers[out_buffer[0]]
+        in_buffer[0] = value if self.frequency <= self.max_frequency else value ^ 0x01
+
+
+class FakeI2C:
+    def __init__(self, latency=lambda: None):
+        self.locked_until = 0
+        self._latency = latency
+
+    def try_lock(self) -> bool:
+        self.locked_until -= 1
+        return self.locked_until <= 0
+
+    def unlock(self) -> None:
+        pass
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end: int = None) -> None:
+        self._latency()
+
+    def writeto_then_readfrom(self, address: int, out_buffer, in_buffer, **kwargs) -> None:
+        self._latency()
+
+
+if __name__ == '__main__':
+    unittest.main()
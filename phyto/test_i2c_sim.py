@@ -0,0 +1,164 @@
+import asyncio
+import unittest
+from unittest import TestCase
+
+from adafruit_bus_device.i2c_device import I2CDevice
+from parameterized import parameterized
+
+from phyto import config
+from phyto.adc import ADS7830, get_adc
+from phyto.base.servo_controller import ALL_LED_ON_L, LED0_ON_L, get_servo_controller
+from phyto.battery import get_batteries
+from phyto.i2c import BusArbiter
+from phyto.i2c_sim import PRESCALE, SimulatedADS7830, SimulatedI2C, SimulatedPCA9685, get_simulated_i2c_bus
+
+
+class SimulatedI2CTest(TestCase):
+    def test_transactions_are_charged_their_time_on_the_wire(self):
+        bus = SimulatedI2C({0x40: SimulatedPCA9685()}, frequency=100000, overhead=0.0001)
+
+        bus.writeto(0x40, bytes(5))
+        bus.writeto_then_readfrom(0x40, bytes(1), bytearray(4))
+
+        self.assertEqual(2, bus.transactions)
+        self.assertAlmostEqual((56 + 66) / 100000 + 0.0002, bus.busy_time)
+
+    def test_missing_device_nacks(self):
+        bus = SimulatedI2C({})
+
+        with self.assertRaises(OSError):
+            bus.writeto(0x40, bytes(1))
+
+    def test_lock(self):
+        bus = SimulatedI2C({})
+
+        self.assertTrue(bus.try_lock())
+        self.assertFalse(bus.try_lock())
+        bus.unlock()
+        self.assertTrue(bus.try_lock())
+
+
+class SimulatedPCA9685Test(TestCase):
+    def setUp(self) -> None:
+        self.bus = get_simulated_i2c_bus()
+        self.chip_0 = self.bus.devices[config.PCA9685_0_I2C_ADDRESS]
+        self.chip_1 = self.bus.devices[config.PCA9685_1_I2C_ADDRESS]
+        self.controller = get_servo_controller(BusArbiter(self.bus))
+
+    def test_controller_sets_pwm_frequency(self):
+        for chip in (self.chip_0, self.chip_1):
+            self.assertEqual(121, chip.prescale)
+            self.assertFalse(chip.sleeping)
+            self.assertFalse(chip.halted)
+
+    @parameterized.expand([
+        (0,),
+        (5,),
+        (15,),
+        (16,),
+        (31,),
+    ])
+    def test_frame_reaches_the_chips(self, channel):
+        servo = self.controller.get_servo(channel)
+
+        self.controller.begin_frame()
+        servo.angle = 45
+        self.controller.write_frame()
+
+        chip = self.chip_0 if channel < 16 else self.chip_1
+        duty_cycle = servo._pwm_out.duty_cycle
+        self.assertEqual(duty_cycle & 0xFFF0, chip.get_duty_cycle(channel % 16))
+
+    def test_disable_turns_all_channels_off(self):
+        self.controller.get_servo(3).angle = 90
+
+        self.controller.disable()
+
+        self.assertEqual(0, self.chip_0.get_duty_cycle(3))
+        self.assertEqual((0, 0x1000), self.chip_0.get_registers(3))
+        self.assertEqual(bytes(4), self.chip_0.registers[ALL_LED_ON_L:ALL_LED_ON_L + 4])
+
+    def test_sleep_and_wake_restart_pwm(self):
+        servo = self.controller.get_servo(3)
+        servo.angle = 90
+        duty_cycle = self.chip_0.get_duty_cycle(3)
+
+        self.controller.sleep()
+        self.assertTrue(self.chip_0.sleeping)
+        self.assertEqual(0, self.chip_0.get_duty_cycle(3))
+
+        self.controller.wake()
+        self.assertFalse(self.chip_0.sleeping)
+        self.assertEqual(duty_cycle, self.chip_0.get_duty_cycle(3))
+
+    def test_prescale_is_only_written_while_asleep(self):
+        chip = SimulatedPCA9685()
+        chip.write(bytes((0x00, 0x20)))
+
+        chip.write(bytes((PRESCALE, 0x79)))
+
+        self.assertEqual(0x1E, chip.prescale)
+
+    def test_without_auto_increment_the_pointer_stays(self):
+        chip = SimulatedPCA9685()
+        chip.write(bytes((0x00, 0x00)))
+
+        chip.write(bytes((LED0_ON_L, 1, 2, 3)))
+
+        self.assertEqual(bytes((3, 0, 0, 0x10)), chip.registers[LED0_ON_L:LED0_ON_L + 4])
+
+    def test_auto_increment_wraps_after_the_last_channel(self):
+        chip = SimulatedPCA9685()
+        chip.write(bytes((0x00, 0x20)))
+
+        chip.write(bytes((LED0_ON_L + 4 * 16 - 1, 0x10)))
+        chip.write(bytes((LED0_ON_L + 4 * 16 - 1,)))
+
+        self.assertEqual(bytes((0x10, 0x20)), chip.read(2))
+
+
+class SimulatedADS7830Test(TestCase):
+    @parameterized.expand([
+        (0,),
+        (1,),
+        (4,),
+        (7,),
+    ])
+    def test_adc_reads_the_selected_channel(self, channel):
+        voltages = {c: 0. for c in range(8)}
+        voltages[channel] = 7.8
+        bus = SimulatedI2C({config.ADS7830_I2C_ADDRESS: SimulatedADS7830(voltages)})
+
+        adc = get_adc(BusArbiter(bus))
+
+        self.assertAlmostEqual(7.8, adc.read(channel), delta=15.6 / 255)
+        self.assertEqual(0., adc.read((channel + 1) % 8))
+
+    def test_differential(self):
+        ads = SimulatedADS7830({2: 6., 3: 2.})
+
+        # CH2 against CH3
+        ads.write(bytes((0x14,)))
+
+        self.assertEqual(int(round(4. * 255 / 15.6)), ads.convert())
+
+    def test_batteries(self):
+        bus = get_simulated_i2c_bus()
+        batteries = get_batteries(get_adc(BusArbiter(bus)))
+        bus.devices[config.ADS7830_I2C_ADDRESS].voltages[config.MOTOR_BATTERY_CHANNEL] = 6.
+
+        self.assertAlmostEqual(8.4, asyncio.run(batteries.logic_battery.read_voltage()), delta=15.6 / 255)
+        self.assertFalse(asyncio.run(batteries.logic_battery.is_low()))
+        self.assertTrue(asyncio.run(batteries.motor_battery.is_low()))
+
+    def test_adc_reads_when_idle_without_arbiter(self):
+        bus = get_simulated_i2c_bus()
+        adc = ADS7830(I2CDevice(bus, config.ADS7830_I2C_ADDRESS))
+
+        voltage = asyncio.run(adc.read_when_idle(config.LOGIC_BATTERY_CHANNEL))
+
+        self.assertAlmostEqual(8.4, voltage, delta=15.6 / 255)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 from unittest import TestCase
 
-from phyto.motion import PositionSmoother
+from parameterized import parameterized
+
+from phyto.motion import FixedPositionSmoother, PositionSmoother, Trajectory, TrajectorySmoother
 from phyto.types import Point3D
 
 
@@ -72,6 +74,252 @@ class PositionSmootherTest(TestCase):
         self.smoother.set_target(Point3D(2, 0, 0), duration=4)
         self.assertAlmostEqual(2 / 4, self.smoother.speed)
 
+    def test_duration_to(self):
+        self.assertAlmostEqual(4., self.smoother.duration_to(Point3D(0, 2, 0), speed=0.5))
+
+    def test_update_uses_given_time(self):
+        self.smoother.target = Point3D(1.5, 0, 0)
+
+        self.smoother.update(2.)
+        self.assertFalse(self.smoother.at_target)
+        self.assertEqual(Point3D(1.5, 0., 0.), self.smoother.update(100.))
+        self.assertTrue(self.smoother.at_target)
+
+        self.assertEqual(Point3D(1.5, 0., 0.), self.smoother.position)
+
+    def test_position_at_target_does_not_read_clock(self):
+        self.smoother.time_func = FakeTimeFunc()
+        self.assertEqual(Point3D(0., 0., 0.), self.smoother.position)
+        self.assertTrue(self.smoother.at_target)
+
+
+class PositionSmootherAllocationTest(TestCase):
+    def setUp(self) -> None:
+        self.smoother = PositionSmoother(
+            position=Point3D(0, 0, 0),
+            speed=0.5,
+            time_func=FakeTimeFunc(0., 1., 2., 3.),
+        )
+
+    def test_position_is_updated_in_place(self):
+        self.smoother.target = Point3D(1.5, 0, 0)
+
+        position = self.smoother.position
+        self.assertIs(position, self.smoother.position)
+        self.assertEqual(Point3D(1.0, 0., 0.), position)
+
+    def test_has_no_instance_dict(self):
+        self.assertFalse(hasattr(self.smoother, '__dict__'))
+
+
+class FixedPositionSmootherTest(PositionSmootherTest):
+    def setUp(self) -> None:
+        self.smoother = FixedPositionSmoother(
+            position=Point3D(0, 0, 0),
+            speed=0.5,
+            time_func=FakeTimeFunc(0., 1., 2., 3., 4., 5., 6., 7., 8., 9., 10.),
+        )
+
+    def test_position_has_micrometre_resolution(self):
+        self.smoother.speed = 0.1
+        self.smoother.target = Point3D(0.3, 0.4, 0)
+
+        position = self.smoother.position
+
+        self.assertAlmostEqual(0.06, position.x, places=5)
+        self.assertAlmostEqual(0.08, position.y, places=5)
+
+    def test_slow_move_by_duration_arrives(self):
+        clock = FakeClock()
+        smoother = FixedPositionSmoother(Point3D(0, 0, 0), speed=0.5, time_func=clock, tolerance=0.00001)
+
+        # Under 1 mm/s
+        smoother.set_target(Point3D(0.002, 0, 0), duration=3)
+
+        clock.now = 1.5
+        self.assertAlmostEqual(0.001, smoother.position.x, places=5)
+        clock.now = 3.
+        self.assertTrue(smoother.position.almost_equal(Point3D(0.002, 0, 0)))
+        self.assertTrue(smoother.at_target)
+
+    def test_update_um(self):
+        smoother = FixedPositionSmoother(Point3D(0, 0, 0), speed=0.1, time_func=FakeClock())
+        smoother.target = Point3D(0.03, 0.04, 0)
+
+        position = smoother.update_um(0.25)
+
+        self.assertEqual(Point3D(15000, 20000, 0), position)
+        self.assertIsInstance(position.x, int)
+        self.assertTrue(smoother.update(0.25).almost_equal(Point3D(0.015, 0.02, 0)))
+
+    @parameterized.expand([
+        (Point3D(1, 0, 0),),
+        (Point3D(1, 1, 1),),
+    ])
+    def test_fast_polling_moves_the_position(self, direction):
+        clock = FakeClock()
+        smoother = FixedPositionSmoother(Point3D(0, 0, 0), speed=0.05, time_func=clock, tolerance=0.00001)
+        smoother.target = direction
+
+        # Less than a micrometre per poll
+        for i in range(1, 1001):
+            clock.now = i * 0.00001
+            position = smoother.position
+
+        self.assertAlmostEqual(0.0005, position.distance(Point3D(0, 0, 0)), delta=0.000002)
+        for coordinate, d in zip((position.x, position.y, position.z), (direction.x, direction.y, direction.z)):
+            self.assertAlmostEqual(0.0005 * d / direction.norm(), coordinate, delta=0.000002)
+
+
+class TrajectoryTest(TestCase):
+    def test_constant_speed(self):
+        trajectory = Trajectory(Point3D(0, 0, 0), Point3D(3, 4, 0), start_time=1., speed=1.)
+
+        self.assertEqual(5., trajectory.duration)
+        self.assertEqual(Point3D(0, 0, 0), trajectory.position_at(0.))
+        self.assertTrue(Point3D(0.6, 0.8, 0).almost_equal(trajectory.position_at(2.)))
+        self.assertEqual(Point3D(3, 4, 0), trajectory.position_at(6.))
+        self.assertEqual(Point3D(3, 4, 0), trajectory.position_at(100.))
+
+    @parameterized.expand([
+        # Trapezoidal: accelerates for 1 s over 0.5 m, cruises for 2 s over 2 m, and decelerates for 1 s
+        (3., 1., 1., 4., [(0.5, 0.125), (1., 0.5), (2., 1.5), (3., 2.5), (3.5, 2.875), (4., 3.)]),
+        # Triangular: too short to reach the full speed
+        (1., 10., 1., 2., [(0.5, 0.125), (1., 0.5), (1.5, 0.875), (2., 1.)]),
+    ])
+    def test_distance_at(self, distance, speed, acceleration, expected_duration, expected_distances):
+        trajectory = Trajectory(Point3D(0, 0, 0), Point3D(distance, 0, 0), 0., speed, acceleration)
+
+        self.assertAlmostEqual(expected_duration, trajectory.duration)
+        for t, expected_distance in expected_distances:
+            self.assertAlmostEqual(expected_distance, trajectory.distance_at(t), msg=f't={t}')
+
+    @parameterized.expand([
+        (3., 4., None),
+        (3., 4., 1.),
+        (3., 10., 1.),
+    ])
+    def test_speed_for_duration(self, distance, duration, acceleration):
+        speed = Trajectory.speed_for_duration(distance, duration, acceleration)
+        trajectory = Trajectory(Point3D(0, 0, 0), Point3D(distance, 0, 0), 0., speed, acceleration)
+        self.assertAlmostEqual(duration, trajectory.duration)
+
+    @parameterized.expand([
+        (0., 1., 1., 0.),
+        (3., 1., None, 3.),
+        (3., 1., 1., 4.),
+        (1., 10., 1., 2.),
+    ])
+    def test_duration_for(self, distance, speed, acceleration, expected):
+        self.assertAlmostEqual(expected, Trajectory.duration_for(distance, speed, acceleration))
+
+    def test_position_at_writes_into_given_point(self):
+        trajectory = Trajectory(Point3D(0, 0, 0), Point3D(1, 0, 0), 0., 1.)
+        out = Point3D(0, 0, 0)
+
+        self.assertIs(out, trajectory.position_at(0.5, out))
+        self.assertEqual(Point3D(0.5, 0, 0), out)
+
+    def test_zero_distance_takes_no_time(self):
+        trajectory = Trajectory(Point3D(1, 2, 3), Point3D(1, 2, 3), 0., 1., 1.)
+
+        self.assertEqual(0., trajectory.duration)
+        self.assertEqual(Point3D(1, 2, 3), trajectory.position_at(0.))
+
+
+class TrajectorySmootherTest(TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.smoother = TrajectorySmoother(Point3D(0, 0, 0), speed=0.5, time_func=self.clock)
+
+    def test_position_does_not_depend_on_polling_rate(self):
+        self.smoother.target = Point3D(1.5, 0, 0)
+
+        self.clock.now = 1.
+        self.assertEqual(Point3D(0.5, 0, 0), self.smoother.position)
+        self.assertFalse(self.smoother.at_target)
+
+        self.clock.now = 2.5
+        self.assertEqual(Point3D(1.25, 0, 0), self.smoother.position)
+
+        self.clock.now = 3.
+        self.assertEqual(Point3D(1.5, 0, 0), self.smoother.position)
+        self.assertTrue(self.smoother.at_target)
+
+    def test_moving_target_replans_from_current_position(self):
+        self.smoother.target = Point3D(1.5, 0, 0)
+
+        self.clock.now = 2.
+        self.smoother.target = Point3D(1, 1.5, 0)
+
+        self.clock.now = 3.
+        self.assertEqual(Point3D(1.0, 0.5, 0.0), self.smoother.position)
+
+    def test_changing_speed_replans(self):
+        self.smoother.target = Point3D(3, 0, 0)
+
+        self.clock.now = 2.
+        self.smoother.speed = 1.
+
+        self.clock.now = 3.
+        self.assertEqual(Point3D(2, 0, 0), self.smoother.position)
+
+    def test_changing_position(self):
+        self.smoother.target = Point3D(1.5, 0, 0)
+        self.smoother.position = Point3D(1.5, 1, 0)
+
+        self.clock.now = 1.
+        self.assertEqual(Point3D(1.5, 0.5, 0), self.smoother.position)
+
+    def test_infinite_speed(self):
+        self.smoother.speed = float('inf')
+        self.smoother.target = Point3D(1, 0, 0)
+
+        self.assertEqual(Point3D(1, 0, 0), self.smoother.position)
+        self.assertTrue(self.smoother.at_target)
+
+    def test_set_target_with_duration(self):
+        self.smoother.acceleration = 1.
+        self.smoother.set_target(Point3D(3, 0, 0), duration=4)
+
+        self.assertAlmostEqual(4., self.smoother.trajectory.duration)
+
+        self.clock.now = 4.
+        self.assertEqual(Point3D(3, 0, 0), self.smoother.position)
+
+    def test_duration_to_includes_acceleration(self):
+        self.smoother.acceleration = 1.
+        self.assertAlmostEqual(4., self.smoother.duration_to(Point3D(3, 0, 0), speed=1.))
+
+    def test_follow(self):
+        trajectory = Trajectory(Point3D(0, 0, 0), Point3D(0, 2, 0), start_time=0., speed=1.)
+        self.smoother.follow(trajectory)
+
+        self.assertIs(trajectory, self.smoother.trajectory)
+        self.assertFalse(self.smoother.at_target)
+
+        self.clock.now = 1.
+        self.assertEqual(Point3D(0, 1, 0), self.smoother.position)
+
+        self.clock.now = 2.
+        self.assertEqual(Point3D(0, 2, 0), self.smoother.position)
+        self.assertTrue(self.smoother.at_target)
+
+        self.smoother.target = Point3D(0, 0, 0)
+        self.assertIsNot(trajectory, self.smoother.trajectory)
+
+    def test_set_target_with_both_speed_and_duration_raises(self):
+        with self.assertRaises(ValueError):
+            self.smoother.set_target(Point3D(1, 0, 0), speed=1, duration=1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self) -> float:
+        return self.now
+
 
 class FakeTimeFunc:
     def __init__(self, *times: float):
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+from unittest import TestCase
+
+from phyto.adc import get_adc
+from phyto.base.base import get_base
+from phyto.base.servo_controller import get_servo_controller
+from phyto.battery import BatteryMonitor, get_batteries
+from phyto.buttons import Buttons
+from phyto.control import ControlLoop
+from phyto.eyes import Eye, Eyes
+from phyto.i2c import BusArbiter
+from phyto.i2c_sim import get_simulated_i2c_bus
+from phyto.motion import TrajectorySmoother
+from phyto.phyto import FAST, Phyto, REST
+
+
+class PhytoTest(TestCase):
+    def setUp(self) -> None:
+        bus = BusArbiter(get_simulated_i2c_bus())
+        batteries = get_batteries(get_adc(bus))
+
+        self.clock = FakeClock()
+        base = get_base(get_servo_controller(bus))
+        base.time_func = self.clock
+        base.control_loop = ControlLoop(time_func=self.clock, sleep=self.clock.sleep)
+        for leg in base.legs:
+            leg.smoother = TrajectorySmoother(leg.position, leg.smoother.speed, time_func=self.clock)
+
+        self.phyto = Phyto(
+            eyes=Eyes(FakeEye(1.), FakeEye(0.), FakeEye(0.)),
+            base=base,
+            buttons=Buttons(None, None),
+            batteries=batteries,
+            battery_monitor=BatteryMonitor(batteries, None),
+            steer_period=0.001,
+        )
+
+    def test_walk_fast_stops_when_ticks_are_slow(self):
+        phyto = self.phyto
+        phyto._walk_speed = FAST
+        control_loop = phyto.base.control_loop
+
+        # Every tick takes longer than the control period, like six IK solves and a slow frame commit can
+        update = phyto.base.gait_engine.update
+
+        def slow_update(now):
+            assert control_loop.ticks < 1000, 'Still walking'
+            self.clock.now += 0.025
+            return update(now)
+
+        phyto.base.gait_engine.update = slow_update
+
+        async def press_mode_button():
+            while control_loop.ticks < 50:
+                await asyncio.sleep(0)
+            phyto._toggle_mode()
+
+        async def run():
+            await asyncio.gather(phyto._walk_fast(), press_mode_button())
+
+        asyncio.run(run())
+
+        self.assertEqual(REST, phyto.mode)
+        self.assertLess(control_loop.ticks, 55)
+        self.assertGreater(control_loop.overruns, 0)
+        self.assertTrue(phyto.base.gait_engine.running)
+
+
+class FakeEye(Eye):
+    def __init__(self, value: float):
+        self.value = value
+
+    def read(self) -> float:
+        return self.value
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.now += delay
+
+
+if __name__ == '__main__':
+    unittest.main()
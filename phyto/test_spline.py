@@ -0,0 +1,78 @@
+import unittest
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from phyto.spline import SplineTrajectory
+from phyto.types import Point3D
+
+STEP = [
+    Point3D(0.1, 0., -0.08),
+    Point3D(0.1, -0.04, -0.08),
+    Point3D(0.1, -0.05, -0.08),
+    Point3D(0.1, -0.04, -0.03),
+    Point3D(0.1, 0.05, -0.03),
+    Point3D(0.1, 0.04, -0.08),
+    Point3D(0.1, 0., -0.08),
+]
+
+STEP_TIMES = [10., 10.4, 10.6, 11., 11.6, 12., 12.4]
+
+
+class SplineTrajectoryTest(TestCase):
+    @parameterized.expand([(False,), (True,)])
+    def test_passes_through_waypoints(self, closed):
+        spline = SplineTrajectory(STEP, STEP_TIMES, closed)
+
+        for point, t in zip(STEP, STEP_TIMES):
+            self.assertTrue(point.almost_equal(spline.position_at(t), tolerance=1e-6), msg=f't={t}')
+
+    def test_holds_end_points_outside_of_time_range(self):
+        spline = SplineTrajectory(STEP, STEP_TIMES)
+
+        self.assertEqual(STEP[0], spline.position_at(0.))
+        self.assertEqual(STEP[-1], spline.position_at(100.))
+        self.assertEqual(12.4, spline.end_time)
+
+    def test_starts_and_ends_at_rest(self):
+        spline = SplineTrajectory(STEP, STEP_TIMES)
+
+        self.assertLess(spline.position_at(10.001).distance(STEP[0]), 1e-5)
+        self.assertLess(spline.position_at(12.399).distance(STEP[-1]), 1e-5)
+
+    def test_closed_does_not_stop_at_ends(self):
+        spline = SplineTrajectory(STEP, STEP_TIMES, closed=True)
+
+        start_speed = spline.position_at(10.01).distance(STEP[0]) / 0.01
+        end_speed = spline.position_at(12.39).distance(STEP[-1]) / 0.01
+        self.assertGreater(start_speed, 0.05)
+        self.assertAlmostEqual(start_speed, end_speed, delta=0.005)
+
+    def test_never_goes_below_the_ground(self):
+        spline = SplineTrajectory(STEP, STEP_TIMES, closed=True)
+
+        for i in range(241):
+            self.assertGreaterEqual(spline.position_at(10. + i / 100).z, -0.08 - 1e-6)
+
+    def test_evaluating_out_of_order(self):
+        spline = SplineTrajectory(STEP, STEP_TIMES)
+        later = spline.position_at(12.2).copy()
+
+        spline.position_at(10.5)
+        self.assertEqual(later, spline.position_at(12.2))
+
+    def test_position_at_writes_into_given_point(self):
+        spline = SplineTrajectory(STEP, STEP_TIMES)
+        out = Point3D(0, 0, 0)
+
+        self.assertIs(out, spline.position_at(11., out))
+
+    def test_peak_speeds(self):
+        spline = SplineTrajectory([Point3D(0, 0, 0), Point3D(1, 0, 0)], [0., 1.])
+
+        # A segment that starts and ends at rest peaks at 1.5 times its average speed
+        self.assertAlmostEqual(1.5, spline.peak_speeds()[0], places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from math import pi
+from unittest import TestCase
+from unittest.mock import patch
+
+from phyto.types import Point3D, PointArray
+
+
+class Point3DTest(TestCase):
+    def test_has_no_instance_dict(self):
+        self.assertRaises(AttributeError, setattr, Point3D(1, 2, 3), 'w', 4)
+
+    def test_iadd(self):
+        point = Point3D(1, 2, 3)
+        result = point.iadd(Point3D(1, 1, 1)).iadd(1)
+
+        self.assertIs(point, result)
+        self.assertEqual(Point3D(3, 4, 5), point)
+
+    def test_isub(self):
+        point = Point3D(1, 2, 3)
+        result = point.isub(Point3D(1, 1, 1)).isub(1)
+
+        self.assertIs(point, result)
+        self.assertEqual(Point3D(-1, 0, 1), point)
+
+    def test_imul(self):
+        point = Point3D(1, 2, 3)
+        result = point.imul(Point3D(1, 2, 3)).imul(2)
+
+        self.assertIs(point, result)
+        self.assertEqual(Point3D(2, 8, 18), point)
+
+    def test_set_and_copy(self):
+        point = Point3D(1, 2, 3)
+        copy = point.copy()
+        point.set(Point3D(4, 5, 6))
+
+        self.assertEqual(Point3D(1, 2, 3), copy)
+        self.assertEqual(Point3D(4, 5, 6), point)
+
+    def test_norm(self):
+        self.assertAlmostEqual(13, Point3D(3, -4, 12).norm())
+        self.assertAlmostEqual(19, Point3D(3, -4, 12).norm(p=1))
+
+    def test_distance(self):
+        self.assertAlmostEqual(169, Point3D(4, -3, 13).distance_squared(Point3D(1, 1, 1)))
+        self.assertAlmostEqual(13, Point3D(4, -3, 13).distance(Point3D(1, 1, 1)))
+
+    def test_almost_equal(self):
+        self.assertTrue(Point3D(1, 2, 3).almost_equal(Point3D(1, 2, 3.0000001)))
+        self.assertFalse(Point3D(1, 2, 3).almost_equal(Point3D(1, 2, 3.1)))
+        self.assertTrue(Point3D(1, 2, 3).almost_equal(Point3D(1, 2, 3.1), tolerance=0.2))
+        self.assertFalse(Point3D(1, 2, 3).almost_equal((1, 2, 3)))
+
+
+class PointArrayTest(TestCase):
+    def setUp(self) -> None:
+        self.points = PointArray.from_points([Point3D(1, 2, 3), Point3D(-1, 0, 2)])
+
+    def assertPointsAlmostEqual(self, expected, actual: PointArray) -> None:
+        self.assertEqual(len(expected), len(actual))
+        for expected_point, actual_point in zip(expected, actual.to_points()):
+            self.assertTrue(expected_point.almost_equal(actual_point, tolerance=1e-5), f'{expected_point} != {actual_point}')
+
+    def test_getitem_and_setitem(self):
+        self.points[1] = Point3D(4, 5, 6)
+
+        self.assertEqual(Point3D(1, 2, 3), self.points[0])
+        self.assertEqual(Point3D(4, 5, 6), self.points[1])
+
+    def test_iadd(self):
+        result = self.points.iadd(Point3D(1, 1, 1)).iadd(self.points.copy()).iadd(1)
+
+        self.assertIs(self.points, result)
+        self.assertPointsAlmostEqual([Point3D(5, 7, 9), Point3D(1, 3, 7)], self.points)
+
+    def test_isub(self):
+        self.points.isub(Point3D(1, 2, 3))
+        self.assertPointsAlmostEqual([Point3D(0, 0, 0), Point3D(-2, -2, -1)], self.points)
+
+    def test_iscale(self):
+        self.points.iscale(2)
+        self.assertPointsAlmostEqual([Point3D(2, 4, 6), Point3D(-2, 0, 4)], self.points)
+
+    def test_operators_return_new_array(self):
+        result = (self.points + 1 - Point3D(1, 1, 1)) * 3
+
+        self.assertPointsAlmostEqual([Point3D(3, 6, 9), Point3D(-3, 0, 6)], result)
+        self.assertPointsAlmostEqual([Point3D(1, 2, 3), Point3D(-1, 0, 2)], self.points)
+
+    def test_irotate_by_one_angle(self):
+        self.points.irotate(pi / 2)
+        self.assertPointsAlmostEqual([Point3D(-2, 1, 3), Point3D(0, -1, 2)], self.points)
+
+    def test_irotate_by_angle_per_point(self):
+        self.points.irotate([pi / 2, pi])
+        self.assertPointsAlmostEqual([Point3D(-2, 1, 3), Point3D(1, 0, 2)], self.points)
+
+    def test_norms(self):
+        norms = self.points.norms()
+
+        self.assertAlmostEqual(14 ** 0.5, norms[0], places=5)
+        self.assertAlmostEqual(5 ** 0.5, norms[1], places=5)
+
+    def test_set_and_fill(self):
+        other = PointArray.zeros(2).fill(Point3D(7, 8, 9))
+        self.points.set(other)
+
+        self.assertPointsAlmostEqual([Point3D(7, 8, 9), Point3D(7, 8, 9)], self.points)
+
+
+@patch('phyto.types.np', None)
+class PointArrayWithoutNumPyTest(PointArrayTest):
+    def setUp(self) -> None:
+        with patch('phyto.types.np', None):
+            super().setUp()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,14 @@
+import math
+from array import array
+
+try:
+    from ulab import numpy as np
+except ImportError:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
 I2cAddress = int
 
 try:
@@ -21,6 +32,8 @@ Length = float
 
 
 class Point3D:
+    __slots__ = ('x', 'y', 'z')
+
     x: float
     y: float
     z: float
@@ -71,9 +84,216 @@ class Point3D:
         else:
             return Point3D(self.x / other, self.y / other, self.z / other)
 
+    def copy(self) -> 'Point3D':
+        return Point3D(self.x, self.y, self.z)
+
+    def set(self, other: 'Point3D') -> 'Point3D':
+        """Copies the coordinates of the other point into this one, and returns this point."""
+        self.x = other.x
+        self.y = other.y
+        self.z = other.z
+        return self
+
+    def iadd(self, other) -> 'Point3D':
+        """In-place version of ``+``. Returns this point, so calls can be chained."""
+        if isinstance(other, Point3D):
+            self.x += other.x
+            self.y += other.y
+            self.z += other.z
+        else:
+            self.x += other
+            self.y += other
+            self.z += other
+        return self
+
+    def isub(self, other) -> 'Point3D':
+        """In-place version of ``-``. Returns this point, so calls can be chained."""
+        if isinstance(other, Point3D):
+            self.x -= other.x
+            self.y -= other.y
+            self.z -= other.z
+        else:
+            self.x -= other
+            self.y -= other
+            self.z -= other
+        return self
+
+    def imul(self, other) -> 'Point3D':
+        """In-place version of ``*``. Returns this point, so calls can be chained."""
+        if isinstance(other, Point3D):
+            self.x *= other.x
+            self.y *= other.y
+            self.z *= other.z
+        else:
+            self.x *= other
+            self.y *= other
+            self.z *= other
+        return self
+
     def almost_equal(self, other, tolerance: float = 1e-6) -> bool:
-        return isinstance(other, Point3D) and (self - other).norm() < tolerance
+        return isinstance(other, Point3D) and self.distance_squared(other) < tolerance * tolerance
+
+    def distance_squared(self, other: 'Point3D') -> float:
+        """Squared Euclidean distance to the other point. Compare it against a squared distance to avoid the sqrt."""
+        dx = self.x - other.x
+        dy = self.y - other.y
+        dz = self.z - other.z
+        return dx * dx + dy * dy + dz * dz
+
+    def distance(self, other: 'Point3D') -> float:
+        return math.sqrt(self.distance_squared(other))
 
     def norm(self, p: float = 2) -> float:
-        point = abs(self)
-        return (point.x ** p + point.y ** p + point.z ** p) ** (1 / p)
+        if p == 2:
+            return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+        return (abs(self.x) ** p + abs(self.y) ** p + abs(self.z) ** p) ** (1 / p)
+
+
+class PointArray:
+    """
+    A fixed number of points stored as a struct of arrays, e.g. the feet of all six legs.
+
+    The coordinates are NumPy (or ``ulab.numpy`` on the microcontroller) arrays when available, otherwise
+    ``array('f')`` buffers. Either way, ``xs``, ``ys`` and ``zs`` can be passed straight to batched code like
+    `InverseSolver3Dof.solve_batch`. Methods starting with ``i`` work in place and return this array.
+    """
+
+    __slots__ = ('xs', 'ys', 'zs')
+
+    def __init__(self, xs, ys, zs):
+        assert len(xs) == len(ys) == len(zs), (len(xs), len(ys), len(zs))
+
+        if np is not None:
+            dtype = getattr(np, 'float', float)
+            self.xs, self.ys, self.zs = np.array(xs, dtype=dtype), np.array(ys, dtype=dtype), np.array(zs, dtype=dtype)
+        else:
+            self.xs, self.ys, self.zs = array('f', xs), array('f', ys), array('f', zs)
+
+    @staticmethod
+    def zeros(n: int) -> 'PointArray':
+        return PointArray([0.] * n, [0.] * n, [0.] * n)
+
+    @staticmethod
+    def from_points(points) -> 'PointArray':
+        return PointArray([p.x for p in points], [p.y for p in points], [p.z for p in points])
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, i: int) -> Point3D:
+        return Point3D(float(self.xs[i]), float(self.ys[i]), float(self.zs[i]))
+
+    def __setitem__(self, i: int, point: Point3D) -> None:
+        self.xs[i] = point.x
+        self.ys[i] = point.y
+        self.zs[i] = point.z
+
+    def __repr__(self) -> str:
+        return f'PointArray({[self[i] for i in range(len(self))]})'
+
+    def to_points(self) -> list:
+        return [self[i] for i in range(len(self))]
+
+    def copy(self) -> 'PointArray':
+        return PointArray(self.xs, self.ys, self.zs)
+
+    def set(self, other: 'PointArray') -> 'PointArray':
+        """Copies the points of another array of the same length into this one."""
+        self.xs[:], self.ys[:], self.zs[:] = other.xs, other.ys, other.zs
+        return self
+
+    def fill(self, point: Point3D) -> 'PointArray':
+        """Sets every point to the given point."""
+        for i in range(len(self.xs)):
+            self[i] = point
+        return self
+
+    def iadd(self, other) -> 'PointArray':
+        """Adds a `PointArray`, a `Point3D` or a scalar to every point."""
+        return self._apply(other, _add)
+
+    def isub(self, other) -> 'PointArray':
+        """Subtracts a `PointArray`, a `Point3D` or a scalar from every point."""
+        return self._apply(other, _sub)
+
+    def iscale(self, factor) -> 'PointArray':
+        """Multiplies every point by a scalar, or element-wise by a `Point3D` or `PointArray`."""
+        return self._apply(factor, _mul)
+
+    def __add__(self, other) -> 'PointArray':
+        return self.copy().iadd(other)
+
+    def __sub__(self, other) -> 'PointArray':
+        return self.copy().isub(other)
+
+    def __mul__(self, other) -> 'PointArray':
+        return self.copy().iscale(other)
+
+    def irotate(self, angles) -> 'PointArray':
+        """Rotates the points about the z axis, by one angle for all points or by one angle per point."""
+
+        if np is not None:
+            c, s = np.cos(angles), np.sin(angles)
+            xs, ys = self.xs, self.ys
+            xs[:], ys[:] = xs * c - ys * s, xs * s + ys * c
+            return self
+
+        xs, ys = self.xs, self.ys
+        if isinstance(angles, (int, float)):
+            c, s = math.cos(angles), math.sin(angles)
+            for i in range(len(xs)):
+                x, y = xs[i], ys[i]
+                xs[i] = x * c - y * s
+                ys[i] = x * s + y * c
+        else:
+            for i in range(len(xs)):
+                c, s = math.cos(angles[i]), math.sin(angles[i])
+                x, y = xs[i], ys[i]
+                xs[i] = x * c - y * s
+                ys[i] = x * s + y * c
+
+        return self
+
+    def norms(self):
+        """Euclidean norm of every point."""
+
+        if np is not None:
+            return np.sqrt(self.xs * self.xs + self.ys * self.ys + self.zs * self.zs)
+
+        xs, ys, zs = self.xs, self.ys, self.zs
+        return array('f', (math.sqrt(xs[i] * xs[i] + ys[i] * ys[i] + zs[i] * zs[i]) for i in range(len(xs))))
+
+    def _apply(self, other, op) -> 'PointArray':
+        if isinstance(other, PointArray):
+            ox, oy, oz = other.xs, other.ys, other.zs
+        elif isinstance(other, Point3D):
+            ox, oy, oz = other.x, other.y, other.z
+        else:
+            ox = oy = oz = other
+
+        if np is not None:
+            self.xs[:], self.ys[:], self.zs[:] = op(self.xs, ox), op(self.ys, oy), op(self.zs, oz)
+            return self
+
+        for values, o in ((self.xs, ox), (self.ys, oy), (self.zs, oz)):
+            if isinstance(o, (int, float)):
+                for i in range(len(values)):
+                    values[i] = op(values[i], o)
+            else:
+                for i in range(len(values)):
+                    values[i] = op(values[i], o[i])
+
+        return self
+
+
+def _add(a, b):
+    return a + b
+
+
+def _sub(a, b):
+    return a - b
+
+
+def _mul(a, b):
+    return a * b